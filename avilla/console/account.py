@@ -1,13 +1,15 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
 
 from avilla.core.account import AccountInfo, AccountStatus, BaseAccount
 from avilla.core.platform import Abstract, Land, Platform
+from avilla.core.ryanvk.staff import Staff
 from avilla.core.selector import Selector
 
 from .element import ConsoleElement
 from .frontend.info import Event
+from .perform.message.transcoder import Converters, build_transcoders
 
 if TYPE_CHECKING:
     from .protocol import ConsoleProtocol
@@ -36,6 +38,53 @@ class ConsoleAccount(BaseAccount):
         )
         self.protocol = protocol
         self.status = AccountStatus()
+        self._staffs: Dict[Optional[Callable[[Any], Any]], Staff] = {}
+        self._staff_fingerprint: Optional[Tuple[Tuple[int, int], ...]] = None
+        self._transcoders: Optional[Tuple[Converters, Converters]] = None
+
+    def _artifacts_fingerprint(self) -> Tuple[Tuple[int, int], ...]:
+        # perform 注册时会向 artifacts 中添加条目, 以各层的身份与大小判断是否发生变化
+        return tuple((id(m), len(m)) for m in self.get_staff_artifacts().maps)
+
+    def _check_artifacts(self) -> None:
+        fingerprint = self._artifacts_fingerprint()
+        if fingerprint != self._staff_fingerprint:
+            self.invalidate_staff()
+            self._staff_fingerprint = fingerprint
+
+    def get_staff(
+        self, element_typer: Optional[Callable[[Any], Any]] = None
+    ) -> Staff:
+        """获取该账号的 Staff
+
+        Staff 会被缓存并在每个事件间复用, 协议的 perform 发生变化时自动重建.
+
+        Args:
+            element_typer: 反序列化时获取元素类型的函数, 不同的函数各自缓存一个 Staff
+        """
+        self._check_artifacts()
+        staff = self._staffs.get(element_typer)
+        if staff is None:
+            staff = self._staffs[element_typer] = Staff.focus(
+                self, element_typer=element_typer
+            )
+        return staff
+
+    def get_transcoders(self) -> Tuple[Converters, Converters]:
+        """获取消息元素的序列化与反序列化查找表
+
+        与 Staff 一同缓存, 协议的 perform 发生变化时自动重建.
+        """
+        self._check_artifacts()
+        if self._transcoders is None:
+            self._transcoders = build_transcoders(self.get_staff_artifacts())
+        return self._transcoders
+
+    def invalidate_staff(self) -> None:
+        """丢弃缓存的 Staff 与查找表, 下次使用时重新构建"""
+        self._staffs.clear()
+        self._transcoders = None
+        self._staff_fingerprint = None
 
     @property
     def client(self):
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from avilla.core.ryanvk import Capability, TargetFn
+from graia.amnesia.message import MessageChain
+
+
+class ConsoleMessageEdit(Capability):
+    """编辑一条已发送的控制台消息
+
+    `avilla.standard.core.message.MessageEdit.edit` 不接收目标消息, 因此控制台提供按目标分发的版本:
+
+        await ctx[ConsoleMessageEdit.edit](message.to_selector(), MessageChain([...]))
+    """
+
+    @TargetFn
+    async def edit(self, content: MessageChain) -> None:
+        ...
@@ -1,6 +1,7 @@
 from abc import ABCMeta, abstractmethod
-from dataclasses import asdict, dataclass, field
-from typing import Optional, Union
+from contextlib import suppress
+from dataclasses import FrozenInstanceError
+from typing import Any, ClassVar, Dict, Optional, Tuple, Union
 
 from graia.amnesia.message.element import Element
 from graia.amnesia.message.element import Text as BaseText
@@ -12,16 +13,74 @@ from rich.measure import Measurement, measure_renderables
 from rich.style import Style
 from rich.text import Text as RichText
 
+RichRenderable = Union[RichText, RichEmoji, RichMarkdown]
+
 
 class ConsoleElement(Element, metaclass=ABCMeta):
+    """不可变的控制台消息元素
+
+    对应的 rich 对象只会在第一次访问 `rich` 时构建一次, 之后的字符串化, 测量与渲染都复用它.
+    """
+
+    __slots__ = ("_rich",)
+    __field_names__: ClassVar[Tuple[str, ...]] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.__field_names__ = tuple(
+            name
+            for klass in reversed(cls.__mro__)
+            for name in klass.__dict__.get("__slots__", ())
+            if not name.startswith("_")
+        )
+
     @property
+    def fields(self) -> Dict[str, Any]:
+        """元素的全部字段"""
+        return {name: getattr(self, name) for name in self.__field_names__}
+
+    def _init(self, **fields: Any) -> None:
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # copy, deepcopy 与 pickle 都经由 _init 重建, 缓存的 rich 对象不会被复制
+        return _rebuild, (type(self), self.fields)
+
     @abstractmethod
-    def rich(self) -> Union[RichText, RichEmoji, RichMarkdown]:
+    def render_rich(self) -> RichRenderable:
         pass
 
+    @property
+    def rich(self) -> RichRenderable:
+        try:
+            return self._rich
+        except AttributeError:
+            rich = self.render_rich()
+            object.__setattr__(self, "_rich", rich)
+            return rich
+
     def __str__(self) -> str:
         return str(self.rich)
 
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.fields == other.fields  # type: ignore
+
+    def __hash__(self) -> int:
+        return hash((type(self), *self.fields.values()))
+
+    def __repr__(self) -> str:
+        params = ", ".join(f"{k}={v!r}" for k, v in self.fields.items())
+        return f"{type(self).__name__}({params})"
+
     def __rich_console__(
         self, console: "Console", options: "ConsoleOptions"
     ) -> "RenderResult":
@@ -33,32 +92,70 @@ class ConsoleElement(Element, metaclass=ABCMeta):
         return measure_renderables(console, options, (self.rich,))
 
 
+def _rebuild(cls: type, fields: Dict[str, Any]) -> ConsoleElement:
+    element = cls.__new__(cls)
+    element._init(**fields)
+    return element
+
+
 class Text(BaseText, ConsoleElement):
-    @property
-    def rich(self) -> RichText:
+    """文本元素
+
+    与 `graia.amnesia` 的 `Text` 一致, 字段可以修改: `MessageChain.removeprefix` 等方法会修改副本中的文本.
+    修改字段时丢弃缓存的 rich 对象.
+    """
+
+    __slots__ = ("text", "style")
+
+    def __init__(self, text: str, style: Optional[str] = None) -> None:
+        self._init(text=text, style=style)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name not in self.__field_names__:
+            raise FrozenInstanceError(f"cannot assign to {name!r}")
+        object.__setattr__(self, name, value)
+        with suppress(AttributeError):
+            object.__delattr__(self, "_rich")
+
+    def render_rich(self) -> RichText:
         return RichText(self.text, end="")
 
+    def __str__(self) -> str:
+        return self.text
+
 
 class Emoji(ConsoleElement):
+    __slots__ = ("name",)
+
     name: str
 
     def __init__(self, name: str):
-        self.name = name
+        self._init(name=name)
 
-    @property
-    def rich(self) -> RichEmoji:
+    def render_rich(self) -> RichEmoji:
         return RichEmoji(self.name)
 
 
-@dataclass
 class Markup(ConsoleElement):
+    __slots__ = ("markup", "style", "emoji", "emoji_variant")
+
     markup: str
-    style: Union[str, Style] = field(default="none")
-    emoji: bool = field(default=True)
-    emoji_variant: Optional[EmojiVariant] = field(default=None)
+    style: Union[str, Style]
+    emoji: bool
+    emoji_variant: Optional[EmojiVariant]
+
+    def __init__(
+        self,
+        markup: str,
+        style: Union[str, Style] = "none",
+        emoji: bool = True,
+        emoji_variant: Optional[EmojiVariant] = None,
+    ):
+        self._init(
+            markup=markup, style=style, emoji=emoji, emoji_variant=emoji_variant
+        )
 
-    @property
-    def rich(self) -> RichText:
+    def render_rich(self) -> RichText:
         return RichText.from_markup(
             self.markup,
             style=self.style,
@@ -68,25 +165,54 @@ class Markup(ConsoleElement):
         )
 
 
-@dataclass
 class Markdown(ConsoleElement):
+    __slots__ = (
+        "markup",
+        "code_theme",
+        "justify",
+        "style",
+        "hyperlinks",
+        "inline_code_lexer",
+        "inline_code_theme",
+        "_plain",
+    )
+
     markup: str
-    code_theme: str = field(default="monokai")
-    justify: Optional[JustifyMethod] = field(default=None)
-    style: Union[str, Style] = field(default="none")
-    hyperlinks: bool = field(default=True)
-    inline_code_lexer: Optional[str] = field(default=None)
-    inline_code_theme: Optional[str] = field(default=None)
+    code_theme: str
+    justify: Optional[JustifyMethod]
+    style: Union[str, Style]
+    hyperlinks: bool
+    inline_code_lexer: Optional[str]
+    inline_code_theme: Optional[str]
+
+    def __init__(
+        self,
+        markup: str,
+        code_theme: str = "monokai",
+        justify: Optional[JustifyMethod] = None,
+        style: Union[str, Style] = "none",
+        hyperlinks: bool = True,
+        inline_code_lexer: Optional[str] = None,
+        inline_code_theme: Optional[str] = None,
+    ):
+        self._init(
+            markup=markup,
+            code_theme=code_theme,
+            justify=justify,
+            style=style,
+            hyperlinks=hyperlinks,
+            inline_code_lexer=inline_code_lexer,
+            inline_code_theme=inline_code_theme,
+        )
 
-    @property
-    def rich(self) -> RichMarkdown:
-        return RichMarkdown(**asdict(self))
+    def render_rich(self) -> RichMarkdown:
+        return RichMarkdown(**self.fields)
 
     def __str__(self) -> str:
-        return str(
-            RichText.from_markup(
-                self.markup,
-                style=self.style,
-                end="",
-            )
-        )
+        try:
+            return self._plain
+        except AttributeError:
+            plain = str(RichText.from_markup(self.markup, style=self.style, end=""))
+            object.__setattr__(self, "_plain", plain)
+            return plain
+
@@ -1 +1,4 @@
+from .app import ConsoleApp as ConsoleApp
 from .app import Frontend as Frontend
+from .client import ConsoleClient as ConsoleClient
+from .headless import HeadlessClient as HeadlessClient
@@ -1,36 +1,40 @@
 import asyncio
 import contextlib
-import secrets
 import sys
-from datetime import datetime
-from typing import TYPE_CHECKING, Any, Dict, Optional, TextIO, cast
+from typing import TYPE_CHECKING, Any, Callable, Optional, TextIO, Union, cast
 
-from avilla.core.account import AccountInfo
-from avilla.core.ryanvk.staff import Staff
-from avilla.standard.core.account import AccountAvailable, AccountUnavailable
 from loguru import logger
 from textual.app import App
 from textual.binding import Binding
 from textual.widgets import Input
 
-from avilla.console.account import PLATFORM, ConsoleAccount
 from avilla.console.element import Text
 from avilla.console.message import ConsoleMessage
 
+from .client import ClientLifecycle, ConsoleClient
+from .components.chatroom.message import BUBBLE_CACHE_SIZE, BubbleCache
 from .components.footer import Footer
 from .components.header import Header
-from .info import Event, MessageEvent
-from .log_redirect import FakeIO
+from .info import Event
+from .log_redirect import LOG_LEVEL, FakeIO, add_log_sink
 from .router import RouterView
 from .storage import Storage
+from .utils import ABCMessagePumpMeta
 from .views.horizontal import HorizontalView
 from .views.log_view import LogView
+from .views.stats_view import StatsView
 
 if TYPE_CHECKING:
     from avilla.console.protocol import ConsoleProtocol
 
 
-class Frontend(App):
+class ConsoleApp(App, ClientLifecycle, metaclass=ABCMessagePumpMeta):
+    """控制台界面
+
+    只通过 `storage` 读取聊天记录与日志, 不关心消息从何而来.
+    子类提供 `start_client` 与 `stop_client`, 以及输入框使用的 `action_post_message`.
+    """
+
     BINDINGS = [
         Binding("ctrl+q", "quit", "Quit", show=False, priority=True),
         Binding("ctrl+d", "toggle_dark", "Toggle dark mode"),
@@ -38,23 +42,49 @@ class Frontend(App):
         Binding("ctrl+underscore", "focus_input", "Focus input", key_display="ctrl+/"),
     ]
 
-    ROUTES = {"main": lambda: HorizontalView(), "log": lambda: LogView()}
-
-    def __init__(self, protocol: "ConsoleProtocol"):
+    ROUTES = {
+        "main": lambda: HorizontalView(),
+        "log": lambda: LogView(),
+        "stats": lambda: StatsView(),
+    }
+
+    storage: Storage
+
+    def __init__(
+        self,
+        storage: Storage,
+        log_level: Union[str, int] = LOG_LEVEL,
+        post: Optional[Callable[..., Any]] = None,
+    ):
+        """
+        Args:
+            storage: 界面显示的 Storage
+            log_level: 写入界面的日志的最低等级
+            post: 界面运行在另一个线程中时, 用于把日志投递到该线程的函数, 如 `ThreadBridge.post`
+        """
         super().__init__()
-        self.protocol = protocol
+        self.storage = storage
+        self.log_level = log_level
+        self._log_post = post
         self.title = "Console"  # type: ignore
         self.sub_title = "Welcome to Avilla"  # type: ignore
-        self.account = ConsoleAccount(protocol)
-        self.storage = Storage()
+        self.bubble_cache = BubbleCache(BUBBLE_CACHE_SIZE)
+        self.frames = 0
+        """已经显示的帧数, 由运行状态面板计算帧率"""
 
         self._stderr = sys.stderr
         self._logger_id: Optional[int] = None
         self._should_restore_logger: bool = False
-        self._fake_output = cast(TextIO, FakeIO(self.storage))
+        self._client_running = False
+        self._fake_output = cast(TextIO, FakeIO(self.storage, post))
         self._redirect_stdout: Optional[contextlib.redirect_stdout[TextIO]] = None
         self._redirect_stderr: Optional[contextlib.redirect_stderr[TextIO]] = None
 
+    @property
+    def bot_loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        """机器人所在的事件循环, 与界面相同或不在本进程中时为 None"""
+        return None
+
     def compose(self):
         yield Header()
         yield RouterView(self.ROUTES, "main")
@@ -63,13 +93,9 @@ class Frontend(App):
     def on_load(self):
         logger.remove()
         self._should_restore_logger = True
-        self._logger_id = logger.add(self._fake_output, level=0, diagnose=False)
-        self.account.status.enabled = True
+        self._logger_id = add_log_sink(self.storage, self.log_level, self._log_post)
 
     def on_mount(self):
-        self.protocol.avilla.accounts[self.account.route] = AccountInfo(
-            self.account.route, self.account, self.protocol, PLATFORM
-        )
         with contextlib.suppress(Exception):
             stdout = contextlib.redirect_stdout(self._fake_output)
             stdout.__enter__()
@@ -79,12 +105,10 @@ class Frontend(App):
             stderr = contextlib.redirect_stderr(self._fake_output)
             stderr.__enter__()
             self._redirect_stderr = stderr
-        self.protocol.avilla.broadcast.postEvent(
-            AccountAvailable(self.protocol.avilla, self.account)
-        )
+        self.start_client()
+        self._client_running = True
 
     def on_unmount(self):
-        del self.protocol.avilla.accounts[self.account.route]
         if self._redirect_stderr is not None:
             self._redirect_stderr.__exit__(None, None, None)
             self._redirect_stderr = None
@@ -103,53 +127,36 @@ class Frontend(App):
                 colorize=True,
             )
             self._should_restore_logger = False
-        self.account.status.enabled = False
-        self.protocol.avilla.broadcast.postEvent(
-            AccountUnavailable(self.protocol.avilla, self.account)
-        )
-        logger.success("Console exit.")
-        logger.warning("Press Ctrl-C for Application exit")
-
-    async def call(self, api: str, data: Dict[str, Any]):
-        if api == "bell":
-            await self.run_action("bell")
-        elif api == "send_msg":
-            msg_id = secrets.token_hex(16)
-            with contextlib.suppress(Exception):
-                self.storage.write_chat(
-                    MessageEvent(
-                        type="console.message",
-                        time=datetime.now(),
-                        self_id=data["info"].id,
-                        msg_id=msg_id,
-                        message=data["message"],
-                        user=data["info"],
-                    )
-                )
-                return msg_id
+        # textual 在退出时可能发送两次 Unmount, 客户端只停止一次
+        if self._client_running:
+            self._client_running = False
+            self.stop_client()
+            logger.success("Console exit.")
+            logger.warning("Press Ctrl-C for Application exit")
+
+    def post_display_hook(self) -> None:
+        self.frames += 1
 
     def action_focus_input(self):
         with contextlib.suppress(Exception):
             self.query_one(Input).focus()
 
+
+class Frontend(ConsoleApp, ConsoleClient):
+    """与 Avilla 运行在同一事件循环中的界面"""
+
+    def __init__(self, protocol: "ConsoleProtocol"):
+        storage = Storage(
+            transcript_path=protocol.transcript, log_spill_path=protocol.log_spill
+        )
+        ConsoleApp.__init__(self, storage, protocol.log_level)
+        ConsoleClient.__init__(self, protocol, self.storage)
+
     async def action_post_message(self, message: str):
-        msg = MessageEvent(
-            type="console.message",
-            time=datetime.now(),
-            self_id=self.account.route["account"],
-            msg_id=secrets.token_hex(16),
-            message=ConsoleMessage([Text(message)]),
-            user=self.storage.current_user,
+        # 分发队列已满时不能在界面的事件循环里等待, 否则整个界面都会卡住
+        await self.inject_message(
+            ConsoleMessage([Text(message)]), self.storage.current_speaker(), wait=False
         )
-        self.storage.write_chat(msg)
-        asyncio.create_task(self.post_event(self.account, msg))
 
     async def action_post_event(self, event: Event):
-        asyncio.create_task(self.post_event(self.account, event))
-
-    async def post_event(self, account: ConsoleAccount, event: Event):
-        res = await Staff(account).parse_event(event.type, event)
-        if res is None:
-            logger.warning(f"received unsupported event {event.type}: {event}")
-            return
-        self.protocol.post_event(res)
+        self.dispatcher.submit_later(event)
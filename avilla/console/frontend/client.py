@@ -0,0 +1,163 @@
+import contextlib
+from abc import ABCMeta, abstractmethod
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from avilla.core.account import AccountInfo
+from avilla.standard.core.account import AccountAvailable, AccountUnavailable
+from loguru import logger
+
+from avilla.console import timing
+from avilla.console.account import PLATFORM, ConsoleAccount
+from avilla.console.message import ConsoleMessage
+
+from .dispatch import Dispatcher
+from .info import Event, MessageEvent, User
+from .storage import Storage
+
+if TYPE_CHECKING:
+    from avilla.console.protocol import ConsoleProtocol
+
+
+class ClientLifecycle(metaclass=ABCMeta):
+    """控制台客户端的启动与停止, 界面在挂载与卸载时调用"""
+
+    @abstractmethod
+    def start_client(self) -> None:
+        """启动客户端"""
+
+    @abstractmethod
+    def stop_client(self) -> None:
+        """停止客户端"""
+
+
+class ConsoleClient(ClientLifecycle):
+    """控制台客户端的公共部分
+
+    持有账号与 Storage, 负责账号的上下线, 处理来自 Avilla 的调用 (`call`),
+    以及通过 `Dispatcher` 把用户消息作为事件投递给 Avilla.
+    界面 (`Frontend`) 与无界面模式 (`HeadlessClient`) 共用这些逻辑.
+    """
+
+    protocol: "ConsoleProtocol"
+    account: ConsoleAccount
+    storage: Storage
+    dispatcher: Dispatcher
+
+    def __init__(self, protocol: "ConsoleProtocol", storage: Storage):
+        self.protocol = protocol
+        self.account = ConsoleAccount(protocol)
+        self.storage = storage
+        for scene in protocol.scenes:
+            storage.add_scene(scene)
+        self.dispatcher = Dispatcher(
+            lambda event: self.post_event(self.account, event),
+            workers=protocol.dispatch_workers,
+            queue_size=protocol.dispatch_queue_size,
+            policy=protocol.dispatch_policy,
+        )
+        self._stopped = False
+
+    @abstractmethod
+    def bell(self) -> None:
+        """响铃, 由 `call("bell", ...)` 调用"""
+
+    def start_client(self) -> None:
+        """启动事件分发, 注册账号并通知 Avilla 账号可用"""
+        self.dispatcher.start()
+        self.account.status.enabled = True
+        self.protocol.avilla.accounts[self.account.route] = AccountInfo(
+            self.account.route, self.account, self.protocol, PLATFORM
+        )
+        self.protocol.avilla.broadcast.postEvent(
+            AccountAvailable(self.protocol.avilla, self.account)
+        )
+
+    def stop_client(self) -> None:
+        """注销账号, 停止事件分发并关闭持久化的聊天记录; 重复调用时什么也不做"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self.protocol.avilla.accounts.pop(self.account.route, None)
+        self.dispatcher.close()
+        self.storage.close()
+        self.account.status.enabled = False
+        self.protocol.avilla.broadcast.postEvent(
+            AccountUnavailable(self.protocol.avilla, self.account)
+        )
+
+    async def call(self, api: str, data: Dict[str, Any]):
+        start = timing.start()
+        result = None
+        if api == "bell":
+            self.bell()
+        elif api == "send_msg":
+            msg_id = self.storage.next_msg_id()
+            with contextlib.suppress(Exception):
+                self.storage.write_chat(
+                    MessageEvent(
+                        type="console.message",
+                        time=datetime.now(),
+                        self_id=data["info"].id,
+                        msg_id=msg_id,
+                        message=data["message"],
+                        user=data["info"],
+                        scene=data.get("scene") or self.storage.current_scene,
+                        reply=data.get("reply"),
+                    )
+                )
+                result = msg_id
+        elif api == "edit_msg":
+            message = self.storage.edit_message(data["msg_id"], data["message"])
+            result = message is not None
+        elif api == "revoke_msg":
+            result = self.storage.revoke_message(data["msg_id"]) is not None
+        timing.stop("call", start)
+        return result
+
+    async def inject_message(
+        self,
+        message: ConsoleMessage,
+        user: Optional[User] = None,
+        scene: Optional[str] = None,
+        wait: bool = True,
+    ) -> MessageEvent:
+        """以用户的身份发送一条消息: 写入聊天记录, 并提交给分发队列
+
+        分发队列已满时按 `ConsoleProtocol.dispatch_policy` 等待或丢弃该事件.
+
+        Args:
+            message: 消息内容
+            user: 发送者, 默认为 `Storage.current_user`
+            scene: 消息所在的场景, 默认由 `Storage.scene_of` 决定
+            wait: 为 False 时不等待分发队列 (见 `Dispatcher.submit_later`), 供界面调用
+        """
+        user = user or self.storage.current_user
+        self.storage.users.setdefault(user.id, user)
+        msg = MessageEvent(
+            type="console.message",
+            time=datetime.now(),
+            self_id=self.account.route["account"],
+            msg_id=self.storage.next_msg_id(),
+            message=message,
+            user=user,
+            scene=scene or self.storage.scene_of(user),
+        )
+        self.storage.write_chat(msg)
+        if wait:
+            await self.dispatcher.submit(msg)
+        else:
+            self.dispatcher.submit_later(msg)
+        return msg
+
+    async def post_event(self, account: ConsoleAccount, event: Event):
+        start = timing.start()
+        res = await account.get_staff().parse_event(event.type, event)
+        timing.stop("parse_event", start)
+        if res is None:
+            logger.warning(f"received unsupported event {event.type}: {event}")
+            return
+        handoff = timing.start()
+        self.protocol.post_event(res)
+        timing.stop("broadcast", handoff)
+        timing.stop("post_event", start)
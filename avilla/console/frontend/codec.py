@@ -0,0 +1,205 @@
+import asyncio
+import json
+import struct
+from datetime import datetime
+from typing import Any, Dict, List, Type, Union
+
+from rich.console import RenderableType
+from rich.style import Style
+
+from avilla.console.element import ConsoleElement, Emoji, Markdown, Markup, Text
+from avilla.console.message import ConsoleMessage
+
+from .info import DEFAULT_SCENE, Event, MessageEvent, Robot, Scene, User
+from .log_redirect import LogLine, LogRecord
+
+ELEMENT_TYPES: Dict[str, Type[ConsoleElement]] = {
+    "Text": Text,
+    "Emoji": Emoji,
+    "Markup": Markup,
+    "Markdown": Markdown,
+}
+
+
+def encode_element(element: ConsoleElement) -> Dict[str, Any]:
+    data: Dict[str, Any] = {"type": type(element).__name__}
+    for name, value in element.fields.items():
+        data[name] = str(value) if isinstance(value, Style) else value
+    return data
+
+
+def decode_element(data: Dict[str, Any]) -> ConsoleElement:
+    data = dict(data)
+    element_type = data.pop("type")
+    if element_type not in ELEMENT_TYPES:
+        raise ValueError(f"unknown console element type: {element_type}")
+    return ELEMENT_TYPES[element_type](**data)
+
+
+def encode_message(message: ConsoleMessage) -> List[Dict[str, Any]]:
+    return [encode_element(element) for element in message]
+
+
+def decode_message(data: List[Dict[str, Any]]) -> ConsoleMessage:
+    return ConsoleMessage([decode_element(element) for element in data])
+
+
+def encode_user(user: User) -> Dict[str, Any]:
+    return {
+        "id": user.id,
+        "avatar": user.avatar,
+        "nickname": user.nickname,
+        "robot": isinstance(user, Robot),
+    }
+
+
+def decode_user(data: Dict[str, Any]) -> User:
+    cls = Robot if data["robot"] else User
+    return cls(data["id"], data["avatar"], data["nickname"])
+
+
+def encode_scene(scene: Scene) -> Dict[str, Any]:
+    return {"id": scene.id, "name": scene.name, "group": scene.group}
+
+
+def decode_scene(data: Dict[str, Any]) -> Scene:
+    return Scene(data["id"], data["name"], data["group"])
+
+
+def encode_event(event: Event) -> Dict[str, Any]:
+    data: Dict[str, Any] = {
+        "type": event.type,
+        "time": event.time.timestamp(),
+        "self_id": event.self_id,
+        "user": encode_user(event.user),
+    }
+    if isinstance(event, MessageEvent):
+        data["msg_id"] = event.msg_id
+        data["message"] = encode_message(event.message)
+        data["scene"] = event.scene
+        if event.reply is not None:
+            data["reply"] = event.reply
+        if event.revision:
+            data["revision"] = event.revision
+        if event.revoked:
+            data["revoked"] = True
+    return data
+
+
+def decode_event(data: Dict[str, Any]) -> Event:
+    time = datetime.fromtimestamp(data["time"])
+    user = decode_user(data["user"])
+    if "msg_id" in data:
+        return MessageEvent(
+            type=data["type"],
+            time=time,
+            self_id=data["self_id"],
+            user=user,
+            msg_id=data["msg_id"],
+            message=decode_message(data["message"]),
+            scene=data.get("scene", DEFAULT_SCENE),
+            reply=data.get("reply"),
+            revision=data.get("revision", 0),
+            revoked=data.get("revoked", False),
+        )
+    return Event(type=data["type"], time=time, self_id=data["self_id"], user=user)
+
+
+def encode_log(log: RenderableType) -> Union[str, Dict[str, Any]]:
+    """结构化的日志记录编码为字段, 其余的日志行编码为字符串"""
+    if not isinstance(log, LogRecord):
+        return str(log)
+    data: Dict[str, Any] = {
+        "time": log.time.timestamp(),
+        "level": log.level,
+        "no": log.no,
+        "name": log.name,
+        "function": log.function,
+        "line": log.line,
+        "message": log.message,
+    }
+    if log.exception:
+        data["exception"] = log.exception
+    return data
+
+
+def decode_log(data: Union[str, Dict[str, Any]]) -> Union[LogLine, LogRecord]:
+    if isinstance(data, str):
+        return LogLine(data)
+    return LogRecord(
+        datetime.fromtimestamp(data["time"]),
+        data["level"],
+        data["no"],
+        data["name"],
+        data["function"],
+        data["line"],
+        data["message"],
+        data.get("exception"),
+    )
+
+
+def dumps(event: Event) -> bytes:
+    """把事件编码为紧凑的单行 JSON"""
+    return json.dumps(
+        encode_event(event), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def loads(data: bytes) -> Event:
+    return decode_event(json.loads(data))
+
+
+FRAME_HEADER = struct.Struct("!I")
+FRAME_SIZE = 1024 * 1024
+"""`encode_frames` 拆分时每帧负载的目标大小"""
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+"""`read_frame` 接受的最大负载"""
+
+
+def encode_frame(ops: List[Dict[str, Any]]) -> bytes:
+    """把一批操作编码为一帧: 4 字节大端长度 + 紧凑 JSON 数组"""
+    payload = json.dumps(ops, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def encode_frames(
+    ops: List[Dict[str, Any]], max_size: int = FRAME_SIZE
+) -> List[bytes]:
+    """把一批操作编码为若干帧, 每帧的负载不超过 `max_size`; 单个操作超过时独占一帧"""
+    frames: List[bytes] = []
+    parts: List[bytes] = []
+    size = 2
+    for op in ops:
+        part = json.dumps(op, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+        if parts and size + len(part) + 1 > max_size:
+            frames.append(_join_frame(parts))
+            parts = []
+            size = 2
+        parts.append(part)
+        size += len(part) + 1
+    if parts:
+        frames.append(_join_frame(parts))
+    return frames
+
+
+def _join_frame(parts: List[bytes]) -> bytes:
+    payload = b"[" + b",".join(parts) + b"]"
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader) -> List[Dict[str, Any]]:
+    """读取一帧
+
+    连接关闭时抛出 `asyncio.IncompleteReadError`, 帧过大或无法解析时抛出 `ValueError`.
+    """
+    (size,) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+    if size > MAX_FRAME_SIZE:
+        raise ValueError(f"frame too large: {size} bytes")
+    ops = json.loads(await reader.readexactly(size))
+    if not isinstance(ops, list):
+        raise ValueError(f"frame is not a list: {type(ops).__name__}")
+    return ops
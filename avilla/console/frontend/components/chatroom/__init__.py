@@ -1,3 +1,5 @@
+from typing import TYPE_CHECKING, cast
+
 from textual.binding import Binding
 from textual.widget import Widget
 
@@ -5,6 +7,9 @@ from .history import ChatHistory
 from .input import InputBox
 from .toolbar import Toolbar
 
+if TYPE_CHECKING:
+    from ...app import Frontend
+
 
 class ChatRoom(Widget):
     DEFAULT_CSS = """
@@ -19,16 +24,42 @@ class ChatRoom(Widget):
     }
     """
 
-    BINDINGS = [Binding("ctrl+l", "clear_history", "Clear chat history")]
+    BINDINGS = [
+        Binding("ctrl+l", "clear_history", "Clear chat history"),
+        Binding("ctrl+t", "next_scene", "Switch scene"),
+    ]
 
     def __init__(self):
         super().__init__()
-        self.history = ChatHistory()
+        self.toolbar = Toolbar()
+        self.history: ChatHistory
+
+    @property
+    def app(self) -> "Frontend":
+        return cast("Frontend", super().app)
 
     def compose(self):
-        yield Toolbar()
+        storage = self.app.storage
+        self.history = ChatHistory(storage.current_scene)
+        self.toolbar.set_title(storage.scene(storage.current_scene).info.name)
+        yield self.toolbar
         yield self.history
         yield InputBox()
 
     def action_clear_history(self):
         self.history.action_clear_history()
+
+    async def action_switch_scene(self, scene_id: str):
+        """切换显示的场景, 只有当前场景的聊天记录会被挂载"""
+        if scene_id == self.history.scene:
+            return
+        scene = self.app.storage.set_scene(scene_id)
+        await self.history.remove()
+        self.history = ChatHistory(scene_id)
+        await self.mount(self.history, after=self.toolbar)
+        self.toolbar.set_title(scene.info.name)
+
+    async def action_next_scene(self):
+        scenes = list(self.app.storage.scenes)
+        index = scenes.index(self.history.scene) if self.history.scene in scenes else -1
+        await self.action_switch_scene(scenes[(index + 1) % len(scenes)])
@@ -1,68 +1,294 @@
 from datetime import datetime, timedelta
-from typing import TYPE_CHECKING, Iterable, Optional, Tuple, cast
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    cast,
+)
 
-from textual.widget import Widget
+from textual.strip import Strip
 
-from .message import Message, Timer
+from avilla.console import timing
+
+from ..general.paged import PagedList
+from .message import (
+    bubble_width,
+    render_bubble,
+    render_message,
+    render_notice,
+    render_quote,
+    render_timer,
+)
 
 if TYPE_CHECKING:
     from ...app import Frontend
     from ...info import MessageEvent
-    from ...storage import StateChange, Storage
+    from ...storage import ChatScene, MessageUpdate, StateChange, Storage, Transcript
+
 
+def needs_timer(
+    message: "MessageEvent",
+    last_msg: Optional["MessageEvent"],
+    last_time: Optional[datetime],
+) -> bool:
+    """消息上方是否需要显示时间分隔"""
+    return (
+        not last_time
+        or message.time - last_time > timedelta(minutes=5)
+        or bool(last_msg and message.time - last_msg.time > timedelta(minutes=1))
+    )
 
-class ChatHistory(Widget):
+
+class ChatHistory(PagedList["MessageEvent"]):
     DEFAULT_CSS = """
     ChatHistory {
-        layout: vertical;
         height: 100%;
         overflow: hidden scroll;
         scrollbar-size-vertical: 1;
     }
+    ChatHistory > .chat-history--bubble {
+        color: rgba(170, 170, 170, 0.7);
+    }
+    ChatHistory > .chat-history--notice {
+        color: rgba(170, 170, 170, 0.7);
+        text-style: italic;
+    }
+    ChatHistory > .chat-history--quote {
+        color: rgba(170, 170, 170, 0.7);
+    }
     """
 
-    def __init__(self):
+    COMPONENT_CLASSES = {
+        "chat-history--bubble",
+        "chat-history--notice",
+        "chat-history--quote",
+    }
+
+    # 昵称一行, 单行气泡三行
+    estimated_height = 4
+    page_size = 100
+    max_paged = 2000
+
+    def __init__(self, scene: str):
         super().__init__()
+        self.scene = scene
         self.last_msg: Optional["MessageEvent"] = None
         self.last_time: Optional[datetime] = None
+        # seq -> 该消息上方是否显示时间分隔
+        self._separators: Dict[int, bool] = {}
+        self._first_seq = 0
+        self._next_seq = 0
+        # 窗口中上方显示时间分隔的消息在持久化记录中的下标
+        self._older_separators: Set[int] = set()
+        # 清空记录后不再向前翻页
+        self._page_floor = 0
+        # 开启 timing 时, 尚未显示的消息中最早的写入时刻
+        self._unpainted_since = 0
 
     @property
     def storage(self) -> "Storage":
         return cast("Frontend", self.app).storage
 
-    async def on_mount(self):
-        await self.on_new_message(self.storage.chat_history)
+    @property
+    def chat(self) -> "ChatScene":
+        return self.storage.scene(self.scene)
+
+    def on_mount(self):
+        history = self.chat.history
+        self._first_seq = self._next_seq = history.first_seq
+        self.action_new_messages(tuple(history), history.first_seq)
         self.storage.add_chat_watcher(self)
 
     def on_unmount(self):
         self.storage.remove_chat_watcher(self)
 
-    async def action_new_message(self, message: "MessageEvent"):
-        if (
-            not self.last_time
-            or message.time - self.last_time > timedelta(minutes=5)
-            or (
-                self.last_msg
-                and message.time - self.last_msg.time > timedelta(minutes=1)
-            )
-        ):
-            self.mount(Timer(message.time))  # noqa
+    def _mark_timer(self, message: "MessageEvent", seq: int):
+        if needs_timer(message, self.last_msg, self.last_time):
+            self._separators[seq] = True
             self.last_time = message.time
-        await self.mount(Message(message))
         self.last_msg = message
 
-        self.scroll_end()
+    def on_state_change(self, event: "StateChange[Tuple[MessageEvent, ...]]"):
+        if event.scene != self.scene:
+            return
+        if event.written and not self._unpainted_since:
+            self._unpainted_since = event.written
+        if event.seq < 0:
+            history = self.chat.history
+            seq = max(self._next_seq, history.first_seq)
+            self.action_new_messages(history.since(seq), seq, event.evicted)
+        else:
+            self.action_new_messages(event.data, event.seq, event.evicted)
+
+    def on_message_update(self, event: "MessageUpdate"):
+        """消息被编辑或撤回: 它与引用它的消息的 key 随 `revision` 变化, 只有这些条目会被重新渲染"""
+        if event.scene != self.scene:
+            return
+        history = self.chat.history
+        if any(history.first_seq <= seq < self._next_seq for seq in event.seqs):
+            self.refresh_items()
+
+    def action_new_message(self, message: "MessageEvent", seq: int):
+        self.action_new_messages((message,), seq)
+
+    def action_new_messages(
+        self,
+        messages: Sequence["MessageEvent"],
+        seq: int,
+        evicted: Sequence["MessageEvent"] = (),
+    ):
+        """批量接收一段连续的消息
+
+        消息本身由 Storage 持有, 这里只在一次遍历中计算时间分隔,
+        最后统一更新滚动范围并滚动一次.
 
-    async def on_state_change(self, event: "StateChange[Tuple[MessageEvent, ...]]"):
-        await self.on_new_message(event.data)
+        Args:
+            messages: 按顺序排列的连续消息
+            seq: 第一条消息在场景聊天记录中的序号
+            evicted: 自上次接收以来从聊天记录开头淘汰的消息
+        """
+        start = timing.start()
+        history = self.chat.history
+        skip = max(self._next_seq, history.first_seq, seq) - seq
+        for index, message in enumerate(messages[skip:], seq + skip):
+            self._mark_timer(message, index)
+        self._next_seq = max(self._next_seq, seq + len(messages))
 
-    async def on_new_message(self, messages: Iterable["MessageEvent"]):
-        for message in messages:
-            await self.action_new_message(message)
+        first_seq = history.first_seq
+        count, self._first_seq = first_seq - self._first_seq, first_seq
+        for index in range(first_seq - count, first_seq):
+            if self._separators.pop(index, None) and self._older:
+                self._older_separators.add(self.chat.transcript_index(index))
+        self.evict_history(count, evicted)
+        timing.stop("mount", start)
+
+    def _layout_frame(self, width: int, height: int) -> List[Strip]:
+        lines = super()._layout_frame(width, height)
+        if self._unpainted_since:
+            timing.stop("first_paint", self._unpainted_since)
+            self._unpainted_since = 0
+        return lines
+
+    def get_paging(self) -> Optional[Tuple[int, int]]:
+        if self.chat.transcript is None:
+            return None
+        start = self.chat.transcript_index(self.chat.history.first_seq)
+        return start, self._page_floor
+
+    def read_older(self, start: int, stop: int) -> Sequence["MessageEvent"]:
+        """读取一页消息, 并计算页内的时间分隔"""
+        page = cast("Transcript", self.chat.transcript).read(start, stop)
+        last_msg = None
+        if self._older and start == self.older_end:
+            last_msg = self._older[-1]
+        last_time = last_msg and last_msg.time
+        for index, message in enumerate(page, start):
+            if needs_timer(message, last_msg, last_time):
+                self._older_separators.add(index)
+                last_time = message.time
+            last_msg = message
+        return page
+
+    def older_changed(self) -> None:
+        start, end = self._older_start, self.older_end
+        self._older_separators = {
+            index for index in self._older_separators if start <= index < end
+        }
 
     def action_clear_history(self):
         self.last_msg = None
         self.last_time = None
-        for msg in self.walk_children():
-            cast(Widget, msg).remove()
-        self.storage.chat_history.clear()
+        self.chat.clear()
+        self._separators.clear()
+        self.clear_older()
+        self._first_seq = self._next_seq = self.chat.history.next_seq
+        self._page_floor = self.chat.transcript_index(self._next_seq)
+        self.reset_items()
+
+    def get_history_count(self) -> int:
+        return len(self.chat.history)
+
+    def get_older_key(self, index: int) -> Hashable:
+        # 窗口与历史各自决定时间分隔, 消息在两者之间移动时分隔可能不同, 因此也计入缓存键
+        position = self._older_start + index
+        timer = position in self._older_separators
+        return position, timer, self.get_revision(self._older[index])
+
+    def get_history_key(self, index: int) -> Hashable:
+        history = self.chat.history
+        seq = history.first_seq + index
+        timer = self._separators.get(seq, False)
+        position = self.chat.transcript_index(seq)
+        return position, timer, self.get_revision(history[index])
+
+    def get_revision(self, message: "MessageEvent") -> Hashable:
+        """消息的版本, 引用的消息被编辑或撤回时同样改变"""
+        if message.reply is None:
+            return message.revision
+        quoted = self.storage.get_message(message.reply)
+        return message.revision, quoted.revision if quoted else -1
+
+    def render_older(self, index: int, width: int) -> List[Strip]:
+        timer = self._older_start + index in self._older_separators
+        return self.render_event(self._older[index], timer, width)
+
+    def render_history(self, index: int, width: int) -> List[Strip]:
+        history = self.chat.history
+        timer = self._separators.get(history.first_seq + index, False)
+        return self.render_event(history[index], timer, width)
+
+    def render_gap(self, count: int, width: int) -> List[Strip]:
+        return render_notice(
+            f"{count} more messages",
+            width,
+            self.get_component_rich_style("chat-history--notice"),
+        )
+
+    def render_event(
+        self, message: "MessageEvent", timer: bool, width: int
+    ) -> List[Strip]:
+        lines: List[Strip] = []
+        if timer:
+            lines.extend(render_timer(message.time, width))
+        if message.revoked:
+            lines.extend(
+                render_notice(
+                    f"{message.user.nickname} revoked a message",
+                    width,
+                    self.get_component_rich_style("chat-history--notice"),
+                )
+            )
+            return lines
+        quote = None
+        if message.reply is not None:
+            quote = render_quote(
+                self.storage.get_message(message.reply),
+                bubble_width(width),
+                self.get_component_rich_style("chat-history--quote"),
+            )
+        lines.extend(
+            render_message(message, width, self.get_bubble(message, width), quote)
+        )
+        return lines
+
+    def get_bubble(self, message: "MessageEvent", width: int) -> List[Strip]:
+        app = cast("Frontend", self.app)
+        max_width = bubble_width(width)
+        key = (message.msg_id, message.revision, max_width, app.dark)
+        bubble = app.bubble_cache.get(key)
+        if bubble is None:
+            start = timing.start()
+            bubble = app.bubble_cache[key] = render_bubble(
+                message.message,
+                max_width,
+                app.console,
+                app.console.options,
+                self.get_component_rich_style("chat-history--bubble"),
+            )
+            timing.stop("render", start)
+        return bubble
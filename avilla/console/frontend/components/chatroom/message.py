@@ -1,178 +1,125 @@
 from datetime import datetime
 from enum import Enum
+from typing import List, Optional, Tuple
 
-from rich.console import RenderableType
-from textual.widget import Widget
-from textual.widgets import Static
-
-from ...info import MessageEvent, User
-from ...utils import truncate
-
-
-class Timer(Widget):
-    DEFAULT_CSS = """
-    Timer {
-        layout: horizontal;
-        height: 1;
-        width: 100%;
-        align: center middle;
-    }
-    Timer > Static {
-        width: auto;
-    }
-    """
+from rich import box
+from rich.console import Console, ConsoleOptions
+from rich.panel import Panel
+from rich.segment import Segment
+from rich.style import Style
+from textual.strip import Strip
+
+from avilla.console.message import ConsoleMessage
+
+from ...info import MessageEvent
+from ...utils import LRUCache, truncate
 
-    def __init__(self, time: datetime):
-        super().__init__()
-        self.time = time
+AVATAR_WIDTH = 3
+MESSAGE_MAX_WIDTH = 0.65
+NICKNAME_MAX_LENGTH = 20
+BUBBLE_CACHE_SIZE = 512
 
-    def compose(self):
-        yield Static(self.time.strftime("%H:%M"))
+BubbleCache = LRUCache[Tuple[str, int, int, bool], List[Strip]]
+"""(msg_id, revision, 气泡可用宽度, 是否为暗色主题) -> 渲染好的气泡行"""
 
 
 class Side(str, Enum):
     LEFT = "left"
     RIGHT = "right"
 
+    @classmethod
+    def of(cls, event: "MessageEvent") -> "Side":
+        return cls.LEFT if event.user.id == event.self_id else cls.RIGHT
 
-class Message(Widget):
-    DEFAULT_CSS = """
-    Message {
-        layout: horizontal;
-        height: auto;
-        width: 100%;
-        align-vertical: top;
-        transition: offset 500ms out_cubic;
-    }
-    Message.left {
-        align-horizontal: left;
-    }
-    Message.right {
-        align-horizontal: right;
-    }
-
-    Message.left.-hidden {
-        offset-x: -100%;
-    }
-    Message.right.-hidden {
-        offset-x: 100%;
-    }
-    """
-
-    def __init__(self, event: "MessageEvent"):
-        self.event = event
-        self.side: Side = Side.LEFT if event.user.id == event.self_id else Side.RIGHT
-        super().__init__(
-            classes="left -hidden" if self.side == Side.LEFT else "right -hidden"
-        )
-
-    def compose(self):
-        if self.side == Side.LEFT:
-            yield MessageAvatar(self.event.user)
-            yield MessageInfo(self.event.user.nickname, self.event.message, self.side)
-        else:
-            yield MessageInfo(self.event.user.nickname, self.event.message, self.side)
-            yield MessageAvatar(self.event.user)
-
-    def on_show(self):
-        self.remove_class("-hidden")
-
-
-class MessageAvatar(Widget):
-    DEFAULT_CSS = """
-    MessageAvatar {
-        layout: horizontal;
-        content-align: center middle;
-        text-align: center;
-        height: 1;
-        width: 3;
-    }
-    """
 
-    def __init__(self, user: User):
-        super().__init__()
-        self.user = user
-
-    def render(self):
-        return self.user.avatar
-
-
-class MessageInfo(Widget):
-    DEFAULT_CSS = """
-    $message-max-width: 65%;
-
-    MessageInfo {
-        layout: vertical;
-        height: auto;
-        width: 100%;
-        max-width: $message-max-width;
-    }
-    MessageInfo > Static {
-        height: 1;
-        width: 100%;
-        overflow: hidden;
-        margin: 0 1;
-    }
-    MessageInfo.left > Static {
-        text-align: left;
-    }
-    MessageInfo.right > Static {
-        text-align: right;
-    }
-    """
+def render_timer(time: datetime, width: int) -> List[Strip]:
+    label = time.strftime("%H:%M")
+    return [Strip([Segment(" " * max((width - len(label)) // 2, 0)), Segment(label)])]
 
-    def __init__(self, nickname: str, renderable: RenderableType, side: Side):
-        super().__init__(classes="left" if side == Side.LEFT else "right")
-        self.nickname = truncate(nickname, 20)
-        self.bubble = BubbleWrapper(renderable, side)
-
-    def compose(self):
-        yield Static(self.nickname)
-        yield self.bubble
-
-
-class BubbleWrapper(Widget):
-    DEFAULT_CSS = """
-    BubbleWrapper {
-        height: auto;
-        width: 100%;
-        align-vertical: top;
-    }
-    BubbleWrapper.left {
-        align-horizontal: left;
-    }
-    BubbleWrapper.right {
-        align-horizontal: right;
-    }
-    """
 
-    def __init__(self, renderable: RenderableType, side: Side):
-        super().__init__(classes="left" if side == Side.LEFT else "right")
-        self.renderable = renderable
-
-    def compose(self):
-        yield Bubble(self.renderable)
-
-
-class Bubble(Widget):
-    DEFAULT_CSS = """
-    $bubble-border-type: round;
-    $bubble-border-color: rgba(170, 170, 170, 0.7);
-    $bubble-border: $bubble-border-type $bubble-border-color;
-
-    Bubble {
-        height: auto;
-        width: auto;
-        min-height: 1;
-        max-width: 100%;
-        padding: 0 1;
-        border: $bubble-border;
-    }
+def render_notice(text: str, width: int, style: Style) -> List[Strip]:
+    """居中显示的提示, 如消息被撤回"""
+    text = truncate(text, max(width, 4))
+    return [
+        Strip(
+            [Segment(" " * max((width - len(text)) // 2, 0)), Segment(text, style)]
+        )
+    ]
+
+
+def render_quote(quoted: Optional["MessageEvent"], width: int, style: Style) -> Strip:
+    """气泡上方的引用行, 原消息已不在历史中时只显示占位"""
+    if quoted is None:
+        text = "↪ message unavailable"
+    elif quoted.revoked:
+        text = "↪ message revoked"
+    else:
+        content = " ".join("".join(map(str, quoted.message)).split())
+        text = f"↪ {quoted.user.nickname}: {content}"
+    return Strip([Segment(truncate(text, max(width, 4)), style)])
+
+
+def bubble_width(width: int) -> int:
+    """消息气泡最多可占用的宽度"""
+    return max(min(int(width * MESSAGE_MAX_WIDTH), width - AVATAR_WIDTH), 5)
+
+
+def render_bubble(
+    message: ConsoleMessage,
+    width: int,
+    console: Console,
+    options: ConsoleOptions,
+    style: Style,
+) -> List[Strip]:
+    bubble = Panel(
+        message,
+        box=box.ROUNDED,
+        expand=False,
+        padding=(0, 1),
+        border_style=style,
+    )
+    return Strip.from_lines(
+        console.render_lines(bubble, options.update_width(width), pad=False)
+    )
+
+
+def render_message(
+    event: "MessageEvent",
+    width: int,
+    bubble_lines: List[Strip],
+    quote: Optional[Strip] = None,
+) -> List[Strip]:
+    """按聊天气泡的样式把消息排版为行
+
+    布局与头像, 昵称, 气泡的组件布局一致: 机器人消息靠左, 用户消息靠右,
+    气泡由 `render_bubble` 以 `bubble_width` 的宽度预先渲染, 引用行 (`render_quote`) 位于气泡上方.
     """
-
-    def __init__(self, renderable: RenderableType):
-        super().__init__()
-        self.renderable = renderable
-
-    def render(self):
-        return self.renderable
+    if quote is not None:
+        bubble_lines = [quote, *bubble_lines]
+    side = Side.of(event)
+    avatar = Strip([Segment(event.user.avatar)]).adjust_cell_length(AVATAR_WIDTH)
+    nickname = Strip([Segment(truncate(event.user.nickname, NICKNAME_MAX_LENGTH))])
+
+    if side == Side.LEFT:
+        lines = [Strip.join([avatar, Strip.blank(1), nickname])]
+        lines.extend(
+            Strip.join([Strip.blank(AVATAR_WIDTH), line]) for line in bubble_lines
+        )
+        return lines
+
+    offset = width - AVATAR_WIDTH
+    lines = [
+        Strip.join(
+            [
+                Strip.blank(max(offset - 1 - nickname.cell_length, 0)),
+                nickname,
+                Strip.blank(1),
+                avatar,
+            ]
+        )
+    ]
+    lines.extend(
+        Strip.join([Strip.blank(max(offset - line.cell_length, 0)), line])
+        for line in bubble_lines
+    )
+    return lines
@@ -49,6 +49,9 @@ class Toolbar(Widget):
         self.settings_button = Action("⚙️", id="settings", classes="right mr")
         self.log_button = Action("📝", id="log", classes="right")
 
+    def set_title(self, title: str):
+        self.center_title.update(title)
+
     def compose(self):
         yield self.exit_button
         yield self.clear_button
@@ -66,7 +69,7 @@ class Toolbar(Widget):
             history = cast("ChatHistory", self.app.query_one("ChatHistory"))
             history.action_clear_history()
         elif event.action == self.settings_button:
-            ...
+            self.post_message(RouteChange("stats"))  # noqa
         elif event.action == self.log_button:
             view = cast("HorizontalView", self.app.query_one("HorizontalView"))
             if view.can_show_log:
@@ -0,0 +1,227 @@
+from abc import abstractmethod
+from typing import Generic, Hashable, List, Optional, Sequence, Tuple, TypeVar
+
+from textual.events import MouseScrollUp
+from textual.strip import Strip
+
+from .virtual import VirtualList
+
+T = TypeVar("T")
+
+
+class PagedList(VirtualList, Generic[T]):
+    """在内存中的历史之前, 按页显示持久化记录的滚动列表
+
+    条目依次为: 已载入的记录 (窗口), 窗口与历史不相接时的一个缺口条目, 历史中的条目.
+    窗口在持久化记录中总是连续的, 至多保留 `max_paged` 条:
+    向上翻页超出时丢弃靠近历史的一端, 并留下缺口; 滚动到缺口时再从窗口末尾继续载入.
+    历史开头淘汰的记录在窗口与历史相接时直接接到窗口末尾, 不需要读取持久化记录.
+    """
+
+    page_size = 100
+    """每次载入的记录数"""
+    max_paged = 2000
+    """窗口中至多保留的记录数"""
+
+    def __init__(
+        self,
+        *,
+        name: Optional[str] = None,
+        id: Optional[str] = None,
+        classes: Optional[str] = None,
+    ) -> None:
+        super().__init__(name=name, id=id, classes=classes)
+        self._older: List[T] = []
+        # 窗口中第一条记录在持久化记录中的下标
+        self._older_start = 0
+        self._gapped = False
+        self._filling = False
+
+    @abstractmethod
+    def get_history_count(self) -> int:
+        """历史中的条目数"""
+
+    @abstractmethod
+    def get_history_key(self, index: int) -> Hashable:
+        """历史中条目的缓存键"""
+
+    @abstractmethod
+    def render_history(self, index: int, width: int) -> List[Strip]:
+        """按宽度渲染历史中的条目"""
+
+    @abstractmethod
+    def get_paging(self) -> Optional[Tuple[int, int]]:
+        """历史中第一条记录在持久化记录中的下标, 以及可以载入的最小下标
+
+        不能翻页时返回 None.
+        """
+
+    @abstractmethod
+    def read_older(self, start: int, stop: int) -> Sequence[T]:
+        """读取持久化记录中下标在 [start, stop) 内的记录"""
+
+    @abstractmethod
+    def render_older(self, index: int, width: int) -> List[Strip]:
+        """按宽度渲染窗口中的记录"""
+
+    @abstractmethod
+    def render_gap(self, count: int, width: int) -> List[Strip]:
+        """按宽度渲染缺口条目, `count` 为缺失的记录数"""
+
+    def get_older_key(self, index: int) -> Hashable:
+        """窗口中记录的缓存键, 默认为其在持久化记录中的下标"""
+        return self._older_start + index
+
+    def older_changed(self) -> None:
+        """窗口的范围改变后调用"""
+
+    @property
+    def older_end(self) -> int:
+        """窗口之后第一条记录在持久化记录中的下标"""
+        return self._older_start + len(self._older)
+
+    @property
+    def gap(self) -> int:
+        """窗口与历史之间未载入的记录数"""
+        paging = self.get_paging()
+        if not self._gapped or paging is None:
+            return 0
+        return paging[0] - self.older_end
+
+    def get_item_count(self) -> int:
+        return len(self._older) + self._gapped + self.get_history_count()
+
+    def get_item_key(self, index: int) -> Hashable:
+        older = len(self._older)
+        if index < older:
+            return self.get_older_key(index)
+        if self._gapped:
+            if index == older:
+                return "gap", self.older_end, self.gap
+            index -= 1
+        return self.get_history_key(index - older)
+
+    def render_item(self, index: int, width: int) -> List[Strip]:
+        older = len(self._older)
+        if index < older:
+            return self.render_older(index, width)
+        if self._gapped:
+            if index == older:
+                return self.render_gap(self.gap, width)
+            index -= 1
+        return self.render_history(index - older, width)
+
+    def get_item_lines(self, index: int, width: int) -> List[Strip]:
+        if self._gapped and index == len(self._older) and not self._filling:
+            # 缺口进入视口时补上缺失的记录
+            self._filling = True
+            self.call_after_refresh(self._fill_gap)
+        return super().get_item_lines(index, width)
+
+    def evict_history(self, count: int, evicted: Sequence[T] = ()) -> None:
+        """历史开头淘汰了 `count` 条记录后调用, 代替 `refresh_items(count)`
+
+        Args:
+            count: 淘汰的记录数
+            evicted: 被淘汰的记录, 与窗口相接时直接接到窗口末尾
+        """
+        older = len(self._older)
+        if count > 0 and older:
+            if not self._gapped and len(evicted) == count:
+                self._older.extend(evicted)
+                self._trim_head()
+            else:
+                if not self._gapped:
+                    self.insert_items(older, 1)
+                    self._gapped = True
+                self.remove_items(older + 1, count)
+            self.older_changed()
+            count = 0
+        self.refresh_items(count)
+
+    def clear_older(self) -> None:
+        """丢弃窗口与缺口, 之后需要调用 `refresh_items` 或 `reset_items`"""
+        self.remove_items(0, len(self._older) + self._gapped)
+        self._older.clear()
+        self._gapped = False
+        self.older_changed()
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        if round(new_value) == 0 and new_value < old_value:
+            self.call_after_refresh(self.action_load_older)
+
+    def on_mouse_scroll_up(self, event: MouseScrollUp):
+        if round(self.scroll_y) == 0:
+            self.action_load_older()
+
+    def action_load_older(self):
+        """在窗口之前载入一页记录, 并保持当前视口位置"""
+        paging = self.get_paging()
+        if paging is None:
+            return
+        stop, floor = paging
+        if self._older:
+            stop = self._older_start
+        start = max(stop - self.page_size, floor, 0)
+        if start >= stop:
+            return
+        page = self.read_older(start, stop)
+        if len(page) != stop - start:
+            return
+        self._older[:0] = page
+        self._older_start = start
+        self.insert_items(0, len(page))
+        cut = len(self._older) - self.max_paged
+        if cut > 0:
+            # 丢弃靠近历史的一端, 由缺口代替
+            del self._older[-cut:]
+            if not self._gapped:
+                self.insert_items(len(self._older) + cut, 1)
+                self._gapped = True
+            self.remove_items(len(self._older), cut)
+        self.older_changed()
+        self.refresh_items()
+
+    def _fill_gap(self) -> None:
+        self._filling = False
+        if not self._gapped:
+            return
+        paging = self.get_paging()
+        if paging is None:
+            self.clear_older()
+            self.refresh_items()
+            return
+        stop, floor = paging
+        older = len(self._older)
+        end = self.older_end
+        if stop - end > self.page_size and (self._sticky or self._top[0] >= older):
+            # 从下方接近缺口时, 换成紧接着历史的一页
+            start = max(stop - self.page_size, floor, 0)
+            page = self.read_older(start, stop)
+            self.remove_items(0, older + 1)
+            self._older[:] = page if len(page) == stop - start else ()
+            self._older_start = start
+            self._gapped = False
+            self.insert_items(0, len(self._older))
+            self.older_changed()
+        else:
+            page = self.read_older(end, min(end + self.page_size, stop))
+            if not page or len(page) != min(self.page_size, stop - end):
+                self.clear_older()
+            else:
+                self._older.extend(page)
+                self.insert_items(older, len(page))
+                if self.older_end >= stop:
+                    self.remove_items(len(self._older), 1)
+                    self._gapped = False
+                self._trim_head()
+                self.older_changed()
+        self.refresh_items()
+
+    def _trim_head(self) -> None:
+        trim = len(self._older) - self.max_paged
+        if trim > 0:
+            del self._older[:trim]
+            self._older_start += trim
+            self.remove_items(0, trim)
@@ -0,0 +1,264 @@
+from abc import abstractmethod
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Hashable, List, Optional, Tuple
+
+from textual.events import Resize
+from textual.geometry import Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+from avilla.console import timing
+
+from ...utils import ABCMessagePumpMeta, LRUCache
+
+CACHE_SIZE = 1024
+
+
+class VirtualList(ScrollView, metaclass=ABCMessagePumpMeta):
+    """只渲染可视区域内条目的滚动列表
+
+    滚动以行为单位. 视口顶部的位置记录为 (条目下标, 条目内的行), 条目的高度在渲染时测得,
+    尚未渲染过的条目按 `estimated_height` 估计, 因此只有滚动条的比例依赖估计值,
+    逐行滚动时经过的条目总会先被渲染, 高于视口的条目也能完整地滚动浏览.
+    条目按宽度渲染后的行会被缓存, 改变尺寸或重新挂载时只需要重新排版可见的条目.
+    当滚动到底部时视图会吸附在最新的条目上, 新条目到来时不会重新排版历史.
+    """
+
+    DEFAULT_CSS = """
+    VirtualList {
+        overflow-x: hidden;
+        overflow-y: scroll;
+    }
+    """
+
+    estimated_height = 1
+    """尚未渲染过的条目的估计高度"""
+
+    def __init__(
+        self,
+        *,
+        cache_size: int = CACHE_SIZE,
+        name: Optional[str] = None,
+        id: Optional[str] = None,
+        classes: Optional[str] = None,
+    ) -> None:
+        super().__init__(name=name, id=id, classes=classes)
+        self._line_cache: LRUCache[Tuple[Hashable, int], List[Strip]] = LRUCache(
+            cache_size
+        )
+        self._frame: List[Strip] = []
+        self._frame_key: Optional[Tuple] = None
+        self._version = 0
+        self._sticky = True
+        # 各条目在 _heights_width 宽度下的高度, 以及视口顶部所在的条目与行
+        self._heights: List[int] = []
+        self._heights_width = 0
+        self._top: Tuple[int, int] = (0, 0)
+        self._syncing = False
+
+    @abstractmethod
+    def get_item_count(self) -> int:
+        """条目总数"""
+
+    @abstractmethod
+    def get_item_key(self, index: int) -> Hashable:
+        """条目的缓存键, 内容改变时应随之改变"""
+
+    @abstractmethod
+    def render_item(self, index: int, width: int) -> List[Strip]:
+        """按宽度渲染一个条目"""
+
+    @property
+    def is_sticky(self) -> bool:
+        return self._sticky
+
+    def get_item_lines(self, index: int, width: int) -> List[Strip]:
+        key = (self.get_item_key(index), width)
+        lines = self._line_cache.get(key)
+        if lines is None:
+            lines = self._line_cache[key] = self.render_item(index, width)
+        if width == self._heights_width and index < len(self._heights):
+            self._heights[index] = len(lines)
+        return lines
+
+    def refresh_items(self, evicted: int = 0, prepended: int = 0) -> None:
+        """条目发生变化后调用, 只更新滚动范围而不重新排版历史
+
+        未吸附底部时, 视口保持在原来的条目上.
+
+        Args:
+            evicted: 自上次调用以来从头部淘汰的条目数
+            prepended: 自上次调用以来插入到头部的条目数, 在淘汰之后计算
+        """
+        self.remove_items(0, evicted)
+        self.insert_items(0, prepended)
+        self._version += 1
+        self._fit_heights()
+        self._sync_scroll()
+        if self._sticky:
+            self.scroll_end(animate=False)
+        self.refresh()
+
+    def insert_items(self, index: int, count: int) -> None:
+        """在 `index` 处插入了 `count` 个条目, 之后需要调用 `refresh_items`"""
+        if count <= 0:
+            return
+        self._heights[index:index] = [self.estimated_height] * count
+        top, offset = self._top
+        if top >= index:
+            self._top = (top + count, offset)
+
+    def remove_items(self, index: int, count: int) -> None:
+        """移除了从 `index` 开始的 `count` 个条目, 之后需要调用 `refresh_items`
+
+        视口顶部的条目被移除时, 视口停在被移除的条目之后的条目上.
+        """
+        if count <= 0:
+            return
+        del self._heights[index : index + count]
+        top, offset = self._top
+        if top >= index + count:
+            self._top = (top - count, offset)
+        elif top >= index:
+            self._top = (index, 0)
+
+    def reset_items(self) -> None:
+        """条目整体被替换后调用, 丢弃已测得的高度并吸附到底部"""
+        self._heights.clear()
+        self._top = (0, 0)
+        self._sticky = True
+        self.refresh_items()
+
+    def clear_cache(self) -> None:
+        self._line_cache.clear()
+        self._version += 1
+        self.refresh()
+
+    def notify_style_update(self) -> None:
+        super().notify_style_update()
+        self.clear_cache()
+
+    def on_resize(self, event: Resize) -> None:
+        self._sync_scroll()
+        if self._sticky:
+            self.scroll_end(animate=False)
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        if self._syncing or not self._heights_width:
+            return
+        line = round(new_value)
+        if line >= self.max_scroll_y:
+            self._sticky = True
+            self.refresh()
+            return
+        height = max(self.scrollable_content_region.height, 1)
+        delta = line - self._line_of(self._top)
+        if abs(delta) <= height * 2:
+            # 逐行移动时依次渲染经过的条目, 位置不受估计高度的影响
+            self._move(delta)
+        else:
+            self._top = self._locate(line)
+        self._sticky = False
+        self._sync_scroll()
+        self.refresh()
+
+    def _fit_heights(self) -> None:
+        """使高度表与条目数一致, 新条目位于末尾"""
+        count = self.get_item_count()
+        heights = self._heights
+        if len(heights) < count:
+            heights.extend([self.estimated_height] * (count - len(heights)))
+        else:
+            del heights[count:]
+
+    def _measure(self, index: int) -> int:
+        return len(self.get_item_lines(index, self._heights_width))
+
+    def _line_of(self, top: Tuple[int, int]) -> int:
+        index, offset = top
+        return sum(self._heights[:index]) + offset
+
+    def _locate(self, line: int) -> Tuple[int, int]:
+        """按当前的高度表找到第 `line` 行所在的条目"""
+        ends = list(accumulate(self._heights))
+        index = bisect_right(ends, line)
+        if index >= len(ends):
+            return len(ends), 0
+        offset = line - (ends[index - 1] if index else 0)
+        return index, min(offset, max(self._measure(index) - 1, 0))
+
+    def _move(self, delta: int) -> None:
+        index, offset = self._top
+        count = len(self._heights)
+        offset += delta
+        while offset < 0 and index > 0:
+            index -= 1
+            offset += self._measure(index)
+        offset = max(offset, 0)
+        while index < count:
+            height = self._measure(index)
+            if offset < height:
+                break
+            offset -= height
+            index += 1
+        self._top = (index, offset)
+
+    def _sync_scroll(self) -> None:
+        """按测得的高度更新滚动范围与滚动条位置, 不触发重新定位"""
+        self._syncing = True
+        try:
+            total = sum(self._heights)
+            if self.virtual_size.height != total:
+                self.virtual_size = Size(0, total)
+            line = self.max_scroll_y
+            if not self._sticky:
+                line = min(self._line_of(self._top), line)
+            self.scroll_target_y = self.scroll_y = line
+        finally:
+            self._syncing = False
+
+    def _layout_frame(self, width: int, height: int) -> List[Strip]:
+        if width != self._heights_width:
+            # 宽度改变后, 已测得的高度全部失效
+            self._heights_width = width
+            self._heights.clear()
+        self._fit_heights()
+        count = len(self._heights)
+        lines: List[Strip] = []
+        if not self._sticky:
+            index, offset = self._top
+            while index < count and len(lines) < offset + height:
+                lines.extend(self.get_item_lines(index, width))
+                index += 1
+            if len(lines) >= offset + height:
+                return lines[offset : offset + height]
+        # 吸附底部, 或剩余的行不足一屏时, 从最后一个条目向上排版
+        lines = []
+        index = count - 1
+        while index >= 0 and len(lines) < height:
+            lines = self.get_item_lines(index, width) + lines
+            index -= 1
+        self._top = (index + 1, max(len(lines) - height, 0))
+        self._sticky = True
+        return lines[-height:] if height else []
+
+    def render_line(self, y: int) -> Strip:
+        region = self.scrollable_content_region
+        key = (self._top, self._sticky, region.size, self._version)
+        if key != self._frame_key:
+            start = timing.start()
+            self._frame = self._layout_frame(region.width, region.height)
+            # 排版时测得的高度可能与估计值不同, 重新计算滚动范围
+            self._sync_scroll()
+            self._frame_key = (self._top, self._sticky, region.size, self._version)
+            timing.stop("layout", start)
+        width = self.size.width
+        if y >= len(self._frame):
+            return Strip.blank(width, self.rich_style)
+        return (
+            self._frame[y]
+            .adjust_cell_length(width, self.rich_style)
+            .apply_style(self.rich_style)
+        )
@@ -1,17 +1,165 @@
-import asyncio
-from typing import TYPE_CHECKING, Iterable, Tuple, cast
+from typing import TYPE_CHECKING, Hashable, List, Optional, Sequence, Tuple, cast
 
 from rich.console import RenderableType
+from rich.text import Text
+from textual.binding import Binding
 from textual.events import Unmount
+from textual.reactive import Reactive
+from textual.strip import Strip
 from textual.widget import Widget
-from textual.widgets import TextLog
+
+from ...storage import LogFilter
+from ..general.paged import PagedList
+from .filter import LogFilterBar
+
+PAGE_SIZE = 200
+MAX_PAGED_LOGS = 2000
 
 if TYPE_CHECKING:
     from ...app import Frontend
     from ...storage import StateChange, Storage
 
 
-MAX_LINES = 1000
+class LogOutput(PagedList[RenderableType]):
+    """直接读取 `Storage.log_history` 的日志视图
+
+    设置筛选条件时通过 `Storage.log_index` 查出满足条件的日志的序号, 之后新写入的日志逐条比对后追加,
+    被淘汰的日志从开头移除. 渲染结果按序号缓存, 切换条件时已经渲染过的日志不会重新渲染.
+
+    未筛选时滚动到顶部会从 `Storage.log_spill` 中按页载入更早的日志, 至多保留 `MAX_PAGED_LOGS` 条;
+    之后被淘汰的日志随通知送达, 直接接到已载入的日志之后, 不需要读取磁盘.
+    """
+
+    DEFAULT_CSS = """
+    LogOutput {
+        background: $surface;
+        color: $text;
+    }
+    LogOutput > .log-output--gap {
+        color: rgba(170, 170, 170, 0.7);
+        text-style: italic;
+    }
+    """
+
+    COMPONENT_CLASSES = {"log-output--gap"}
+
+    page_size = PAGE_SIZE
+    max_paged = MAX_PAGED_LOGS
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._first_seq = 0
+        self._next_seq = 0
+        self._filter = LogFilter()
+        # 筛选时, 满足条件的日志的序号; 其中 _start 之前的已被淘汰
+        self._matches: List[int] = []
+        self._start = 0
+
+    @property
+    def storage(self) -> "Storage":
+        return cast("Frontend", self.app).storage
+
+    @property
+    def log_filter(self) -> LogFilter:
+        return self._filter
+
+    def on_mount(self):
+        history = self.storage.log_history
+        self._first_seq = history.first_seq
+        self._next_seq = history.next_seq
+        self.refresh_items()
+
+    def set_filter(self, log_filter: LogFilter) -> None:
+        """切换筛选条件, 并滚动到最新的日志"""
+        if log_filter == self._filter:
+            return
+        self._filter = log_filter
+        self._matches = self.storage.log_index.query(log_filter) if log_filter else []
+        self._start = 0
+        self._next_seq = self.storage.log_history.next_seq
+        self.clear_older()
+        self.reset_items()
+
+    def on_log(self, evicted: Sequence[RenderableType] = ()) -> None:
+        """日志写入后调用
+
+        Args:
+            evicted: 自上次通知以来被淘汰的日志, 见 `StateChange.evicted`
+        """
+        history = self.storage.log_history
+        first_seq = history.first_seq
+        if not self._filter:
+            count, self._first_seq = first_seq - self._first_seq, first_seq
+            self._next_seq = history.next_seq
+            self.evict_history(count, evicted)
+            return
+        self._first_seq = first_seq
+        matches, start = self._matches, self._start
+        while start < len(matches) and matches[start] < first_seq:
+            start += 1
+        count = start - self._start
+        if start > len(matches) // 2:
+            del matches[:start]
+            start = 0
+        self._start = start
+        seq = max(self._next_seq, first_seq)
+        for log in history.since(seq):
+            if self._filter.matches(log):
+                matches.append(seq)
+            seq += 1
+        self._next_seq = history.next_seq
+        self.refresh_items(count)
+
+    def get_paging(self) -> Optional[Tuple[int, int]]:
+        spill = self.storage.log_spill
+        if spill is None or self._filter:
+            return None
+        return self.storage.spill_index(self.storage.log_history.first_seq), spill.first
+
+    def read_older(self, start: int, stop: int) -> Sequence[RenderableType]:
+        spill = self.storage.log_spill
+        return spill.read(start, stop) if spill is not None else ()
+
+    def get_history_count(self) -> int:
+        if self._filter:
+            return len(self._matches) - self._start
+        return len(self.storage.log_history)
+
+    def get_history_key(self, index: int) -> Hashable:
+        # 以淘汰日志的记录中的下标为键, 载入的旧日志与历史中的日志不会冲突
+        if self._filter:
+            return self.storage.spill_index(self._matches[self._start + index])
+        return self.storage.spill_index(self.storage.log_history.first_seq + index)
+
+    def render_history(self, index: int, width: int) -> List[Strip]:
+        history = self.storage.log_history
+        if self._filter:
+            log = history.get(self._matches[self._start + index])
+        else:
+            log = history[index]
+        return self.render_log(log, width)
+
+    def render_older(self, index: int, width: int) -> List[Strip]:
+        return self.render_log(self._older[index], width)
+
+    def render_gap(self, count: int, width: int) -> List[Strip]:
+        return self.render_log(
+            Text(
+                f"{count} more logs",
+                style=self.get_component_rich_style("log-output--gap"),
+                justify="center",
+            ),
+            width,
+        )
+
+    def render_log(self, renderable: RenderableType, width: int) -> List[Strip]:
+        if isinstance(renderable, str):
+            renderable = Text.from_markup(renderable)
+        console = self.app.console
+        lines = console.render_lines(
+            renderable, console.options.update_width(width), pad=False
+        )
+        return Strip.from_lines(lines)
 
 
 class LogPanel(Widget):
@@ -20,7 +168,14 @@ class LogPanel(Widget):
         layout: vertical;
         background: rgba(40, 44, 52, 1);
     }
-    LogPanel > TextLog {
+    LogPanel > LogFilterBar {
+        dock: top;
+        display: none;
+    }
+    LogPanel > LogFilterBar.-show {
+        display: block;
+    }
+    LogPanel > LogOutput {
         padding: 0 1;
         background: rgba(40, 44, 52, 1);
         min-width: 60 !important;
@@ -28,28 +183,44 @@ class LogPanel(Widget):
     }
     """
 
+    BINDINGS = [Binding("ctrl+f", "toggle_filter", "Filter logs")]
+
+    show_filter: Reactive[bool] = Reactive(False)
+
     def __init__(self) -> None:
         super().__init__()
 
-        self.output = TextLog(max_lines=MAX_LINES, min_width=60, wrap=True, markup=True)
+        self.filter_bar = LogFilterBar()
+        self.output = LogOutput()
 
     @property
     def storage(self) -> "Storage":
         return cast("Frontend", self.app).storage
 
     def compose(self):
+        yield self.filter_bar
         yield self.output
 
+    def watch_show_filter(self, show_filter: bool):
+        self.filter_bar.set_class(show_filter, "-show")
+        # 隐藏筛选栏时显示全部日志, 再次打开时恢复之前的条件
+        log_filter = self.filter_bar.log_filter if show_filter else LogFilter()
+        self.output.set_filter(log_filter)
+        if show_filter:
+            self.filter_bar.text_input.focus()
+
+    def action_toggle_filter(self):
+        self.show_filter = not self.show_filter  # type: ignore
+
+    def on_log_filter_bar_changed(self, event: LogFilterBar.Changed):
+        event.stop()
+        self.output.set_filter(event.log_filter)
+
     def on_mount(self):
-        self.on_log(self.storage.log_history)
         self.storage.add_log_watcher(self)
 
     def on_unmount(self, event: Unmount):
         self.storage.remove_log_watcher(self)
 
     def on_state_change(self, event: "StateChange[Tuple[RenderableType, ...]]") -> None:
-        self.on_log(event.data)
-
-    def on_log(self, logs: Iterable[RenderableType]) -> None:
-        for log in logs:
-            self.output.write(log)
+        self.output.on_log(event.evicted)
@@ -0,0 +1,102 @@
+from textual.binding import Binding
+from textual.message import Message
+from textual.widget import Widget
+from textual.widgets import Input
+
+from ...storage import LogFilter
+from ..general.action import Action
+
+LEVELS = [
+    ("ALL", 0),
+    ("TRACE", 5),
+    ("DEBUG", 10),
+    ("INFO", 20),
+    ("SUCCESS", 25),
+    ("WARNING", 30),
+    ("ERROR", 40),
+    ("CRITICAL", 50),
+]
+
+
+class LogFilterBar(Widget):
+    DEFAULT_CSS = """
+    $input-background: rgba(0, 0, 0, 0);
+    $input-border-type: round;
+    $input-border-color: rgba(170, 170, 170, 0.7);
+    $input-border-active-color: $accent;
+    $input-border: $input-border-type $input-border-color;
+    $input-border-active: $input-border-type $input-border-active-color;
+
+    LogFilterBar {
+        layout: horizontal;
+        height: auto;
+        width: 100%;
+    }
+
+    LogFilterBar > Action {
+        width: 12;
+        height: 3;
+        content-align: center middle;
+        border: $input-border;
+    }
+    LogFilterBar > Input {
+        padding: 0 1;
+        background: $input-background;
+        border: $input-border !important;
+    }
+    LogFilterBar > Input:focus {
+        border: $input-border-active !important;
+    }
+    LogFilterBar > #text {
+        width: 1fr;
+    }
+    LogFilterBar > #module {
+        width: 30;
+    }
+    """
+
+    BINDINGS = [
+        Binding("escape", "blur", "Reset focus", show=False),
+    ]
+
+    class Changed(Message, bubble=True):
+        """筛选条件改变"""
+
+        def __init__(self, log_filter: LogFilter) -> None:
+            super().__init__()
+            self.log_filter = log_filter
+
+    def __init__(self):
+        super().__init__()
+        self.level_button = Action(LEVELS[0][0], id="level")
+        self.text_input = Input(placeholder="Search", id="text")
+        self.module_input = Input(placeholder="Module", id="module")
+        self._level = 0
+
+    @property
+    def log_filter(self) -> LogFilter:
+        return LogFilter(
+            level=LEVELS[self._level][1],
+            module=self.module_input.value.strip(),
+            text=self.text_input.value,
+        )
+
+    def compose(self):
+        yield self.level_button
+        yield self.text_input
+        yield self.module_input
+
+    def on_action_pressed(self, event: Action.Pressed):
+        event.stop()
+        if event.action == self.level_button:
+            self._level = (self._level + 1) % len(LEVELS)
+            self.level_button.update(LEVELS[self._level][0])
+            self.post_message(LogFilterBar.Changed(self.log_filter))
+
+    def on_input_changed(self, event: Input.Changed):
+        event.stop()
+        self.post_message(LogFilterBar.Changed(self.log_filter))
+
+    def action_blur(self):
+        if self.app.focused is not None:
+            self.app.focused.blur()
@@ -1,9 +1,14 @@
+from typing import TYPE_CHECKING, cast
+
 from textual.widget import Widget
 from textual.widgets import Static
 
 from ...router import RouteChange
 from ..general.action import Action
 
+if TYPE_CHECKING:
+    from . import LogPanel
+
 
 class Toolbar(Widget):
     DEFAULT_CSS = """
@@ -51,4 +56,5 @@ class Toolbar(Widget):
         if event.action == self.back_button:
             self.post_message(RouteChange("main"))
         elif event.action == self.settings_button:
-            ...
+            panel = cast("LogPanel", self.app.query_one("LogPanel"))
+            panel.action_toggle_filter()
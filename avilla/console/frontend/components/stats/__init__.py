@@ -0,0 +1,172 @@
+import asyncio
+from typing import TYPE_CHECKING, Optional, cast
+
+from rich.table import Table
+from rich.text import Text
+from textual.widget import Widget
+from textual.widgets import Static
+
+from avilla.console import timing
+
+from ...stats import STATS_INTERVAL, LoopProbe, Rate, estimate_size, format_bytes
+
+if TYPE_CHECKING:
+    from ...app import ConsoleApp
+    from ...dispatch import Dispatcher
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1e3:.1f} ms"
+
+
+def _frame_time(histogram: Optional[timing.Histogram]) -> str:
+    if histogram is None or not histogram.count:
+        return "-"
+    return (
+        f"p50 {histogram.percentile(50) / 1e6:.2f} ms, "
+        f"max {histogram.max / 1e6:.2f} ms"
+    )
+
+
+class StatsPanel(Widget):
+    """每隔 `STATS_INTERVAL` 秒刷新一次的运行状态
+
+    事件循环的延迟在刷新时探测, 显示的是上一次刷新时发出的探测结果.
+    面板打开期间开启 `avilla.console.timing` 以统计排版的耗时, 关闭时恢复.
+    """
+
+    DEFAULT_CSS = """
+    StatsPanel {
+        height: 100%;
+        padding: 1 2;
+        overflow-y: auto;
+        background: rgba(40, 44, 52, 1);
+    }
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.content = Static()
+        self._inbound = Rate()
+        self._outbound = Rate()
+        self._dispatched = Rate()
+        self._frames = Rate()
+        self._enabled_timing = False
+        # 上次刷新时 "layout" 阶段的副本, 只显示增量, 不清空其他使用者的记录
+        self._layout_baseline: Optional[timing.Histogram] = None
+        self._ui_probe: Optional[LoopProbe] = None
+        self._bot_probe: Optional[LoopProbe] = None
+
+    @property
+    def console_app(self) -> "ConsoleApp":
+        return cast("ConsoleApp", self.app)
+
+    @property
+    def dispatcher(self) -> Optional["Dispatcher"]:
+        """与机器人在同一进程中时可用"""
+        return getattr(self.app, "dispatcher", None)
+
+    def compose(self):
+        yield self.content
+
+    def on_mount(self):
+        app = self.console_app
+        self._inbound = Rate(app.storage.inbound)
+        self._outbound = Rate(app.storage.outbound)
+        dispatcher = self.dispatcher
+        self._dispatched = Rate(dispatcher.stats.processed if dispatcher else 0)
+        self._ui_probe = LoopProbe(asyncio.get_running_loop())
+        if app.bot_loop is not None:
+            self._bot_probe = LoopProbe(app.bot_loop)
+        self._frames = Rate(app.frames)
+        if not timing.enabled:
+            timing.enable()
+            self._enabled_timing = True
+        self._layout_times()
+        self.refresh_stats()
+        self.set_interval(STATS_INTERVAL, self.refresh_stats)
+
+    def on_unmount(self):
+        if self._enabled_timing:
+            timing.disable()
+            self._enabled_timing = False
+
+    def _layout_times(self) -> Optional[timing.Histogram]:
+        """自上次调用以来的排版耗时"""
+        histogram = timing.get("layout")
+        if histogram is None:
+            return None
+        baseline, self._layout_baseline = self._layout_baseline, histogram.copy()
+        return histogram.since(baseline) if baseline is not None else histogram
+
+    def refresh_stats(self) -> None:
+        app = self.console_app
+        storage = app.storage
+
+        table = Table.grid(padding=(0, 2))
+        table.add_column(style="bold", min_width=16)
+        table.add_column()
+
+        def section(title: str) -> None:
+            if table.row_count:
+                table.add_row()
+            table.add_row(Text(title, style="underline"))
+
+        section("Throughput")
+        table.add_row("inbound", f"{self._inbound.update(storage.inbound):.1f} msg/s")
+        table.add_row(
+            "outbound", f"{self._outbound.update(storage.outbound):.1f} msg/s"
+        )
+        dispatcher = self.dispatcher
+        if dispatcher is not None:
+            stats = dispatcher.stats
+            table.add_row(
+                "dispatched",
+                f"{self._dispatched.update(stats.processed):.1f} event/s",
+            )
+            table.add_row(
+                "dispatch queue", f"{dispatcher.depth} (max {stats.max_depth})"
+            )
+            table.add_row("dropped", str(stats.dropped))
+
+        section("Event loop")
+        if self._ui_probe is not None:
+            table.add_row("UI lag", _ms(self._ui_probe.lag))
+            self._ui_probe.probe()
+        table.add_row("UI tasks", str(len(asyncio.all_tasks())))
+        bot_loop = app.bot_loop
+        if self._bot_probe is not None and bot_loop is not None:
+            table.add_row("bot lag", _ms(self._bot_probe.lag))
+            self._bot_probe.probe()
+            table.add_row("bot tasks", str(len(asyncio.all_tasks(bot_loop))))
+
+        section("Frames")
+        table.add_row("frames", f"{self._frames.update(app.frames):.1f} /s")
+        table.add_row("layout", _frame_time(self._layout_times()))
+
+        section("Storage")
+        logs = storage.log_history
+        table.add_row(
+            "logs",
+            f"{len(logs)}/{logs.capacity}, ~{format_bytes(estimate_size(logs))}",
+        )
+        spill = storage.log_spill
+        if spill is not None:
+            table.add_row("spilled logs", f"{len(spill) - spill.first} on disk")
+        for scene in storage.scenes.values():
+            history = scene.history
+            table.add_row(
+                f"scene {scene.id}",
+                f"{len(history)}/{history.capacity}, "
+                f"~{format_bytes(estimate_size(history))}",
+            )
+        table.add_row(
+            "watchers",
+            f"chat {len(storage.chat_watchers)}, log {len(storage.log_watchers)}",
+        )
+        table.add_row("backlog", f"{storage.backlog} records")
+        bridge = getattr(app, "bridge", None)
+        if bridge is not None:
+            table.add_row("bridge backlog", f"{bridge.pending} callbacks")
+
+        self.content.update(table)
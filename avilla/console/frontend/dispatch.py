@@ -0,0 +1,181 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Awaitable, Callable, Deque, List, Optional, Tuple
+
+from loguru import logger
+
+from .info import Event
+
+DISPATCH_WORKERS = 4
+DISPATCH_QUEUE_SIZE = 256
+
+
+class DispatchPolicy(str, Enum):
+    """队列已满时的处理方式"""
+
+    BLOCK = "block"
+    """等待队列腾出空间, 把压力传回输入端"""
+    DROP = "drop"
+    """直接丢弃新的事件"""
+
+
+@dataclass
+class DispatchStats:
+    submitted: int = 0
+    dropped: int = 0
+    processed: int = 0
+    failed: int = 0
+    max_depth: int = 0
+    wait_total: float = 0.0
+    """事件在队列中等待的总时长 (秒)"""
+    wait_max: float = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        return self.wait_total / self.processed if self.processed else 0.0
+
+
+class Dispatcher:
+    """有界且保序的事件分发队列
+
+    事件按发送者分片到固定数量的 worker, 每个 worker 有自己的有界队列并依次处理,
+    因此同一发送者的事件按提交顺序处理, 不同发送者之间可以并发.
+    队列满时按 `policy` 等待或丢弃.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Event], Awaitable[None]],
+        *,
+        workers: int = DISPATCH_WORKERS,
+        queue_size: int = DISPATCH_QUEUE_SIZE,
+        policy: DispatchPolicy = DispatchPolicy.BLOCK,
+    ):
+        """
+        Args:
+            handler: 处理单个事件的协程函数
+            workers: worker 的数量
+            queue_size: 每个 worker 的队列容量, 至少为 1
+            policy: 队列已满时的处理方式
+        """
+        if queue_size < 1:
+            # asyncio.Queue 把 0 视为不限容量
+            raise ValueError(f"queue_size must be at least 1, got {queue_size}")
+        self.handler = handler
+        self.workers = max(workers, 1)
+        self.queue_size = queue_size
+        self.policy = DispatchPolicy(policy)
+        self.stats = DispatchStats()
+        self._queues: List["asyncio.Queue[Tuple[Event, float]]"] = []
+        self._tasks: List["asyncio.Task[None]"] = []
+        # submit_later 暂存的事件, 由 _feeder 依次提交
+        self._deferred: Deque[Event] = deque()
+        self._feeder: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    @property
+    def depth(self) -> int:
+        """当前排队中的事件数"""
+        return sum(queue.qsize() for queue in self._queues)
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._queues = [asyncio.Queue(self.queue_size) for _ in range(self.workers)]
+        self._tasks = [
+            asyncio.create_task(self._work(queue)) for queue in self._queues
+        ]
+
+    def close(self) -> None:
+        """停止所有 worker, 尚未处理的事件会被丢弃"""
+        for task in self._tasks:
+            task.cancel()
+        if self._feeder is not None:
+            self._feeder.cancel()
+            self._feeder = None
+        self._deferred.clear()
+        self._tasks.clear()
+        self._queues.clear()
+
+    def _queue_of(self, event: Event) -> "asyncio.Queue[Tuple[Event, float]]":
+        if not self._queues:
+            raise RuntimeError("dispatcher is not running")
+        return self._queues[hash(event.user.id) % len(self._queues)]
+
+    async def submit(self, event: Event) -> bool:
+        """提交一个事件, 返回是否被接受"""
+        queue = self._queue_of(event)
+        if self.policy == DispatchPolicy.BLOCK:
+            await queue.put((event, time.perf_counter()))
+        elif not self._put_nowait(queue, event):
+            return False
+        self._accepted()
+        return True
+
+    def submit_nowait(self, event: Event) -> bool:
+        """不等待地提交一个事件, 队列已满时总是丢弃"""
+        if not self._put_nowait(self._queue_of(event), event):
+            return False
+        self._accepted()
+        return True
+
+    def submit_later(self, event: Event) -> None:
+        """提交一个事件但不等待, 供不能被阻塞的调用方 (如界面) 使用
+
+        BLOCK 策略下事件按顺序暂存, 由单独的任务等待队列腾出空间后提交;
+        DROP 策略下等同于 `submit_nowait`.
+        """
+        if self.policy != DispatchPolicy.BLOCK:
+            self.submit_nowait(event)
+            return
+        self._queue_of(event)
+        self._deferred.append(event)
+        if self._feeder is None or self._feeder.done():
+            self._feeder = asyncio.create_task(self._feed())
+
+    async def _feed(self) -> None:
+        while self._deferred:
+            await self.submit(self._deferred[0])
+            self._deferred.popleft()
+
+    def _put_nowait(
+        self, queue: "asyncio.Queue[Tuple[Event, float]]", event: Event
+    ) -> bool:
+        try:
+            queue.put_nowait((event, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.stats.dropped += 1
+            logger.warning(f"dispatch queue is full, dropped {event.type} event")
+            return False
+        return True
+
+    def _accepted(self) -> None:
+        self.stats.submitted += 1
+        self.stats.max_depth = max(self.stats.max_depth, self.depth)
+
+    async def _work(self, queue: "asyncio.Queue[Tuple[Event, float]]") -> None:
+        while True:
+            event, enqueued = await queue.get()
+            wait = time.perf_counter() - enqueued
+            self.stats.wait_total += wait
+            self.stats.wait_max = max(self.stats.wait_max, wait)
+            try:
+                await self.handler(event)
+            except Exception as e:
+                self.stats.failed += 1
+                logger.exception(f"failed to dispatch {event.type} event: {e!r}")
+            finally:
+                self.stats.processed += 1
+                queue.task_done()
+
+    async def join(self, timeout: Optional[float] = None) -> None:
+        """等待当前排队的事件全部处理完毕"""
+        await asyncio.wait_for(
+            asyncio.gather(*(queue.join() for queue in self._queues)), timeout
+        )
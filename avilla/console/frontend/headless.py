@@ -0,0 +1,99 @@
+import asyncio
+from typing import TYPE_CHECKING, Optional, Union
+
+from textual.message import Message
+
+from avilla.console.element import Text
+from avilla.console.message import ConsoleMessage
+
+from .client import ConsoleClient
+from .info import MessageEvent, Robot, User
+from .storage import StateChange, Storage
+
+if TYPE_CHECKING:
+    from avilla.console.protocol import ConsoleProtocol
+
+
+class ReplyWatcher:
+    """收集机器人回复的 Storage 观察者"""
+
+    def __init__(self):
+        self.replies: "asyncio.Queue[MessageEvent]" = asyncio.Queue()
+
+    def post_message(self, message: Message) -> bool:
+        if isinstance(message, StateChange):
+            for event in message.data:
+                if isinstance(event.user, Robot):
+                    self.replies.put_nowait(event)
+        return True
+
+
+class HeadlessClient(ConsoleClient):
+    """不启动界面的控制台客户端
+
+    与 `Frontend` 共用 Storage, 事件投递与 `call` 的处理, 但不渲染任何内容, 也不重定向日志.
+    适合在没有终端的环境 (CI, 压测, 服务器) 中运行, 并通过 `send`, `receive` 与 `ask` 在进程内驱动机器人.
+    """
+
+    def __init__(self, protocol: "ConsoleProtocol"):
+        super().__init__(
+            protocol,
+            # 没有界面需要刷新, 每次写入都立即通知观察者, 让回复尽快送达
+            Storage(notify_interval=0, transcript_path=protocol.transcript),
+        )
+        self.watcher = ReplyWatcher()
+        self.bells = 0
+        self._exit: Optional[asyncio.Event] = None
+
+    def bell(self) -> None:
+        self.bells += 1
+
+    async def run_async(self):
+        """上线账号并运行, 直到调用 `exit`"""
+        self._exit = asyncio.Event()
+        self.storage.add_chat_watcher(self.watcher)
+        self.start_client()
+        try:
+            await self._exit.wait()
+        finally:
+            self.storage.remove_chat_watcher(self.watcher)
+            self.stop_client()
+
+    def exit(self):
+        if self._exit is not None:
+            self._exit.set()
+
+    async def send(
+        self,
+        message: Union[str, ConsoleMessage],
+        user: Optional[User] = None,
+        scene: Optional[str] = None,
+    ) -> MessageEvent:
+        """以用户的身份发送一条消息
+
+        Args:
+            message: 消息内容, 字符串会被当作纯文本
+            user: 发送者, 默认为 `Storage.current_user`
+            scene: 消息所在的场景, 默认为发送者的私聊
+        """
+        if isinstance(message, str):
+            message = ConsoleMessage([Text(message)])
+        return await self.inject_message(message, user, scene)
+
+    async def receive(self, timeout: Optional[float] = None) -> MessageEvent:
+        """等待机器人的下一条回复
+
+        回复按到达顺序排队, 之前未取走的回复会先被返回.
+        """
+        return await asyncio.wait_for(self.watcher.replies.get(), timeout)
+
+    async def ask(
+        self,
+        message: Union[str, ConsoleMessage],
+        user: Optional[User] = None,
+        scene: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> MessageEvent:
+        """发送一条消息并等待机器人的回复"""
+        await self.send(message, user, scene)
+        return await self.receive(timeout)
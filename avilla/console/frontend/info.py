@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Optional
 
 from avilla.console.message import ConsoleMessage
 
@@ -21,6 +22,21 @@ class Robot(User):
     nickname: str = field(default="Bot")
 
 
+DEFAULT_SCENE = "console"
+
+
+@dataclass(frozen=True, eq=True)
+class Scene:
+    """会话场景
+
+    私聊场景的 id 即对方用户的 id, 群聊场景中的消息可以来自任意用户.
+    """
+
+    id: str
+    name: str = field(default="Chat")
+    group: bool = field(default=False)
+
+
 @dataclass
 class Event:
     time: datetime
@@ -33,3 +49,9 @@ class Event:
 class MessageEvent(Event):
     msg_id: str
     message: ConsoleMessage
+    scene: str = field(default=DEFAULT_SCENE)
+    reply: Optional[str] = field(default=None)
+    """引用的消息 id"""
+    revision: int = field(default=0)
+    """消息被编辑或撤回的次数, 用于让渲染缓存失效"""
+    revoked: bool = field(default=False)
@@ -1,22 +1,206 @@
-from typing import TYPE_CHECKING, List
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Union
 
+from loguru import logger
 from rich.text import Text
 
 if TYPE_CHECKING:
+    from loguru import Message
+
     from .storage import Storage
 
+LOG_LEVEL: Union[str, int] = "TRACE"
+"""写入界面的日志的默认最低等级"""
+
+LEVEL_STYLES = {
+    "TRACE": "bold cyan",
+    "DEBUG": "bold blue",
+    "INFO": "bold",
+    "SUCCESS": "bold green",
+    "WARNING": "bold yellow",
+    "ERROR": "bold red",
+    "CRITICAL": "bold white on red",
+}
+
+
+class LogLine:
+    """一行重定向输出的原始字符串, ANSI 解析推迟到实际渲染时进行"""
+
+    __slots__ = ("raw", "_text")
+
+    def __init__(self, raw: str) -> None:
+        self.raw = raw
+        self._text: Optional[Text] = None
+
+    @property
+    def text(self) -> Text:
+        if self._text is None:
+            self._text = Text.from_ansi(self.raw, end="", tab_size=4)
+        return self._text
+
+    def __rich__(self) -> Text:
+        return self.text
+
+    def __str__(self) -> str:
+        return self.raw
+
+    def __repr__(self) -> str:
+        return f"LogLine({self.raw!r})"
+
+
+class LogRecord:
+    """一条 loguru 日志记录的字段, 样式推迟到实际渲染时才应用"""
+
+    __slots__ = (
+        "time",
+        "level",
+        "no",
+        "name",
+        "function",
+        "line",
+        "message",
+        "exception",
+    )
+
+    def __init__(
+        self,
+        time: datetime,
+        level: str,
+        no: int,
+        name: str,
+        function: str,
+        line: int,
+        message: str,
+        exception: Optional[str] = None,
+    ) -> None:
+        self.time = time
+        self.level = level
+        self.no = no
+        """等级的数值"""
+        self.name = name
+        """产生日志的模块"""
+        self.function = function
+        self.line = line
+        self.message = message
+        self.exception = exception
+        """格式化后的异常信息"""
+
+    @property
+    def location(self) -> str:
+        return f"{self.name}:{self.function}:{self.line}"
+
+    def __rich__(self) -> Text:
+        style = LEVEL_STYLES.get(self.level, "bold")
+        text = Text.assemble(
+            (self.time.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3], "green"),
+            " | ",
+            (f"{self.level:<8}", style),
+            " | ",
+            (self.location, "cyan"),
+            " - ",
+            (self.message, style),
+            end="",
+            tab_size=4,
+        )
+        if self.exception:
+            text.append("\n" + self.exception, "red")
+        return text
+
+    def __str__(self) -> str:
+        text = (
+            f"{self.time.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]} | {self.level:<8} | "
+            f"{self.location} - {self.message}"
+        )
+        return f"{text}\n{self.exception}" if self.exception else text
+
+    def __repr__(self) -> str:
+        return f"LogRecord({self.level}, {self.location}, {self.message!r})"
+
+
+class LogSink:
+    """把 loguru 的记录以 `LogRecord` 直接写入 Storage 的 sink
+
+    相比以文本 sink 输出带颜色的字符串, 再由界面解析 ANSI 转义序列, 这里只保存字段,
+    渲染时再按等级着色. 通过 `add_log_sink` 注册.
+    """
+
+    def __init__(
+        self,
+        storage: "Storage",
+        post: Optional[Callable[..., Any]] = None,
+    ) -> None:
+        """
+        Args:
+            storage: 写入日志的 Storage
+            post: Storage 属于另一个线程时, 用于把写入投递到该线程的函数, 如 `ThreadBridge.post`
+        """
+        self.storage = storage
+        self.post = post
+
+    def __call__(self, message: "Message") -> None:
+        record = message.record
+        # 格式为 "{message}", 其后是 loguru 追加的异常信息
+        exception = message[len(record["message"]) :].strip("\n") or None
+        log = LogRecord(
+            record["time"],
+            record["level"].name,
+            record["level"].no,
+            record["name"] or "",
+            record["function"],
+            record["line"],
+            record["message"],
+            exception,
+        )
+        if self.post is None:
+            self.storage.write_log(log)
+        else:
+            self.post(self.storage.write_log, log)
+
+
+def add_log_sink(
+    storage: "Storage",
+    level: Union[str, int] = LOG_LEVEL,
+    post: Optional[Callable[..., Any]] = None,
+) -> int:
+    """注册 `LogSink`, 低于 `level` 的日志由 loguru 直接过滤, 不会产生任何记录
+
+    Returns:
+        可用于 `logger.remove` 的 sink id
+    """
+    return logger.add(
+        LogSink(storage, post),
+        level=level,
+        format="{message}",
+        colorize=False,
+        diagnose=False,
+    )
+
 
 class FakeIO:
-    def __init__(self, storage: "Storage") -> None:
+    def __init__(
+        self,
+        storage: "Storage",
+        post: Optional[Callable[..., Any]] = None,
+    ) -> None:
+        """
+        Args:
+            storage: 写入日志的 Storage
+            post: Storage 属于另一个线程时, 用于把写入投递到该线程的函数, 如 `ThreadBridge.post`
+        """
         self.storage = storage
+        self.post = post
         self._buffer: List[str] = []
 
+    def _write_log(self, *lines: LogLine) -> None:
+        if self.post is None:
+            self.storage.write_log(*lines)
+        else:
+            self.post(self.storage.write_log, *lines)
+
     def isatty(self):
         return True
 
     def write(self, string: str) -> None:
-        self._buffer.append(string)
-
         # By default, `print` adds a "\n" suffix which results in a buffer
         # flush. You can choose a different suffix with the `end` parameter.
         # If you modify the `end` parameter to something other than "\n",
@@ -24,14 +208,20 @@ class FakeIO:
         # string you are printing contains a "\n", that will trigger
         # a flush after that string has been buffered, regardless of the value
         # of `end`.
-        if "\n" in string:
-            self.flush()
+        if "\n" not in string:
+            self._buffer.append(string)
+            return
 
-    def flush(self) -> None:
-        self._write_to_storage()
-        self._buffer.clear()
+        *lines, rest = string.split("\n")
+        if self._buffer:
+            self._buffer.append(lines[0])
+            lines[0] = "".join(self._buffer)
+            self._buffer.clear()
+        self._write_log(*map(LogLine, lines))
+        if rest:
+            self._buffer.append(rest)
 
-    def _write_to_storage(self) -> None:
-        self.storage.write_log(
-            Text.from_ansi("".join(self._buffer), end="", tab_size=4)
-        )
+    def flush(self) -> None:
+        if self._buffer:
+            self._write_log(LogLine("".join(self._buffer)))
+            self._buffer.clear()
@@ -0,0 +1,108 @@
+"""运行状态面板使用的测量工具
+
+这些测量只在面板刷新时 (每 `STATS_INTERVAL` 秒) 进行一次.
+面板打开期间另外开启 `avilla.console.timing`; 关闭后只剩下每帧一次计数与各埋点的一次判断.
+"""
+
+import asyncio
+import sys
+from time import perf_counter
+from typing import Any, Iterable, Sequence, Set
+
+STATS_INTERVAL = 1.0
+SIZE_SAMPLES = 16
+"""估算记录占用的内存时抽样的条数"""
+SIZE_DEPTH = 6
+
+
+class LoopProbe:
+    """测量事件循环的延迟, 即从投递一个回调到它被执行的时长
+
+    可以在任意线程中调用 `probe`; 上一次探测还未返回时, 延迟至少为已经等待的时长.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.lag = 0.0
+        """最近一次探测的延迟 (秒)"""
+        self._sent = 0.0
+        self._pending = False
+
+    def probe(self) -> None:
+        if self._pending:
+            self.lag = max(self.lag, perf_counter() - self._sent)
+            return
+        self._pending = True
+        self._sent = perf_counter()
+        try:
+            self.loop.call_soon_threadsafe(self._arrive)
+        except RuntimeError:
+            # 事件循环已经关闭
+            self._pending = False
+
+    def _arrive(self) -> None:
+        self.lag = perf_counter() - self._sent
+        self._pending = False
+
+
+class Rate:
+    """由单调递增的计数器计算每秒的增量"""
+
+    def __init__(self, value: int = 0):
+        self.value = value
+        self.time = perf_counter()
+
+    def update(self, value: int) -> float:
+        now = perf_counter()
+        elapsed, self.time = now - self.time, now
+        delta, self.value = value - self.value, value
+        return delta / elapsed if elapsed > 0 else 0.0
+
+
+def _children(obj: Any) -> Iterable[Any]:
+    if isinstance(obj, dict):
+        yield from obj.keys()
+        yield from obj.values()
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        yield from obj
+    else:
+        attrs = getattr(obj, "__dict__", None)
+        if attrs is not None:
+            yield attrs
+        for cls in type(obj).__mro__:
+            slots = getattr(cls, "__slots__", ())
+            for slot in (slots,) if isinstance(slots, str) else slots:
+                value = getattr(obj, slot, None)
+                if value is not None:
+                    yield value
+
+
+def deep_sizeof(obj: Any, seen: Set[int], depth: int = SIZE_DEPTH) -> int:
+    """近似计算对象及其引用的对象占用的字节数, `seen` 中的对象不会重复计算"""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if depth <= 0 or isinstance(obj, (str, bytes, int, float, type)):
+        return size
+    return size + sum(deep_sizeof(child, seen, depth - 1) for child in _children(obj))
+
+
+def estimate_size(records: Sequence[Any], samples: int = SIZE_SAMPLES) -> int:
+    """均匀抽取至多 `samples` 条记录, 按平均大小估算全部记录占用的字节数"""
+    count = len(records)
+    if not count:
+        return 0
+    step = max(count // samples, 1)
+    picked = range(0, count, step)
+    seen: Set[int] = set()
+    total = sum(deep_sizeof(records[index], seen) for index in picked)
+    return total * count // len(picked)
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
@@ -1,66 +1,481 @@
+import asyncio
+import itertools
+import time
 from dataclasses import dataclass, field
-from typing import Generic, List, TypeVar
+from pathlib import Path
+from typing import Dict, Generic, List, Optional, Protocol, Tuple, TypeVar, cast
 
+from loguru import logger
 from rich.console import RenderableType
 from textual.message import Message
-from textual.widget import Widget
 
-from ..info import MessageEvent, User
+from avilla.console import timing
+from avilla.console.message import ConsoleMessage
+
+from ..info import DEFAULT_SCENE, MessageEvent, Robot, Scene, User
+from .log_index import LogFilter as LogFilter
+from .log_index import LogIndex as LogIndex
+from .log_spill import LogSpill as LogSpill
+from .ring import RingBuffer as RingBuffer
+from .scene import ChatScene as ChatScene
+from .scene import MessageIndex as MessageIndex
+from .transcript import Transcript as Transcript
+from .transcript import TranscriptWriter as TranscriptWriter
+from .transcript import scene_path as scene_path
 
 MAX_LOG_RECORDS = 500
 MAX_MSG_RECORDS = 500
+MAX_SCENES = 64
+NOTIFY_INTERVAL = 1 / 60
 
 
 T = TypeVar("T")
 
 
 class StateChange(Message, Generic[T], bubble=False):
-    def __init__(self, data: T) -> None:
+    def __init__(
+        self,
+        data: T,
+        seq: int = -1,
+        scene: Optional[str] = None,
+        written: int = 0,
+        evicted: T = (),  # type: ignore
+    ) -> None:
         super().__init__()
         self.data = data
+        self.seq = seq
+        """data 中第一条记录在历史中的序号, 未知时为 -1"""
+        self.evicted = evicted
+        """自上次通知以来从历史开头淘汰的记录, 按淘汰顺序排列"""
+        self.scene = scene
+        """聊天记录所属的场景, 日志记录为 None"""
+        self.written = written
+        """开启 `timing` 时, 这批记录中最早一条的写入时刻 (`perf_counter_ns`), 否则为 0"""
+
+
+class MessageUpdate(Message, bubble=False):
+    """场景中已有的消息被编辑或撤回"""
+
+    def __init__(self, seqs: Tuple[int, ...], scene: str) -> None:
+        super().__init__()
+        self.seqs = seqs
+        """被修改的消息在场景历史中的序号"""
+        self.scene = scene
+
+
+class Watcher(Protocol):
+    """Storage 的观察者, 通常是一个组件"""
+
+    def post_message(self, message: Message) -> bool:
+        ...
 
 
 @dataclass
 class Storage:
     current_user: User = field(default_factory=lambda: User(id="console"))
+    current_scene: str = DEFAULT_SCENE
+    """界面中正在显示的场景"""
+
+    max_log_records: int = MAX_LOG_RECORDS
+    max_msg_records: int = MAX_MSG_RECORDS
+    """每个场景最多保留的消息数"""
+    notify_interval: float = NOTIFY_INTERVAL
+    """观察者通知的最短间隔 (秒), 间隔内的写入会合并为一批; 为 0 时每次写入立即通知"""
+
+    log_history: RingBuffer[RenderableType] = field(init=False)
+    log_watchers: List[Watcher] = field(default_factory=list)
+
+    scenes: Dict[str, ChatScene] = field(default_factory=dict, init=False)
+    max_scenes: int = MAX_SCENES
+    """同时保留的场景数, 超出时移除最久没有消息的临时场景"""
+    users: Dict[str, User] = field(default_factory=dict, init=False)
+    """出现过的用户"""
+    chat_watchers: List[Watcher] = field(default_factory=list)
 
-    log_history: List[RenderableType] = field(default_factory=list)
-    log_watchers: List[Widget] = field(default_factory=list)
+    transcript_path: Optional[Path] = None
+    """持久化聊天记录的目录, 每个场景保存在以场景 id 命名的子目录中 (见 `scene_path`)"""
+    transcript_writer: Optional[TranscriptWriter] = field(
+        default=None, init=False, repr=False
+    )
+    """各场景的持久化记录共用的写入线程"""
+    log_spill_path: Optional[Path] = None
+    """保存从 `log_history` 中淘汰的日志的目录, 为 None 时淘汰的日志直接丢弃"""
+    log_spill: Optional[LogSpill] = field(default=None, init=False, repr=False)
 
-    chat_history: List[MessageEvent] = field(default_factory=list)
-    chat_watchers: List[Widget] = field(default_factory=list)
+    message_index: MessageIndex = field(default_factory=dict, init=False, repr=False)
+    """仍在各场景历史中的消息的索引, 随历史一同淘汰"""
+
+    inbound: int = field(default=0, init=False)
+    """写入过的用户消息数"""
+    outbound: int = field(default=0, init=False)
+    """写入过的机器人消息数"""
+
+    _msg_ids: "itertools.count[int]" = field(
+        default_factory=lambda: itertools.count(1), init=False, repr=False
+    )
+    _msg_id_prefix: str = field(
+        default_factory=lambda: format(time.time_ns() // 1_000_000, "x"),
+        init=False,
+        repr=False,
+    )
+    # 由 `scene` 隐式创建的场景 -> 最后一次写入的时刻, 场景过多时按此移除
+    _transient: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _ticks: "itertools.count[int]" = field(
+        default_factory=itertools.count, init=False, repr=False
+    )
+    _log_index: Optional[LogIndex] = field(default=None, init=False, repr=False)
+    _log_notified: int = field(default=0, init=False, repr=False)
+    _log_evicted: List[RenderableType] = field(
+        default_factory=list, init=False, repr=False
+    )
+    _log_spill_base: int = field(default=0, init=False, repr=False)
+    _flush_handle: Optional[asyncio.TimerHandle] = field(
+        default=None, init=False, repr=False
+    )
+
+    def __post_init__(self):
+        self.log_history = RingBuffer(self.max_log_records)
+        if self.log_spill_path is not None:
+            self.log_spill = LogSpill(self.log_spill_path)
+            self._log_spill_base = len(self.log_spill)
+        if self.transcript_path is not None:
+            self.transcript_writer = TranscriptWriter()
+            self._migrate_transcript()
+        self.users[self.current_user.id] = self.current_user
+        self.add_scene(Scene(self.current_scene))
 
     def set_user(self, user: User):
         self.current_user = user
+        self.users[user.id] = user
+
+    def _migrate_transcript(self) -> None:
+        """把旧版本直接保存在 `transcript_path` 下的记录移入默认场景的目录"""
+        root = cast(Path, self.transcript_path)
+        files = sorted([*root.glob("*.seg"), *root.glob("*.idx")])
+        if not files:
+            return
+        target = scene_path(root, self.current_scene)
+        if target.exists():
+            logger.warning(f"ignored legacy console transcript in {root}")
+            return
+        target.mkdir(parents=True)
+        for file in files:
+            file.rename(target / file.name)
+        logger.info(f"moved legacy console transcript into {target}")
+
+    def add_scene(self, info: Scene) -> ChatScene:
+        """注册一个场景, 已存在时更新其信息; 注册过的场景不会因场景过多被移除"""
+        self._transient.pop(info.id, None)
+        scene = self.scenes.get(info.id)
+        if scene is not None:
+            scene.info = info
+            return scene
+        transcript = None
+        if self.transcript_path is not None:
+            transcript = Transcript(
+                scene_path(self.transcript_path, info.id),
+                writer=self.transcript_writer,
+            )
+        scene = self.scenes[info.id] = ChatScene(
+            info, self.max_msg_records, transcript, self.message_index
+        )
+        return scene
+
+    def scene(self, scene_id: str) -> ChatScene:
+        """获取场景, 不存在时创建以该 id 为对方用户的私聊场景
+
+        这样创建的场景是临时的: 场景数超过 `max_scenes` 时, 最久没有消息的临时场景会被移除.
+        """
+        scene = self.scenes.get(scene_id)
+        if scene is None:
+            user = self.users.get(scene_id)
+            scene = self.add_scene(
+                Scene(scene_id, user.nickname if user else scene_id)
+            )
+            self._transient[scene_id] = next(self._ticks)
+            self._evict_scenes(scene_id)
+        return scene
+
+    def remove_scene(self, scene_id: str) -> None:
+        """移除一个场景, 其消息从内存中移除, 持久化记录保留在磁盘上"""
+        scene = self.scenes.pop(scene_id)
+        self._transient.pop(scene_id, None)
+        scene.clear()
+        scene.close()
+
+    def _evict_scenes(self, keep: str) -> None:
+        """移除多出的临时场景, 当前场景与刚创建的场景 `keep` 除外"""
+        transient = self._transient
+        while len(self.scenes) > self.max_scenes:
+            idle = [id for id in transient if id not in (keep, self.current_scene)]
+            if not idle:
+                return
+            self.remove_scene(min(idle, key=transient.__getitem__))
+
+    def set_scene(self, scene_id: str) -> ChatScene:
+        scene = self.scene(scene_id)
+        self.current_scene = scene_id
+        return scene
+
+    def current_speaker(self) -> User:
+        """在界面中发言的用户: 私聊场景中为对方用户, 否则为 `current_user`"""
+        scene = self.scene(self.current_scene)
+        if scene.info.group or scene.id == self.current_user.id:
+            return self.current_user
+        return self.users.get(scene.id) or User(scene.id)
+
+    def scene_of(self, user: User) -> str:
+        """用户在当前界面中发言时所在的场景"""
+        if self.scene(self.current_scene).info.group:
+            return self.current_scene
+        return user.id
+
+    def next_msg_id(self) -> str:
+        """生成新的消息 id
+
+        以会话启动时间为前缀的单调递增计数, 因此与持久化记录中的旧消息也不会重复.
+        """
+        return f"{self._msg_id_prefix}-{next(self._msg_ids):x}"
+
+    def get_message(self, msg_id: str) -> Optional[MessageEvent]:
+        """按 id 查找仍在历史中的消息"""
+        entry = self.message_index.get(msg_id)
+        if entry is None:
+            return None
+        return entry[0].history.get(entry[1])
+
+    def _update_message(self, msg_id: str, **changes) -> Optional[MessageEvent]:
+        entry = self.message_index.get(msg_id)
+        if entry is None:
+            return None
+        scene = entry[0]
+        message = scene.update(msg_id, **changes)
+        if message is not None:
+            if self.chat_watchers:
+                self._schedule_flush()
+            else:
+                scene._updated.clear()
+        return message
+
+    def edit_message(
+        self, msg_id: str, message: ConsoleMessage
+    ) -> Optional[MessageEvent]:
+        """替换一条仍在历史中的消息的内容, 消息不存在时返回 None"""
+        return self._update_message(msg_id, message=message)
+
+    def revoke_message(self, msg_id: str) -> Optional[MessageEvent]:
+        """撤回一条仍在历史中的消息, 消息不存在时返回 None"""
+        return self._update_message(
+            msg_id, message=ConsoleMessage([]), revoked=True
+        )
+
+    def sync_message(self, message: MessageEvent) -> Optional[MessageEvent]:
+        """用来源中的同一条消息覆盖本地的副本, 包括 `revision`, 消息不存在时返回 None"""
+        return self._update_message(
+            message.msg_id,
+            message=message.message,
+            revoked=message.revoked,
+            revision=message.revision,
+        )
+
+    @property
+    def chat_history(self) -> RingBuffer[MessageEvent]:
+        """当前场景的聊天记录"""
+        return self.scene(self.current_scene).history
+
+    @property
+    def log_index(self) -> LogIndex:
+        """`log_history` 的索引, 用于筛选日志
+
+        第一次使用时才建立, 之后随写入与淘汰维护; 不筛选日志的 Storage 不需要为此付出开销.
+        """
+        if self._log_index is None:
+            self._log_index = LogIndex(self.log_history)
+        return self._log_index
+
+    def spill_index(self, seq: int) -> int:
+        """把 `log_history` 中的序号换算为 `log_spill` 中的下标"""
+        return self._log_spill_base + seq
+
+    def set_log_capacity(self, capacity: int) -> None:
+        self.max_log_records = capacity
+        history = self.log_history
+        dropped = history.since(history.first_seq)[: max(len(history) - capacity, 0)]
+        if self._log_index is not None:
+            for offset, log in enumerate(dropped):
+                self._log_index.remove(history.first_seq + offset, log)
+        history.resize(capacity)
+        if self.log_spill is not None and dropped:
+            self.log_spill.append(*dropped)
+        if self.log_watchers and dropped:
+            self._log_evicted.extend(dropped)
+            self._schedule_flush()
+
+    def set_chat_capacity(self, capacity: int) -> None:
+        self.max_msg_records = capacity
+        for scene in self.scenes.values():
+            scene.resize(capacity)
+
+    def flush(self) -> None:
+        """立即把尚未通知的记录批量推送给观察者"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._log_notified != self.log_history.next_seq or self._log_evicted:
+            seq = max(self._log_notified, self.log_history.first_seq)
+            logs = self.log_history.since(seq)
+            self._log_notified = self.log_history.next_seq
+            evicted, self._log_evicted = tuple(self._log_evicted), []
+            if logs or evicted:
+                self.emit_log_watcher(*logs, seq=seq, evicted=evicted)
+        for scene in self.scenes.values():
+            history = scene.history
+            if scene._updated:
+                # 尚未通知的新消息会带着修改后的内容送达, 只需通知已经送达的消息
+                seqs = tuple(
+                    sorted(seq for seq in scene._updated if seq < scene._notified)
+                )
+                scene._updated.clear()
+                if seqs:
+                    self.emit_chat_update(seqs, scene.id)
+            if scene._notified == history.next_seq:
+                continue
+            seq = max(scene._notified, history.first_seq)
+            messages = history.since(seq)
+            scene._notified = history.next_seq
+            written, scene._written = scene._written, 0
+            evicted, scene._evicted = tuple(scene._evicted), []
+            if messages or evicted:
+                self.emit_chat_watcher(
+                    *messages,
+                    seq=seq,
+                    scene=scene.id,
+                    written=written,
+                    evicted=evicted,
+                )
+
+    @property
+    def backlog(self) -> int:
+        """已经写入但尚未通知观察者的记录数"""
+        count = self.log_history.next_seq - max(
+            self._log_notified, self.log_history.first_seq
+        )
+        for scene in self.scenes.values():
+            history = scene.history
+            count += history.next_seq - max(scene._notified, history.first_seq)
+            count += len(scene._updated)
+        return count
+
+    def _schedule_flush(self) -> None:
+        if self._flush_handle is not None:
+            return
+        if self.notify_interval <= 0:
+            self.flush()
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+        else:
+            self._flush_handle = loop.call_later(self.notify_interval, self.flush)
 
     def write_log(self, *logs: RenderableType) -> None:
-        self.log_history.extend(logs)
-        if len(self.log_history) > MAX_LOG_RECORDS:
-            self.log_history = self.log_history[-MAX_LOG_RECORDS:]
-        self.emit_log_watcher(*logs)
+        history, index = self.log_history, self._log_index
+        evicted: List[RenderableType] = []
+        for log in logs:
+            if len(history) == history.capacity:
+                evicted.append(history[0])
+                if index is not None:
+                    index.remove(history.first_seq, history[0])
+            if index is not None:
+                index.add(history.next_seq, log)
+            history.append(log)
+        if self.log_spill is not None and evicted:
+            self.log_spill.append(*evicted)
+        if self.log_watchers:
+            self._log_evicted.extend(evicted)
+            self._schedule_flush()
+        else:
+            self._log_notified = self.log_history.next_seq
 
-    def add_log_watcher(self, watcher: Widget) -> None:
+    def add_log_watcher(self, watcher: Watcher) -> None:
+        # 新观察者会自行回放历史, 先把积压的记录推给已有观察者, 避免重复
+        self.flush()
         self.log_watchers.append(watcher)
 
-    def remove_log_watcher(self, watcher: Widget) -> None:
+    def remove_log_watcher(self, watcher: Watcher) -> None:
         self.log_watchers.remove(watcher)
 
-    def emit_log_watcher(self, *logs: RenderableType) -> None:
+    def emit_log_watcher(
+        self,
+        *logs: RenderableType,
+        seq: int = -1,
+        evicted: Tuple[RenderableType, ...] = (),
+    ) -> None:
         for watcher in self.log_watchers:
-            watcher.post_message(StateChange(logs))
+            watcher.post_message(StateChange(logs, seq, evicted=evicted))
 
     def write_chat(self, *messages: "MessageEvent") -> None:
-        self.chat_history.extend(messages)
-        if len(self.chat_history) > MAX_MSG_RECORDS:
-            self.chat_history = self.chat_history[-MAX_MSG_RECORDS:]
-        self.emit_chat_watcher(*messages)
+        """写入消息, 消息按各自的 `scene` 写入对应场景的记录"""
+        start = timing.start()
+        scene_id = None
+        batch: List[MessageEvent] = []
+        for message in messages:
+            if isinstance(message.user, Robot):
+                self.outbound += 1
+            else:
+                self.inbound += 1
+            if message.scene != scene_id and batch:
+                self._write_scene(batch, start)
+                batch = []
+            scene_id = message.scene
+            batch.append(message)
+        if batch:
+            self._write_scene(batch, start)
+        timing.stop("write_chat", start)
+        if self.chat_watchers:
+            self._schedule_flush()
+        else:
+            for scene in self.scenes.values():
+                scene._notified = scene.history.next_seq
+                scene._written = 0
+                scene._evicted.clear()
+
+    def _write_scene(self, batch: List[MessageEvent], written: int) -> None:
+        scene = self.scene(batch[0].scene)
+        if scene.id in self._transient:
+            self._transient[scene.id] = next(self._ticks)
+        scene.write(*batch)
+        if written and not scene._written:
+            scene._written = written
 
-    def add_chat_watcher(self, watcher: Widget) -> None:
+    def add_chat_watcher(self, watcher: Watcher) -> None:
+        self.flush()
         self.chat_watchers.append(watcher)
 
-    def remove_chat_watcher(self, watcher: Widget) -> None:
+    def remove_chat_watcher(self, watcher: Watcher) -> None:
         self.chat_watchers.remove(watcher)
 
-    def emit_chat_watcher(self, *messages: "MessageEvent") -> None:
+    def emit_chat_watcher(
+        self,
+        *messages: "MessageEvent",
+        seq: int = -1,
+        scene: Optional[str] = None,
+        written: int = 0,
+        evicted: Tuple["MessageEvent", ...] = (),
+    ) -> None:
         for watcher in self.chat_watchers:
-            watcher.post_message(StateChange(messages))
+            watcher.post_message(StateChange(messages, seq, scene, written, evicted))
+
+    def emit_chat_update(self, seqs: Tuple[int, ...], scene: str) -> None:
+        for watcher in self.chat_watchers:
+            watcher.post_message(MessageUpdate(seqs, scene))
+
+    def close(self) -> None:
+        """关闭所有场景的持久化记录与淘汰日志的记录"""
+        for scene in self.scenes.values():
+            scene.close()
+        if self.transcript_writer is not None:
+            self.transcript_writer.close()
+        if self.log_spill is not None:
+            self.log_spill.close()
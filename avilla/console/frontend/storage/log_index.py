@@ -0,0 +1,133 @@
+import heapq
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from rich.console import RenderableType
+
+from ..log_redirect import LogLine, LogRecord
+from .ring import RingBuffer
+
+GRAM = 3
+"""全文索引的 n-gram 长度, 更短的关键词退化为逐条比对候选记录"""
+
+_ANSI = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+
+def search_text(log: RenderableType) -> str:
+    """日志中参与全文搜索的部分, 已转换为小写"""
+    if isinstance(log, LogRecord):
+        return log.message.lower()
+    if isinstance(log, LogLine):
+        return _ANSI.sub("", log.raw).lower()
+    return str(log).lower()
+
+
+def _grams(text: str) -> Set[str]:
+    return {text[i : i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+@dataclass(frozen=True)
+class LogFilter:
+    """日志的筛选条件, 各条件同时满足才算匹配"""
+
+    level: int = 0
+    """最低等级的数值, 为 0 时不限; 非结构化的日志行没有等级, 设置等级后不会匹配"""
+    module: str = ""
+    """模块名前缀"""
+    text: str = ""
+    """日志内容中包含的文本, 不区分大小写"""
+
+    def __bool__(self) -> bool:
+        return bool(self.level or self.module or self.text)
+
+    def matches(self, log: RenderableType) -> bool:
+        if self.level or self.module:
+            if not isinstance(log, LogRecord):
+                return False
+            if log.no < self.level or not log.name.startswith(self.module):
+                return False
+        return not self.text or self.text.lower() in search_text(log)
+
+
+class LogIndex:
+    """`Storage.log_history` 的倒排索引
+
+    分别按等级, 模块与内容的 n-gram 记录日志的序号. 建立时登记历史中已有的日志,
+    之后在写入与淘汰时增量维护, 每条日志只分析一次; 查询时从最短的倒排表中取出候选记录再逐条比对,
+    不需要扫描整个历史.
+    """
+
+    def __init__(self, history: RingBuffer[RenderableType]):
+        self.history = history
+        self.levels: Dict[int, Deque[int]] = {}
+        self.modules: Dict[str, Deque[int]] = {}
+        self.grams: Dict[str, Deque[int]] = {}
+        for seq, log in enumerate(history, history.first_seq):
+            self.add(seq, log)
+
+    def _postings(
+        self, log: RenderableType
+    ) -> Iterator[Tuple[Dict[Any, Deque[int]], Any]]:
+        if isinstance(log, LogRecord):
+            yield self.levels, log.no
+            yield self.modules, log.name
+        for gram in _grams(search_text(log)):
+            yield self.grams, gram
+
+    def add(self, seq: int, log: RenderableType) -> None:
+        """登记即将以 `seq` 写入历史的日志"""
+        for postings, key in self._postings(log):
+            if key not in postings:
+                postings[key] = deque()
+            postings[key].append(seq)
+
+    def remove(self, seq: int, log: RenderableType) -> None:
+        """移除即将被淘汰的日志; 日志按序号淘汰, 因此总位于各倒排表的开头"""
+        for postings, key in self._postings(log):
+            entries = postings.get(key)
+            if entries and entries[0] == seq:
+                entries.popleft()
+                if not entries:
+                    del postings[key]
+
+    def _candidates(self, log_filter: LogFilter) -> Optional[Iterable[int]]:
+        sources: List[List[Deque[int]]] = []
+        if log_filter.level:
+            sources.append(
+                [seqs for no, seqs in self.levels.items() if no >= log_filter.level]
+            )
+        if log_filter.module:
+            sources.append(
+                [
+                    seqs
+                    for name, seqs in self.modules.items()
+                    if name.startswith(log_filter.module)
+                ]
+            )
+        text = log_filter.text.lower()
+        if len(text) >= GRAM:
+            grams = [self.grams.get(gram) for gram in _grams(text)]
+            if not all(grams):
+                return ()
+            sources.append([min(grams, key=len)])  # type: ignore
+        if not sources:
+            return None
+        lists = min(sources, key=lambda lists: sum(map(len, lists)))
+        if len(lists) == 1:
+            return lists[0]
+        return heapq.merge(*lists)
+
+    def query(self, log_filter: LogFilter, since: int = 0) -> List[int]:
+        """按序号升序返回历史中序号不小于 `since` 且满足条件的日志"""
+        history = self.history
+        since = max(since, history.first_seq)
+        candidates = self._candidates(log_filter)
+        if candidates is None:
+            candidates = range(since, history.next_seq)
+        return [
+            seq
+            for seq in candidates
+            if seq >= since and log_filter.matches(history.get(seq))
+        ]
@@ -0,0 +1,225 @@
+import json
+import threading
+import zlib
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import List, Optional, Union
+
+from loguru import logger
+from rich.console import RenderableType
+
+from ..codec import decode_log, encode_log
+
+BLOCK_RECORDS = 256
+SEGMENT_RECORDS = 16384
+MAX_SEGMENTS = 8
+FLUSH_INTERVAL = 0.5
+
+
+class LogSpill:
+    """从 `Storage.log_history` 中淘汰的日志的压缩记录
+
+    日志按追加顺序写入若干段文件 (`*.logz`), 每段由若干独立压缩的块组成, 每块至多 `block_records` 条;
+    每段附带一个块索引 (`*.idx`, 每块 24 字节: 记录数, 偏移与长度). 按下标读取只需解压所在的块.
+    段满 `segment_records` 条后写入新段, 超过 `max_segments` 段时删除最旧的段, 因此占用的磁盘空间有上限.
+
+    写入由后台线程批量完成, `append` 只把日志放进待写队列; 尚未落盘的日志同样可以读取.
+    下标在整个记录中单调递增, 删除旧段不会改变其余日志的下标.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        block_records: int = BLOCK_RECORDS,
+        segment_records: int = SEGMENT_RECORDS,
+        max_segments: int = MAX_SEGMENTS,
+        flush_interval: float = FLUSH_INTERVAL,
+    ) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.block_records = block_records
+        self.segment_records = segment_records
+        self.max_segments = max(max_segments, 1)
+        self.flush_interval = flush_interval
+
+        # 每段的编号与起始下标, 以及段内各块 (相对于段) 的起始下标, 偏移与长度
+        # 下标从保留的最旧一段开始计数
+        self._segments: List[int] = []
+        self._starts: List[int] = []
+        self._block_starts: List["array[int]"] = []
+        self._block_offsets: List["array[int]"] = []
+        self._block_lengths: List["array[int]"] = []
+        self._written = 0
+        for file in sorted(self.path.glob("*.idx")):
+            data = file.read_bytes()
+            # 忽略写入中断时残缺的条目
+            blocks = array("Q", data[: len(data) // 24 * 24])
+            self._add_segment(int(file.stem))
+            for index in range(0, len(blocks), 3):
+                self._add_block(blocks[index + 1], blocks[index + 2], blocks[index])
+
+        self._pending: List[RenderableType] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closing = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _add_segment(self, segment: int) -> None:
+        self._segments.append(segment)
+        self._starts.append(self._written)
+        self._block_starts.append(array("Q"))
+        self._block_offsets.append(array("Q"))
+        self._block_lengths.append(array("Q"))
+
+    def _add_block(self, offset: int, length: int, count: int) -> None:
+        self._block_starts[-1].append(self._written - self._starts[-1])
+        self._block_offsets[-1].append(offset)
+        self._block_lengths[-1].append(length)
+        self._written += count
+
+    @property
+    def first(self) -> int:
+        """仍然保留的最旧一条日志的下标"""
+        with self._lock:
+            return self._starts[0] if self._starts else self._written
+
+    def __len__(self) -> int:
+        """已经追加的日志总数, 包括已被删除的段中的日志"""
+        with self._lock:
+            return self._written + len(self._pending)
+
+    def append(self, *logs: RenderableType) -> None:
+        with self._lock:
+            if self._closing.is_set():
+                # 关闭之后的日志 (如退出时的提示) 直接丢弃
+                return
+            self._pending.extend(logs)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="avilla-console-log-spill", daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()
+
+    def read(self, start: int, stop: int) -> List[RenderableType]:
+        """读取下标在 [start, stop) 内且仍然保留的日志"""
+        with self._lock:
+            written = self._written
+            pending = self._pending[: max(stop - written, 0)]
+            segments = list(self._segments)
+            starts = list(self._starts)
+            blocks = list(
+                zip(self._block_starts, self._block_offsets, self._block_lengths)
+            )
+            ends = starts[1:] + [written]
+        start = max(start, starts[0] if starts else written)
+        result: List[RenderableType] = []
+        index = start
+        while index < min(stop, written):
+            segment = bisect_right(starts, index) - 1
+            block_starts, offsets, lengths = blocks[segment]
+            block = bisect_right(block_starts, index - starts[segment]) - 1
+            block_start = starts[segment] + block_starts[block]
+            block_end = (
+                starts[segment] + block_starts[block + 1]
+                if block + 1 < len(block_starts)
+                else ends[segment]
+            )
+            try:
+                records = self._read_block(
+                    segments[segment], offsets[block], lengths[block]
+                )
+            except FileNotFoundError:
+                # 读取期间该段被轮换删除
+                index = block_end
+                continue
+            end = min(stop, block_end)
+            result.extend(records[index - block_start : end - block_start])
+            index = end
+        result.extend(pending[max(start - written, 0) :])
+        return result
+
+    def flush(self) -> None:
+        """阻塞直到当前待写的日志全部落盘"""
+        with self._write_lock:
+            with self._lock:
+                batch = list(self._pending)
+            if batch:
+                self._write(batch)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closing.set()
+            thread = self._thread
+        self._wakeup.set()
+        if thread is not None:
+            thread.join()
+
+    def _file(self, segment: int, suffix: str) -> Path:
+        return self.path / f"{segment:08d}.{suffix}"
+
+    def _read_block(
+        self, segment: int, offset: int, length: int
+    ) -> List[RenderableType]:
+        with self._file(segment, "logz").open("rb") as file:
+            file.seek(offset)
+            data = zlib.decompress(file.read(length))
+        return [decode_log(json.loads(line)) for line in data.split(b"\n")]
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            # 攒一小段时间再写, 把高频的写入合并为一批; 关闭时立即写入
+            closed = self._closing.wait(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"failed to spill console logs: {e!r}")
+            if closed:
+                return
+
+    def _write(self, batch: List[RenderableType]) -> None:
+        index = 0
+        while index < len(batch):
+            with self._lock:
+                segment_start = self._starts[-1] if self._starts else 0
+                if (
+                    not self._segments
+                    or self._written - segment_start >= self.segment_records
+                ):
+                    self._add_segment(self._segments[-1] + 1 if self._segments else 0)
+                    self._rotate()
+                segment = self._segments[-1]
+                room = self.segment_records - (self._written - self._starts[-1])
+            chunk = batch[index : index + min(room, self.block_records)]
+            data = zlib.compress(
+                b"\n".join(
+                    json.dumps(
+                        encode_log(log), ensure_ascii=False, separators=(",", ":")
+                    ).encode("utf-8")
+                    for log in chunk
+                )
+            )
+            with self._file(segment, "logz").open("ab") as file:
+                offset = file.tell()
+                file.write(data)
+            with self._file(segment, "idx").open("ab") as idx:
+                idx.write(array("Q", [len(chunk), offset, len(data)]).tobytes())
+            with self._lock:
+                self._add_block(offset, len(data), len(chunk))
+                del self._pending[: len(chunk)]
+            index += len(chunk)
+
+    def _rotate(self) -> None:
+        while len(self._segments) > self.max_segments:
+            segment = self._segments.pop(0)
+            del self._starts[0]
+            del self._block_starts[0]
+            del self._block_offsets[0]
+            del self._block_lengths[0]
+            for suffix in ("logz", "idx"):
+                self._file(segment, suffix).unlink(missing_ok=True)
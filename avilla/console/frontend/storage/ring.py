@@ -0,0 +1,109 @@
+from typing import Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class RingBuffer(Generic[T]):
+    """定长环形缓冲区
+
+    追加与淘汰均为 O(1); 每条记录都带有一个单调递增的序号, 供观察者按序号增量读取.
+    """
+
+    __slots__ = ("_items", "_capacity", "_start", "_size", "_seq")
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self._capacity = capacity
+        self._items: List[Optional[T]] = [None] * capacity
+        self._start = 0
+        self._size = 0
+        self._seq = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def first_seq(self) -> int:
+        """当前最旧记录的序号"""
+        return self._seq - self._size
+
+    @property
+    def next_seq(self) -> int:
+        """下一条写入记录将获得的序号"""
+        return self._seq
+
+    def append(self, item: T) -> None:
+        if self._size < self._capacity:
+            self._items[(self._start + self._size) % self._capacity] = item
+            self._size += 1
+        else:
+            self._items[self._start] = item
+            self._start = (self._start + 1) % self._capacity
+        self._seq += 1
+
+    def extend(self, items: Iterable[T]) -> None:
+        for item in items:
+            self.append(item)
+
+    def get(self, seq: int) -> Optional[T]:
+        """按序号取记录, 已被淘汰或尚未写入时返回 None"""
+        offset = seq - self.first_seq
+        if offset < 0 or offset >= self._size:
+            return None
+        return self._items[(self._start + offset) % self._capacity]  # type: ignore
+
+    def set(self, seq: int, item: T) -> bool:
+        """按序号替换记录, 记录已被淘汰或尚未写入时返回 False"""
+        offset = seq - self.first_seq
+        if offset < 0 or offset >= self._size:
+            return False
+        self._items[(self._start + offset) % self._capacity] = item
+        return True
+
+    def since(self, seq: int) -> Tuple[T, ...]:
+        """取出序号不小于 seq 的全部记录"""
+        offset = max(seq - self.first_seq, 0)
+        if offset >= self._size:
+            return ()
+        begin = (self._start + offset) % self._capacity
+        end = begin + self._size - offset
+        if end <= self._capacity:
+            return tuple(self._items[begin:end])  # type: ignore
+        return tuple(self._items[begin:] + self._items[: end - self._capacity])  # type: ignore
+
+    def resize(self, capacity: int) -> None:
+        """调整容量, 超出部分从最旧的记录开始丢弃"""
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        items = list(self.since(self.first_seq))[-capacity:]
+        self._capacity = capacity
+        self._items = items + [None] * (capacity - len(items))
+        self._start = 0
+        self._size = len(items)
+
+    def clear(self) -> None:
+        """清空记录, 序号不会回退"""
+        self._items = [None] * self._capacity
+        self._start = 0
+        self._size = 0
+
+    def __getitem__(self, index: int) -> T:
+        if index < 0:
+            index += self._size
+        if index < 0 or index >= self._size:
+            raise IndexError("ring buffer index out of range")
+        return self._items[(self._start + index) % self._capacity]  # type: ignore
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.since(self.first_seq))
+
+    def __reversed__(self) -> Iterator[T]:
+        return reversed(self.since(self.first_seq))
+
+    def __repr__(self) -> str:
+        return f"RingBuffer(capacity={self._capacity}, size={self._size}, next_seq={self._seq})"
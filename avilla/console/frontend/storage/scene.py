@@ -0,0 +1,119 @@
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ..info import MessageEvent, Scene
+from .ring import RingBuffer
+from .transcript import Transcript
+
+
+MessageIndex = Dict[str, Tuple["ChatScene", int]]
+"""msg_id -> (所在场景, 在场景聊天记录中的序号)"""
+
+
+class ChatScene:
+    """单个会话场景的聊天记录
+
+    每个场景有独立的有界历史与可选的持久化记录, 启动时从持久化记录中载入最近的消息.
+    场景会在共享的 `MessageIndex` 中登记仍在历史中的消息, 并在消息被淘汰时同步移除.
+    """
+
+    def __init__(
+        self,
+        info: Scene,
+        capacity: int,
+        transcript: Optional[Transcript] = None,
+        index: Optional[MessageIndex] = None,
+    ):
+        self.info = info
+        self.history: RingBuffer[MessageEvent] = RingBuffer(capacity)
+        self.index: MessageIndex = {} if index is None else index
+        self.transcript = transcript
+        self._transcript_base = 0
+        self._notified = 0
+        # 被淘汰, 尚未通知观察者的消息
+        self._evicted: List[MessageEvent] = []
+        # 已被编辑或撤回, 尚未通知观察者的消息序号
+        self._updated: Set[int] = set()
+        # 开启 timing 时, 尚未通知观察者的消息中最早的写入时刻
+        self._written = 0
+        if transcript is not None:
+            tail = transcript.tail(capacity)
+            self._transcript_base = len(transcript) - len(tail)
+            self._append(tail)  # type: ignore
+            self._notified = self.history.next_seq
+
+    @property
+    def id(self) -> str:
+        return self.info.id
+
+    def transcript_index(self, seq: int) -> int:
+        """把 `history` 中的序号换算为持久化记录中的下标"""
+        return self._transcript_base + seq
+
+    def get(self, msg_id: str) -> Optional[MessageEvent]:
+        entry = self.index.get(msg_id)
+        if entry is None or entry[0] is not self:
+            return None
+        return self.history.get(entry[1])
+
+    def update(self, msg_id: str, **changes: Any) -> Optional[MessageEvent]:
+        """原地替换历史中的一条消息, 并递增其 `revision` (`changes` 中指定时使用指定的值)
+
+        持久化记录中的对应记录同样被替换. 消息不在该场景的历史中时返回 None.
+        """
+        entry = self.index.get(msg_id)
+        if entry is None or entry[0] is not self:
+            return None
+        seq = entry[1]
+        message = self.history.get(seq)
+        if message is None:
+            return None
+        changes.setdefault("revision", message.revision + 1)
+        updated = replace(message, **changes)
+        self.history.set(seq, updated)
+        self._updated.add(seq)
+        if self.transcript is not None:
+            self.transcript.update(self.transcript_index(seq), updated)
+        return updated
+
+    def _unindex(self, message: MessageEvent) -> None:
+        entry = self.index.get(message.msg_id)
+        if entry is not None and entry[0] is self:
+            del self.index[message.msg_id]
+
+    def _append(self, messages: Tuple[MessageEvent, ...]) -> None:
+        history, index = self.history, self.index
+        for message in messages:
+            if len(history) == history.capacity:
+                self._unindex(history[0])
+                self._evicted.append(history[0])
+            index[message.msg_id] = (self, history.next_seq)
+            history.append(message)
+
+    def write(self, *messages: MessageEvent) -> None:
+        self._append(messages)
+        if self.transcript is not None:
+            self.transcript.append(*messages)
+
+    def resize(self, capacity: int) -> None:
+        history = self.history
+        dropped = max(len(history) - capacity, 0)
+        for message in history.since(history.first_seq)[:dropped]:
+            self._unindex(message)
+            self._evicted.append(message)
+        history.resize(capacity)
+
+    def clear(self) -> None:
+        """清空该场景的聊天记录, 持久化记录不受影响"""
+        for message in self.history:
+            self._unindex(message)
+        self.history.clear()
+        self._updated.clear()
+        self._evicted.clear()
+
+    def close(self) -> None:
+        if self.transcript is not None:
+            self.transcript.close()
+
+    def __repr__(self) -> str:
+        return f"ChatScene({self.info!r}, {len(self.history)} messages)"
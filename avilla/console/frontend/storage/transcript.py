@@ -0,0 +1,271 @@
+import threading
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Union
+from urllib.parse import quote
+
+from loguru import logger
+
+from ..codec import dumps, loads
+from ..info import MessageEvent
+
+SEGMENT_RECORDS = 4096
+FLUSH_INTERVAL = 0.2
+UPDATES_FILE = "updates.log"
+
+
+def scene_path(root: Path, scene_id: str) -> Path:
+    """场景的持久化记录所在的目录
+
+    场景 id 经过百分号编码 (`.` 也被编码), 因此目录名不含路径分隔符, 也不会是 `.` 或 `..`.
+    """
+    if not scene_id:
+        raise ValueError("scene id must not be empty")
+    return root / quote(scene_id, safe="").replace(".", "%2E")
+
+
+class TranscriptWriter:
+    """为多个 `Transcript` 批量落盘的后台线程
+
+    各场景的持久化记录共用一个写入线程, 线程在第一次写入时才启动.
+    """
+
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL) -> None:
+        self.flush_interval = flush_interval
+        self._dirty: Set["Transcript"] = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closing = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, transcript: "Transcript") -> None:
+        """在下一批中写入该记录的待写部分"""
+        with self._lock:
+            if self._closing.is_set():
+                raise RuntimeError("transcript writer is closed")
+            self._dirty.add(transcript)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="avilla-console-transcript", daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()
+
+    def close(self) -> None:
+        """写入剩余的记录并停止线程"""
+        with self._lock:
+            self._closing.set()
+            thread = self._thread
+        self._wakeup.set()
+        if thread is not None:
+            thread.join()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            # 攒一小段时间再写, 把高频的写入合并为一批
+            closing = self._closing.wait(self.flush_interval)
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+            for transcript in dirty:
+                try:
+                    transcript.flush()
+                except Exception as e:
+                    logger.error(f"failed to write console transcript: {e!r}")
+            if closing:
+                return
+
+
+class Transcript:
+    """持久化的分段聊天记录
+
+    记录按追加顺序写入若干段文件 (`*.seg`, 每行一条 JSON), 每段附带一个紧凑的偏移索引
+    (`*.idx`, 每条记录 8 字节的起始偏移). 按下标读取只需定位段与偏移, 不需要把整个记录载入内存.
+
+    写入由 `TranscriptWriter` 的后台线程批量完成, `append` 只把事件放进待写队列;
+    尚未落盘的记录同样可以读取. 未指定 `writer` 时使用自己独占的写入线程.
+
+    被编辑或撤回的记录不改写段文件, 而是把新内容连同下标追加到 `updates.log`,
+    打开时载入内存, 读取时覆盖原记录.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        segment_records: int = SEGMENT_RECORDS,
+        flush_interval: float = FLUSH_INTERVAL,
+        writer: Optional[TranscriptWriter] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.segment_records = segment_records
+        self._owns_writer = writer is None
+        self.writer = writer or TranscriptWriter(flush_interval)
+
+        # 每段的记录数与起始下标
+        self._counts: List[int] = [
+            file.stat().st_size // 8 for file in sorted(self.path.glob("*.idx"))
+        ]
+        self._starts: List[int] = []
+        total = 0
+        for count in self._counts:
+            self._starts.append(total)
+            total += count
+        self._written = total
+
+        self._pending: List[MessageEvent] = []
+        self._updates: Dict[int, MessageEvent] = self._load_updates()
+        self._pending_updates: List[Tuple[int, MessageEvent]] = []
+        # 正在由 `flush` 写入的待写记录数, 这些记录的修改需要另外写入更新记录
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._closed = False
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._written + len(self._pending)
+
+    def append(self, *events: MessageEvent) -> None:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("transcript is closed")
+            self._pending.extend(events)
+        self.writer.schedule(self)
+
+    def read(self, start: int, stop: int) -> List[MessageEvent]:
+        """读取下标在 [start, stop) 内的记录"""
+        with self._lock:
+            written = self._written
+            pending = self._pending[: max(stop - written, 0)]
+            counts = list(self._counts)
+            starts = list(self._starts)
+        start = max(start, 0)
+        result: List[MessageEvent] = []
+        index = start
+        while index < min(stop, written):
+            segment = bisect_right(starts, index) - 1
+            offset = index - starts[segment]
+            end = min(stop, written, starts[segment] + counts[segment])
+            result.extend(self._read_segment(segment, offset, end - index))
+            index = end
+        result.extend(pending[max(start - written, 0) :])
+        with self._lock:
+            updates = self._updates
+            if updates:
+                result = [
+                    updates.get(index, event)
+                    for index, event in enumerate(result, start)
+                ]
+        return result
+
+    def update(self, index: int, event: MessageEvent) -> None:
+        """把下标为 `index` 的记录替换为 `event`"""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("transcript is closed")
+            written = self._written
+            if not 0 <= index < written + len(self._pending):
+                raise IndexError(f"transcript index out of range: {index}")
+            self._updates[index] = event
+            if index >= written + self._in_flight:
+                self._pending[index - written] = event
+            else:
+                self._pending_updates.append((index, event))
+        self.writer.schedule(self)
+
+    def tail(self, count: int) -> List[MessageEvent]:
+        total = len(self)
+        return self.read(total - count, total)
+
+    def flush(self) -> None:
+        """阻塞直到当前待写的记录全部落盘"""
+        with self._write_lock:
+            with self._lock:
+                batch = list(self._pending)
+                updates = list(self._pending_updates)
+                self._in_flight = len(batch)
+            if batch:
+                try:
+                    self._write(batch)
+                finally:
+                    with self._lock:
+                        self._in_flight = 0
+            if updates:
+                self._write_updates(updates)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+        self.flush()
+        if self._owns_writer:
+            self.writer.close()
+
+    def _load_updates(self) -> Dict[int, MessageEvent]:
+        updates: Dict[int, MessageEvent] = {}
+        path = self.path / UPDATES_FILE
+        if not path.exists():
+            return updates
+        with path.open("rb") as file:
+            for line in file:
+                index, _, data = line.partition(b"\t")
+                try:
+                    updates[int(index)] = loads(data)  # type: ignore
+                except ValueError:
+                    # 上次写入时中断, 丢弃不完整的最后一行
+                    break
+        return updates
+
+    def _write_updates(self, updates: List[Tuple[int, MessageEvent]]) -> None:
+        with (self.path / UPDATES_FILE).open("ab") as file:
+            for index, event in updates:
+                file.write(f"{index}\t".encode() + dumps(event) + b"\n")
+        with self._lock:
+            del self._pending_updates[: len(updates)]
+
+    def _segment_file(self, segment: int, suffix: str) -> Path:
+        return self.path / f"{segment:08d}.{suffix}"
+
+    def _read_segment(
+        self, segment: int, offset: int, count: int
+    ) -> List[MessageEvent]:
+        offsets = array("Q")
+        with self._segment_file(segment, "idx").open("rb") as idx:
+            idx.seek(offset * 8)
+            offsets.frombytes(idx.read(count * 8))
+        result: List[MessageEvent] = []
+        with self._segment_file(segment, "seg").open("rb") as seg:
+            seg.seek(offsets[0])
+            for _ in range(count):
+                result.append(loads(seg.readline()))  # type: ignore
+        return result
+
+    def _write(self, batch: List[MessageEvent]) -> None:
+        index = 0
+        while index < len(batch):
+            if not self._counts or self._counts[-1] >= self.segment_records:
+                with self._lock:
+                    self._starts.append(self._written)
+                    self._counts.append(0)
+            segment = len(self._counts) - 1
+            room = self.segment_records - self._counts[-1]
+            chunk = batch[index : index + room]
+            offsets = array("Q")
+            with self._segment_file(segment, "seg").open("ab") as seg:
+                position = seg.tell()
+                for event in chunk:
+                    line = dumps(event) + b"\n"
+                    offsets.append(position)
+                    seg.write(line)
+                    position += len(line)
+            with self._segment_file(segment, "idx").open("ab") as idx:
+                idx.write(offsets.tobytes())
+            with self._lock:
+                self._counts[-1] += len(chunk)
+                self._written += len(chunk)
+                self._in_flight -= len(chunk)
+                del self._pending[: len(chunk)]
+            index += len(chunk)
@@ -1,3 +1,13 @@
+from abc import ABCMeta
+from collections import OrderedDict
+from typing import Generic, Optional, TypeVar
+
+from textual.message_pump import MessagePump
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
 def truncate(
     s: str, length: int = 70, kill_words: bool = True, end: str = "..."
 ) -> str:
@@ -9,3 +19,39 @@ def truncate(
 
     result = s[: length - len(end)].rsplit(maxsplit=1)[0]
     return result + end
+
+
+class ABCMessagePumpMeta(ABCMeta, type(MessagePump)):
+    """支持 `abstractmethod` 的 Textual 组件与应用的元类"""
+
+
+class LRUCache(Generic[K, V]):
+    """按最近使用顺序淘汰的定长缓存"""
+
+    __slots__ = ("maxsize", "_data")
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: "OrderedDict[K, V]" = OrderedDict()
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            return default
+        return self._data[key]
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        self._data.clear()
@@ -0,0 +1,19 @@
+from textual.widget import Widget
+
+from ..components.stats import StatsPanel
+from ..components.stats.toolbar import Toolbar
+
+
+class StatsView(Widget):
+    DEFAULT_CSS = """
+    StatsView {
+        background: rgba(40, 44, 52, 1);
+    }
+    StatsView > Toolbar {
+        dock: top;
+    }
+    """
+
+    def compose(self):
+        yield Toolbar()
+        yield StatsPanel()
@@ -0,0 +1,224 @@
+"""控制台协议的脚本化负载生成器
+
+按脚本以用户的身份持续发送消息, 与输入框发送消息走同一条路径 (`ConsoleClient.inject_message`),
+并统计每条命令的回复延迟与吞吐. 界面 (`Frontend`) 与无界面模式 (`HeadlessClient`) 均可使用.
+
+脚本为 JSON:
+
+    {
+        "concurrency": 4,
+        "users": [{"id": "alice", "nickname": "Alice"}],
+        "steps": [
+            {"text": "/help", "count": 200, "rate": 50, "burst": 10, "think": 0.1}
+        ]
+    }
+
+同一场景内, 回复按到达顺序与尚未得到回复的消息一一对应, 因此假定机器人对每条消息恰好回复一条.
+"""
+
+import asyncio
+import json
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Union
+
+from textual.message import Message
+
+from .element import Text
+from .frontend.info import Robot, User
+from .frontend.storage import StateChange
+from .message import ConsoleMessage
+
+if TYPE_CHECKING:
+    from .frontend.client import ConsoleClient
+
+REPLY_TIMEOUT = 10.0
+
+
+@dataclass
+class LoadStep:
+    text: str
+    """发送的消息内容"""
+    count: int = 1
+    """发送的条数"""
+    command: Optional[str] = None
+    """统计时使用的命令名, 默认为消息的第一个词"""
+    user: Optional[str] = None
+    """发送者的 id, 默认轮流使用脚本中的全部用户"""
+    scene: Optional[str] = None
+    """消息所在的场景, 默认为发送者的私聊"""
+    rate: Optional[float] = None
+    """每秒最多发送的条数, 为空时不限速"""
+    burst: int = 1
+    """限速时允许的突发条数"""
+    think: float = 0.0
+    """每个并发用户收到回复后到发送下一条之前的等待时间 (秒)"""
+
+    @property
+    def name(self) -> str:
+        return self.command or (self.text.split() or [""])[0]
+
+
+@dataclass
+class LoadScript:
+    steps: List[LoadStep]
+    users: List[User] = field(default_factory=lambda: [User("console")])
+    concurrency: int = 1
+    reply_timeout: float = REPLY_TIMEOUT
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LoadScript":
+        users = [User(**user) for user in data.get("users", ())] or [User("console")]
+        return cls(
+            steps=[LoadStep(**step) for step in data["steps"]],
+            users=users,
+            concurrency=data.get("concurrency", 1),
+            reply_timeout=data.get("reply_timeout", REPLY_TIMEOUT),
+        )
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "LoadScript":
+        return cls.from_dict(json.loads(Path(path).read_text("utf-8")))
+
+
+@dataclass
+class CommandStats:
+    sent: int = 0
+    replied: int = 0
+    timeouts: int = 0
+    latencies: List[float] = field(default_factory=list)
+    started: float = 0.0
+    finished: float = 0.0
+
+    def percentile(self, p: int) -> float:
+        if len(self.latencies) < 2:
+            return self.latencies[0] if self.latencies else 0.0
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[p - 1]
+
+    @property
+    def throughput(self) -> float:
+        """每秒收到的回复数"""
+        elapsed = self.finished - self.started
+        return self.replied / elapsed if elapsed > 0 else 0.0
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._last = time.perf_counter()
+
+    async def acquire(self):
+        while True:
+            now = time.perf_counter()
+            elapsed = now - self._last
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class LoadGenerator:
+    """按脚本向控制台客户端注入消息并收集回复延迟"""
+
+    def __init__(self, client: "ConsoleClient", script: LoadScript):
+        self.client = client
+        self.script = script
+        self.stats: Dict[str, CommandStats] = {}
+        # 场景 -> 尚未得到回复的消息
+        self._pending: Dict[str, Deque["asyncio.Future[float]"]] = {}
+
+    def post_message(self, message: Message) -> bool:
+        if isinstance(message, StateChange):
+            now = time.perf_counter()
+            for event in message.data:
+                pending = self._pending.get(event.scene)
+                if not isinstance(event.user, Robot) or not pending:
+                    continue
+                while pending:
+                    future = pending.popleft()
+                    if not future.done():
+                        future.set_result(now)
+                        break
+        return True
+
+    async def run(self) -> Dict[str, CommandStats]:
+        """依次执行脚本中的每一步, 返回每条命令的统计"""
+        self.client.storage.add_chat_watcher(self)
+        try:
+            for step in self.script.steps:
+                await self.run_step(step)
+        finally:
+            self.client.storage.remove_chat_watcher(self)
+        return self.stats
+
+    async def run_step(self, step: LoadStep):
+        stats = self.stats.setdefault(step.name, CommandStats())
+        bucket = TokenBucket(step.rate, step.burst) if step.rate else None
+        users = self.script.users
+        if step.user is not None:
+            users = [user for user in users if user.id == step.user] or [
+                User(step.user)
+            ]
+        remaining = step.count
+        if not stats.started:
+            stats.started = time.perf_counter()
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                # 按发送顺序轮流使用各个用户, 与并发数无关
+                user = users[(step.count - remaining) % len(users)]
+                remaining -= 1
+                if bucket is not None:
+                    await bucket.acquire()
+                await self.send(step, user, stats)
+                if step.think:
+                    await asyncio.sleep(step.think)
+
+        await asyncio.gather(
+            *(worker() for _ in range(max(self.script.concurrency, 1)))
+        )
+        stats.finished = time.perf_counter()
+
+    async def send(self, step: LoadStep, user: User, stats: CommandStats):
+        scene = step.scene or self.client.storage.scene_of(user)
+        future: "asyncio.Future[float]" = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(scene, deque()).append(future)
+        start = time.perf_counter()
+        await self.client.inject_message(
+            ConsoleMessage([Text(step.text)]), user, scene
+        )
+        stats.sent += 1
+        try:
+            replied = await asyncio.wait_for(
+                asyncio.shield(future), self.script.reply_timeout
+            )
+        except asyncio.TimeoutError:
+            future.cancel()
+            stats.timeouts += 1
+        else:
+            stats.replied += 1
+            stats.latencies.append(replied - start)
+
+
+def format_report(stats: Dict[str, CommandStats]) -> str:
+    lines = [
+        f"{'command':<16}{'sent':>8}{'replied':>9}{'timeout':>9}"
+        f"{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'replies/s':>11}"
+    ]
+    for name, stat in stats.items():
+        lines.append(
+            f"{name:<16}{stat.sent:>8}{stat.replied:>9}{stat.timeouts:>9}"
+            f"{stat.percentile(50) * 1e3:>10.2f}"
+            f"{stat.percentile(95) * 1e3:>10.2f}"
+            f"{stat.percentile(99) * 1e3:>10.2f}"
+            f"{stat.throughput:>11.1f}"
+        )
+    return "\n".join(lines)
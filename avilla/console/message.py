@@ -1,4 +1,4 @@
-from typing import Iterator, Sequence, Union, overload
+from typing import Any, Dict, Iterator, Sequence, Tuple, Union, overload
 
 from graia.amnesia.message.element import Element
 from rich.console import Console, ConsoleOptions, RenderResult
@@ -7,8 +7,12 @@ from rich.segment import Segment
 
 from .element import ConsoleElement, Markdown
 
+MEASURE_CACHE_SIZE = 8
+
 
 class ConsoleMessage(Sequence[ConsoleElement]):
+    __slots__ = ("content", "_measurements", "_measured")
+
     content: list[ConsoleElement]
 
     @overload
@@ -35,6 +39,9 @@ class ConsoleMessage(Sequence[ConsoleElement]):
             MessageChain: 以传入的序列作为所承载消息的消息链
         """
         self.content = elements
+        self._measurements: Dict[int, Measurement] = {}
+        # 测量时各元素的字段, 内容改变后缓存的测量结果作废
+        self._measured: Tuple[Any, ...] = ()
 
     def __iter__(self) -> Iterator[ConsoleElement]:
         yield from self.content
@@ -52,4 +59,17 @@ class ConsoleMessage(Sequence[ConsoleElement]):
     def __rich_measure__(
         self, console: "Console", options: "ConsoleOptions"
     ) -> Measurement:
-        return measure_renderables(console, options, self)
+        # `content` 与 `Text` 的字段都可以修改, 内容不变时才复用同一宽度下的测量结果
+        measured = tuple(
+            (type(element), *element.fields.values()) for element in self.content
+        )
+        if measured != self._measured:
+            self._measurements.clear()
+            self._measured = measured
+        measurement = self._measurements.get(options.max_width)
+        if measurement is None:
+            if len(self._measurements) >= MEASURE_CACHE_SIZE:
+                self._measurements.clear()
+            measurement = measure_renderables(console, options, self)
+            self._measurements[options.max_width] = measurement
+        return measurement
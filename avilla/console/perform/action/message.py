@@ -3,14 +3,15 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from avilla.core.ryanvk.collector.account import AccountCollector
-from avilla.core.ryanvk.staff import Staff
 from avilla.core.selector import Selector
-from avilla.standard.core.message import MessageSend
+from avilla.standard.core.message import MessageRevoke, MessageSend
 from graia.amnesia.message import MessageChain
 from loguru import logger
 
+from ... import timing
+from ...capability import ConsoleMessageEdit
 from ...frontend.info import Robot
-from ...message import ConsoleMessage
+from ..message.transcoder import serialize_message
 
 if TYPE_CHECKING:
     from ...account import ConsoleAccount  # noqa
@@ -23,6 +24,7 @@ class ConsoleMessageActionPerform(
     m.post_applying = True
 
     @MessageSend.send.collect(m, "land.console")
+    @MessageSend.send.collect(m, "land.group")
     async def send_console_message(
         self,
         target: Selector,
@@ -32,12 +34,20 @@ class ConsoleMessageActionPerform(
     ) -> Selector:
         if TYPE_CHECKING:
             assert isinstance(self.protocol, ConsoleProtocol)
-        serialized_msg = ConsoleMessage(
-            await Staff(self.account).serialize_message(message)
-        )
+        start = timing.start()
+        serialized_msg = await serialize_message(self.account, message)
+        timing.stop("serialize", start)
 
+        # 群聊场景的目标为 group(id), 私聊为 console(用户 id), 与场景 id 一一对应
+        scene = target.pattern.get("group") or target.pattern.get("console")
         msg_id = await self.account.client.call(
-            "send_msg", {"message": serialized_msg, "info": Robot(self.protocol.name)}
+            "send_msg",
+            {
+                "message": serialized_msg,
+                "info": Robot(self.protocol.name),
+                "scene": scene,
+                "reply": reply and reply.pattern.get("message"),
+            },
         )
         if not msg_id:
             raise RuntimeError(f"Failed to send message to console: {message}")
@@ -45,3 +55,29 @@ class ConsoleMessageActionPerform(
             f"{self.account.route['land']}: [send]" f"[Console]" f" <- {str(message)!r}"
         )
         return Selector().land(self.account.route["land"]).message(msg_id)
+
+    @MessageRevoke.revoke.collect(m, "land.message")
+    @MessageRevoke.revoke.collect(m, "land.console.message")
+    @MessageRevoke.revoke.collect(m, "land.group.message")
+    async def revoke_console_message(self, target: Selector) -> None:
+        msg_id = target.pattern["message"]
+        if not await self.account.client.call("revoke_msg", {"msg_id": msg_id}):
+            raise RuntimeError(f"Failed to revoke console message: {msg_id}")
+        logger.info(f"{self.account.route['land']}: [revoke][Console] {msg_id}")
+
+    @ConsoleMessageEdit.edit.collect(m, "land.message")
+    @ConsoleMessageEdit.edit.collect(m, "land.console.message")
+    @ConsoleMessageEdit.edit.collect(m, "land.group.message")
+    async def edit_console_message(
+        self, target: Selector, content: MessageChain
+    ) -> None:
+        msg_id = target.pattern["message"]
+        serialized_msg = await serialize_message(self.account, content)
+        if not await self.account.client.call(
+            "edit_msg", {"msg_id": msg_id, "message": serialized_msg}
+        ):
+            raise RuntimeError(f"Failed to edit console message: {msg_id}")
+        logger.info(
+            f"{self.account.route['land']}: [edit]"
+            f"[Console] {msg_id} <- {str(content)!r}"
+        )
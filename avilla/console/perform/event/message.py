@@ -7,12 +7,14 @@ from avilla.core.context import Context
 from avilla.core.message import Message
 from avilla.core.ryanvk.collector.account import AccountCollector
 from avilla.core.ryanvk.descriptor.event import EventParse
-from avilla.core.ryanvk.staff import Staff
 from avilla.core.selector import Selector
 from avilla.standard.core.message import MessageReceived
 
+from avilla.console import timing
 from avilla.console.frontend.info import Event, MessageEvent
 
+from ..message.transcoder import deserialize_message
+
 if TYPE_CHECKING:
     from ...account import ConsoleAccount
     from ...protocol import ConsoleProtocol
@@ -29,26 +31,30 @@ class ConsoleEventMessagePerform(
     async def console_message(self, raw_event: Event):
         if TYPE_CHECKING:
             assert isinstance(raw_event, MessageEvent)
-        message = await Staff(
-            self.account, element_typer=lambda e: type(e).__name__
-        ).deserialize_message(raw_event.message.content)
-        console = (
-            Selector().land(self.account.route["land"]).console(str(raw_event.user.id))
-        )
+        start = timing.start()
+        message = await deserialize_message(self.account, raw_event.message)
+        timing.stop("deserialize", start)
+        land = Selector().land(self.account.route["land"])
+        if self.account.client.storage.scene(raw_event.scene).info.group:
+            scene = land.group(raw_event.scene)
+            sender = scene.member(str(raw_event.user.id))
+        else:
+            scene = sender = land.console(str(raw_event.user.id))
         context = Context(
             account=self.account,
-            client=console,
-            endpoint=console,
-            scene=console,
+            client=sender,
+            endpoint=scene,
+            scene=scene,
             selft=self.account.route,
         )
         return MessageReceived(
             context,
             Message(
                 id=raw_event.msg_id,
-                scene=console,
-                sender=console,
+                scene=scene,
+                sender=sender,
                 content=message,
                 time=datetime.fromtimestamp(raw_event.time.timestamp()),
+                reply=scene.message(raw_event.reply) if raw_event.reply else None,
             ),
         )
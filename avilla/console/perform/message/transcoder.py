@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ChainMap,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+from avilla.core.elements import Text as BaseText
+from avilla.core.ryanvk.descriptor.message.deserialize import MessageDeserializeSign
+from avilla.core.ryanvk.descriptor.message.serialize import MessageSerializeSign
+from graia.amnesia.message import MessageChain
+from graia.amnesia.message.element import Element
+
+from avilla.console.element import ConsoleElement, Emoji, Markdown, Markup, Text
+from avilla.console.message import ConsoleMessage
+
+if TYPE_CHECKING:
+    from ...account import ConsoleAccount  # noqa
+
+
+def element_type_name(element: ConsoleElement) -> str:
+    return type(element).__name__
+
+
+def _identity(element: Any) -> Any:
+    return element
+
+
+Converters = Dict[type, Callable[[Any], Any]]
+
+# 内置 perform 的同步实现, 以及它在 perform 中对应的方法名.
+# 只有 artifacts 中登记的仍是该方法时才会使用, 否则交给 Staff 调用实际注册的 perform
+SERIALIZERS: Dict[type, Tuple[str, Callable[[Any], ConsoleElement]]] = {
+    BaseText: ("text", lambda element: Text(element.text)),
+    Emoji: ("emoji", _identity),
+    Markup: ("markup", _identity),
+    Markdown: ("markdown", _identity),
+}
+DESERIALIZERS: Dict[type, Tuple[str, Callable[[Any], Element]]] = {
+    Text: ("text", lambda element: BaseText(element.text)),
+    Emoji: ("emoji", _identity),
+    Markup: ("markup", _identity),
+    Markdown: ("markdown", _identity),
+}
+
+
+def _registered(artifacts: ChainMap[Any, Any], sign: Any) -> Optional[Callable]:
+    record = artifacts.get(sign)
+    return None if record is None else record[1]
+
+
+def build_transcoders(artifacts: ChainMap[Any, Any]) -> Tuple[Converters, Converters]:
+    """根据 artifacts 中实际注册的 perform 构建序列化与反序列化的查找表"""
+    # perform 需在协议的 __init_isolate__ 中首次导入才会登记到协议上
+    from .deserialize import ConsoleMessageDeserializePerform
+    from .serialize import ConsoleMessageSerializePerform
+
+    serializers = {
+        element_type: converter
+        for element_type, (name, converter) in SERIALIZERS.items()
+        if _registered(artifacts, MessageSerializeSign(element_type))
+        is getattr(ConsoleMessageSerializePerform, name)
+    }
+    deserializers = {
+        element_type: converter
+        for element_type, (name, converter) in DESERIALIZERS.items()
+        if _registered(artifacts, MessageDeserializeSign(element_type.__name__))
+        is getattr(ConsoleMessageDeserializePerform, name)
+    }
+    return serializers, deserializers
+
+
+def _transcode(
+    elements: List[Any], table: Converters
+) -> Tuple[List[Optional[Any]], List[int]]:
+    """一次遍历转换全部已知元素, 返回结果与未知元素的下标"""
+    result: List[Optional[Any]] = []
+    unknown: List[int] = []
+    for index, element in enumerate(elements):
+        converter = table.get(type(element))
+        if converter is None:
+            unknown.append(index)
+            result.append(None)
+        else:
+            result.append(converter(element))
+    return result, unknown
+
+
+async def serialize_message(
+    account: ConsoleAccount, message: MessageChain
+) -> ConsoleMessage:
+    """把 MessageChain 批量转换为 ConsoleMessage
+
+    未知类型或被其他 perform 覆盖的元素会集中交给 `Staff.serialize_message` 处理一次.
+    """
+    serializers, _ = account.get_transcoders()
+    result, unknown = _transcode(message.content, serializers)
+    if unknown:
+        fallback = await account.get_staff().serialize_message(
+            MessageChain([message.content[index] for index in unknown])
+        )
+        for index, element in zip(unknown, fallback):
+            result[index] = element
+    return ConsoleMessage(result)  # type: ignore
+
+
+async def deserialize_message(
+    account: ConsoleAccount, message: ConsoleMessage
+) -> MessageChain:
+    """把 ConsoleMessage 批量转换为 MessageChain
+
+    未知类型或被其他 perform 覆盖的元素会集中交给 `Staff.deserialize_message` 处理一次.
+    """
+    _, deserializers = account.get_transcoders()
+    result, unknown = _transcode(message.content, deserializers)
+    if unknown:
+        fallback = await account.get_staff(
+            element_typer=element_type_name
+        ).deserialize_message([message.content[index] for index in unknown])
+        for index, element in zip(unknown, fallback.content):
+            result[index] = element
+    return MessageChain(result)  # type: ignore
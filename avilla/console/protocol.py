@@ -1,17 +1,72 @@
 from __future__ import annotations
 
+from pathlib import Path
+from typing import Iterable, List, Optional, Union
+
 from avilla.core.application import Avilla
 from avilla.core.protocol import BaseProtocol
 
+from .frontend.dispatch import DISPATCH_QUEUE_SIZE, DISPATCH_WORKERS, DispatchPolicy
+from .frontend.info import Scene
+from .frontend.log_redirect import LOG_LEVEL
 from .service import ConsoleService
 
 
 class ConsoleProtocol(BaseProtocol):
     service: ConsoleService
     name: str
+    transcript: Optional[Path]
+    headless: bool
+    socket: Optional[Path]
+    ui_thread: bool
+    log_level: Union[str, int]
+    log_spill: Optional[Path]
+    dispatch_workers: int
+    dispatch_queue_size: int
+    dispatch_policy: DispatchPolicy
+    scenes: List[Scene]
 
-    def __init__(self, name: str = "robot"):
+    def __init__(
+        self,
+        name: str = "robot",
+        transcript: Union[str, Path, None] = None,
+        headless: bool = False,
+        dispatch_workers: int = DISPATCH_WORKERS,
+        dispatch_queue_size: int = DISPATCH_QUEUE_SIZE,
+        dispatch_policy: Union[str, DispatchPolicy] = DispatchPolicy.BLOCK,
+        scenes: Iterable[Scene] = (),
+        socket: Union[str, Path, None] = None,
+        ui_thread: bool = False,
+        log_level: Union[str, int] = LOG_LEVEL,
+        log_spill: Union[str, Path, None] = None,
+    ):
+        """
+        Args:
+            name: 机器人的昵称
+            transcript: 持久化聊天记录的目录, 为 None 时不保存聊天记录
+            headless: 是否以无界面模式运行, 此时通过 `service.app` (`HeadlessClient`) 收发消息
+            dispatch_workers: 投递事件的 worker 数, 同一用户的事件总由同一个 worker 依次处理
+            dispatch_queue_size: 每个 worker 的队列容量, 至少为 1
+            dispatch_policy: 队列已满时等待 (`"block"`) 还是丢弃 (`"drop"`)
+            scenes: 预先注册的场景, 例如模拟的群聊; 私聊场景会在用户发言时自动创建
+            socket: 不为 None 时不在本进程中启动界面, 而是监听该 Unix 套接字,
+                由独立的 `avilla-console` 进程连接并显示界面
+            ui_thread: 是否在独立的线程与事件循环中运行界面
+            log_level: 写入控制台的日志的最低等级, 更低等级的日志在 loguru 中即被过滤
+            log_spill: 保存超出内存上限的日志的目录, 日志压缩后轮换写入, 可在日志视图中向上翻阅;
+                为 None 时超出上限的日志直接丢弃
+        """
         self.name = name
+        self.transcript = Path(transcript) if transcript is not None else None
+        self.headless = headless
+        self.dispatch_workers = dispatch_workers
+        self.dispatch_queue_size = dispatch_queue_size
+        self.dispatch_policy = DispatchPolicy(dispatch_policy)
+        self.scenes = list(scenes)
+        self.socket = Path(socket) if socket is not None else None
+        self.ui_thread = ui_thread
+        self.log_level = log_level
+        self.log_spill = Path(log_spill) if log_spill is not None else None
 
     @classmethod
     def __init_isolate__(cls):  # ruff: noqa: F401
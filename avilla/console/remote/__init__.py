@@ -0,0 +1,3 @@
+from .client import RemoteFrontend as RemoteFrontend
+from .server import ConsoleServer as ConsoleServer
+from .thread import ThreadedConsole as ThreadedConsole
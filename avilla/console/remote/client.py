@@ -0,0 +1,225 @@
+import argparse
+import asyncio
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Union, cast
+
+from loguru import logger
+
+from avilla.console.element import Text
+from avilla.console.message import ConsoleMessage
+
+from ..frontend.app import ConsoleApp
+from ..frontend.codec import (
+    decode_event,
+    decode_log,
+    decode_scene,
+    decode_user,
+    encode_event,
+    encode_message,
+    encode_user,
+)
+from ..frontend.info import Event, MessageEvent, Robot
+from ..frontend.log_redirect import LOG_LEVEL
+from ..frontend.storage import Storage
+from .connection import DEFAULT_SOCKET, connect
+
+if TYPE_CHECKING:
+    from .server import Peer
+
+RECONNECT_INTERVAL = 1.0
+
+
+class MirrorFrontend(ConsoleApp):
+    """显示 `ConsoleServer` 推送的副本的界面
+
+    界面有自己的事件循环与 Storage, 只通过 `connection` 与机器人交换操作 (见 `ConsoleServer`),
+    渲染不会拖慢机器人, 机器人的处理器阻塞时界面也能继续响应输入.
+    """
+
+    def __init__(
+        self,
+        log_level: Union[str, int] = LOG_LEVEL,
+        post: Optional[Callable[..., Any]] = None,
+        log_spill: Union[str, Path, None] = None,
+    ):
+        """
+        Args:
+            log_level: 界面自身日志的最低等级
+            post: 界面运行在另一个线程中时, 用于把日志投递到该线程的函数
+            log_spill: 保存超出内存上限的日志的目录
+        """
+        super().__init__(
+            Storage(log_spill_path=Path(log_spill) if log_spill else None),
+            log_level,
+            post,
+        )
+        self.connection: Optional["Peer"] = None
+        # 下一行日志在机器人的日志历史中的序号, 尚未同步过或机器人重启后为 None
+        self._log_seq: Optional[int] = None
+        self._session: Optional[str] = None
+
+    def handle_op(self, op: Dict[str, Any]):
+        storage = self.storage
+        if op["op"] == "events":
+            self.write_events(op["events"])
+        elif op["op"] == "update":
+            for data in op["events"]:
+                storage.sync_message(cast(MessageEvent, decode_event(data)))
+        elif op["op"] == "log":
+            self.write_logs(op["lines"], op.get("seq", -1))
+        elif op["op"] == "bell":
+            self.bell()
+        elif op["op"] == "sync":
+            if op.get("session") != self._session:
+                self._session = op.get("session")
+                self._log_seq = None
+            for data in op["users"]:
+                user = decode_user(data)
+                storage.users[user.id] = user
+            storage.set_user(decode_user(op["user"]))
+            for data in op["scenes"]:
+                storage.add_scene(decode_scene(data))
+        elif op["op"] == "sync_events":
+            # 重连时补齐本地还没有的消息, 并更新断开期间被编辑或撤回的消息
+            missing = []
+            for data in op["events"]:
+                message = storage.get_message(data["msg_id"])
+                if message is None:
+                    missing.append(data)
+                elif message.revision != data.get("revision", 0):
+                    storage.sync_message(cast(MessageEvent, decode_event(data)))
+            self.write_events(missing)
+        elif op["op"] == "sync_logs":
+            self.write_logs(op["logs"], op["seq"])
+
+    def write_events(self, events: List[Dict[str, Any]]):
+        messages = [cast(MessageEvent, decode_event(data)) for data in events]
+        for message in messages:
+            if not isinstance(message.user, Robot):
+                self.storage.users.setdefault(message.user.id, message.user)
+        self.storage.write_chat(*messages)
+
+    def write_logs(self, lines: List[Any], seq: int):
+        """写入机器人的日志, 跳过按序号判断本地已经有的部分
+
+        Args:
+            lines: 编码后的日志
+            seq: 第一行在机器人的日志历史中的序号, 未知时为 -1
+        """
+        if seq < 0:
+            seq = self._log_seq or 0
+        elif self._log_seq is not None:
+            skip = min(max(self._log_seq - seq, 0), len(lines))
+            lines = lines[skip:]
+            seq += skip
+        self._log_seq = seq + len(lines)
+        if lines:
+            self.storage.write_log(*map(decode_log, lines))
+
+    def send(self, op: Dict[str, Any]) -> bool:
+        if self.connection is None:
+            self.bell()
+            logger.warning("not connected to the bot, message dropped")
+            return False
+        self.connection.send(op)
+        return True
+
+    async def action_post_message(self, message: str):
+        speaker = self.storage.current_speaker()
+        self.send(
+            {
+                "op": "send",
+                "message": encode_message(ConsoleMessage([Text(message)])),
+                "user": encode_user(speaker),
+                "scene": self.storage.scene_of(speaker),
+            }
+        )
+
+    async def action_post_event(self, event: Event):
+        self.send({"op": "event", "event": encode_event(event)})
+
+
+class RemoteFrontend(MirrorFrontend):
+    """通过 Unix 套接字连接到另一个进程中的 `ConsoleServer`
+
+    连接断开后每隔 `reconnect_interval` 秒重试, 重连后按快照补齐缺失的消息.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_SOCKET,
+        reconnect_interval: float = RECONNECT_INTERVAL,
+        log_level: Union[str, int] = LOG_LEVEL,
+        log_spill: Union[str, Path, None] = None,
+    ):
+        super().__init__(log_level, log_spill=log_spill)
+        self.path = Path(path)
+        self.reconnect_interval = reconnect_interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start_client(self) -> None:
+        self._task = asyncio.create_task(self.keep_connected())
+
+    def stop_client(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+        self.storage.close()
+
+    async def keep_connected(self):
+        while True:
+            try:
+                connection = await connect(self.path)
+            except OSError:
+                self.sub_title = f"Waiting for {self.path}"  # type: ignore
+                await asyncio.sleep(self.reconnect_interval)
+                continue
+            self.connection = connection
+            self.sub_title = f"Connected to {self.path}"  # type: ignore
+            try:
+                async for op in connection.receive():
+                    try:
+                        self.handle_op(op)
+                    except Exception as e:
+                        logger.warning(f"ignored malformed console operation: {e!r}")
+            finally:
+                connection.close()
+                self.connection = None
+            self.sub_title = "Disconnected, reconnecting..."  # type: ignore
+            logger.warning(f"lost connection to {self.path}")
+            await asyncio.sleep(self.reconnect_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="avilla-console",
+        description="连接到以 `ConsoleProtocol(socket=...)` 运行的机器人并显示控制台",
+    )
+    parser.add_argument(
+        "socket", nargs="?", default=str(DEFAULT_SOCKET), help="机器人监听的套接字路径"
+    )
+    parser.add_argument(
+        "--reconnect-interval",
+        type=float,
+        default=RECONNECT_INTERVAL,
+        help="断开后重连的间隔 (秒)",
+    )
+    parser.add_argument(
+        "--log-level",
+        default=LOG_LEVEL,
+        help="界面自身日志的最低等级, 机器人的日志由 `ConsoleProtocol.log_level` 过滤",
+    )
+    parser.add_argument(
+        "--log-spill", default=None, help="保存超出内存上限的日志的目录"
+    )
+    args = parser.parse_args()
+    RemoteFrontend(
+        args.socket, args.reconnect_interval, args.log_level, args.log_spill
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import asyncio
+import tempfile
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Union
+
+from loguru import logger
+
+from ..frontend.codec import encode_frames, read_frame
+
+DEFAULT_SOCKET = Path(tempfile.gettempdir()) / "avilla-console.sock"
+MAX_WRITE_BUFFER = 8 * 1024 * 1024
+
+
+class Connection:
+    """机器人进程与界面进程之间的一条连接
+
+    `send` 只把操作放入待发送队列, 同一轮事件循环中发送的操作会合并写出, 过大时拆分为多帧.
+    对端读取过慢, 写缓冲超过 `MAX_WRITE_BUFFER` 时断开连接, 由对端重连后重新同步.
+    快照等大量数据在 `pause` 与 `resume` 之间发送, 按帧等待对端读取, 不受该限制.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self._loop = asyncio.get_running_loop()
+        self._pending: List[Dict[str, Any]] = []
+        self._flush_scheduled = False
+        self._paused = False
+
+    @property
+    def closed(self) -> bool:
+        return self.writer.is_closing()
+
+    def send(self, op: Dict[str, Any]) -> None:
+        if self.closed:
+            return
+        self._pending.append(op)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._loop.call_soon_threadsafe(self.flush)
+
+    def flush(self) -> None:
+        self._flush_scheduled = False
+        if self._paused:
+            return
+        if not self._pending or self.closed:
+            self._pending.clear()
+            return
+        ops, self._pending = self._pending, []
+        for frame in encode_frames(ops):
+            self.writer.write(frame)
+        if self.writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            self.close()
+
+    def _stalled(self) -> bool:
+        return (
+            self._paused
+            or self.writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER
+        )
+
+    def pause(self) -> None:
+        """暂停写出, 之后发送的操作留在队列中, 直到调用 `resume`"""
+        self._paused = True
+
+    async def resume(self) -> None:
+        """逐帧写出队列中的操作并等待对端读取, 之后恢复正常写出"""
+        try:
+            while self._pending and not self.closed:
+                ops, self._pending = self._pending, []
+                for frame in encode_frames(ops):
+                    self.writer.write(frame)
+                    await self.writer.drain()
+        finally:
+            self._paused = False
+        self.flush()
+
+    async def receive(self) -> AsyncIterator[Dict[str, Any]]:
+        """依次产出对端发来的操作, 连接关闭时结束"""
+        try:
+            while True:
+                for op in await read_frame(self.reader):
+                    yield op
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return
+        except ValueError as e:
+            # 帧过大或无法解析时无法继续读取, 视为断开, 由对端重连后重新同步
+            logger.warning(f"dropped console connection: {e}")
+            return
+
+    def close(self) -> None:
+        self._pending.clear()
+        if self._stalled():
+            # 对端不再读取时, 正常关闭要等写缓冲清空, 直接中止连接
+            self.writer.transport.abort()
+        else:
+            self.writer.close()
+
+
+async def connect(path: Union[str, Path]) -> Connection:
+    reader, writer = await asyncio.open_unix_connection(str(path))
+    return Connection(reader, writer)
@@ -0,0 +1,240 @@
+import asyncio
+import contextlib
+import errno
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Protocol, Set
+
+from loguru import logger
+from textual.message import Message
+
+from ..frontend.client import ConsoleClient
+from ..frontend.codec import (
+    decode_event,
+    decode_message,
+    decode_user,
+    encode_event,
+    encode_log,
+    encode_scene,
+    encode_user,
+)
+from ..frontend.log_redirect import add_log_sink
+from ..frontend.storage import MessageUpdate, StateChange, Storage
+from .connection import DEFAULT_SOCKET, Connection
+
+if TYPE_CHECKING:
+    from avilla.console.protocol import ConsoleProtocol
+
+SYNC_CHUNK = 500
+SHUTDOWN_TIMEOUT = 1
+
+
+async def remove_stale_socket(path: Path) -> None:
+    """删除上次运行残留的套接字文件, 否则监听会失败
+
+    该路径上仍有进程在监听 (如另一个机器人) 时抛出 `OSError`, 不会抢占它的套接字.
+    """
+    if not path.exists():
+        return
+    if not path.is_socket():
+        raise OSError(errno.EEXIST, f"console socket path is not a socket: {path}")
+    try:
+        _, writer = await asyncio.open_unix_connection(str(path))
+    except ConnectionRefusedError:
+        with contextlib.suppress(FileNotFoundError):
+            path.unlink()
+        return
+    writer.close()
+    raise OSError(errno.EADDRINUSE, f"console socket is already in use: {path}")
+
+
+class Peer(Protocol):
+    """一个连接的界面, 如 `Connection`"""
+
+    def send(self, op: Dict[str, Any]) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class ConsoleServer(ConsoleClient):
+    """通过 Unix 套接字为独立进程中的界面 (`avilla-console`) 提供控制台
+
+    账号, 分发队列与 Storage 都留在机器人进程中, 界面只保存一份副本.
+    界面连接时先收到场景, 用户, 最近的聊天记录与日志的快照, 之后按帧增量同步;
+    界面可以随时断开与重连, 机器人不受影响.
+
+    机器人发往界面的操作:
+
+    - `sync`: 连接时快照的开头, 包括本次运行的标识, 用户与场景
+    - `sync_events`: 快照中的一段消息, 至多 `SYNC_CHUNK` 条
+    - `sync_logs`: 快照中的一段日志, 以及第一行在日志历史中的序号
+    - `events`: 新消息
+    - `update`: 被编辑或撤回的消息
+    - `log`: 日志行, 以及第一行在日志历史中的序号
+    - `bell`: 响铃
+
+    界面发往机器人的操作:
+
+    - `send`: 以用户的身份发送一条消息
+    - `event`: 投递一个事件
+    """
+
+    def __init__(self, protocol: "ConsoleProtocol", storage: Optional[Storage] = None):
+        if storage is None:
+            storage = Storage(
+                transcript_path=protocol.transcript, log_spill_path=protocol.log_spill
+            )
+        super().__init__(protocol, storage)
+        self.path = Path(protocol.socket or DEFAULT_SOCKET)
+        self.peers: Set[Peer] = set()
+        self.session = uuid.uuid4().hex
+        """本次运行的标识, 界面据此判断重连后的日志序号是否连续"""
+        self._exit: Optional[asyncio.Event] = None
+        self._handlers: Set["asyncio.Task[None]"] = set()
+
+    def bell(self) -> None:
+        self.broadcast({"op": "bell"})
+
+    def broadcast(self, op: Dict[str, Any]) -> None:
+        for peer in self.peers:
+            peer.send(op)
+
+    def post_message(self, message: Message) -> bool:
+        if isinstance(message, StateChange):
+            if message.scene is None:
+                lines = [encode_log(line) for line in message.data]
+                self.broadcast({"op": "log", "seq": message.seq, "lines": lines})
+            else:
+                self.broadcast(
+                    {"op": "events", "events": [encode_event(e) for e in message.data]}
+                )
+        elif isinstance(message, MessageUpdate):
+            history = self.storage.scene(message.scene).history
+            events = [history.get(seq) for seq in message.seqs]
+            self.broadcast(
+                {"op": "update", "events": [encode_event(e) for e in events if e]}
+            )
+        return True
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """新界面的快照, 拆分为若干个操作"""
+        storage = self.storage
+        ops: List[Dict[str, Any]] = [
+            {
+                "op": "sync",
+                "session": self.session,
+                "user": encode_user(storage.current_user),
+                "users": [encode_user(user) for user in storage.users.values()],
+                "scenes": [
+                    encode_scene(scene.info) for scene in storage.scenes.values()
+                ],
+            }
+        ]
+        events = [
+            encode_event(event)
+            for scene in storage.scenes.values()
+            for event in scene.history
+        ]
+        for start in range(0, len(events), SYNC_CHUNK):
+            ops.append(
+                {"op": "sync_events", "events": events[start : start + SYNC_CHUNK]}
+            )
+        history = storage.log_history
+        logs = [encode_log(line) for line in history]
+        for start in range(0, len(logs), SYNC_CHUNK):
+            ops.append(
+                {
+                    "op": "sync_logs",
+                    "seq": history.first_seq + start,
+                    "logs": logs[start : start + SYNC_CHUNK],
+                }
+            )
+        return ops
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        peer = Connection(reader, writer)
+        task = asyncio.current_task()
+        if task is not None:
+            self._handlers.add(task)
+            task.add_done_callback(self._handlers.discard)
+        # 快照可能超过写缓冲的上限: 暂停写出, 之后逐帧等待对端读取, 此后的变化排在快照之后
+        peer.pause()
+        self.attach(peer)
+        try:
+            await peer.resume()
+            async for op in peer.receive():
+                try:
+                    await self.handle_op(op)
+                except Exception as e:
+                    logger.warning(f"ignored malformed console operation: {e!r}")
+        except ConnectionError:
+            pass
+        finally:
+            self.detach(peer)
+
+    def attach(self, peer: Peer) -> None:
+        """向新界面发送快照, 之后的变化都会推送给它"""
+        # 先把积压的记录推给已有的界面, 快照之后的记录才会推给新界面
+        self.storage.flush()
+        for op in self.snapshot():
+            peer.send(op)
+        self.peers.add(peer)
+        logger.info(f"console frontend connected ({len(self.peers)} in total)")
+
+    def detach(self, peer: Peer) -> None:
+        self.peers.discard(peer)
+        peer.close()
+        logger.info(f"console frontend disconnected ({len(self.peers)} left)")
+
+    async def handle_op(self, op: Dict[str, Any]):
+        """处理界面发来的一个操作, 操作格式不正确时抛出异常"""
+        kind = op.get("op") if isinstance(op, dict) else None
+        if kind == "send":
+            scene = op.get("scene")
+            if scene is not None and not (isinstance(scene, str) and scene):
+                raise ValueError(f"invalid scene: {scene!r}")
+            await self.inject_message(
+                decode_message(op["message"]), decode_user(op["user"]), scene
+            )
+        elif kind == "event":
+            await self.dispatcher.submit(decode_event(op["event"]))
+        else:
+            raise ValueError(f"unknown console operation: {kind!r}")
+
+    async def run_async(self):
+        """监听套接字并上线账号, 直到调用 `exit`"""
+        self._exit = asyncio.Event()
+        await remove_stale_socket(self.path)
+        server = await asyncio.start_unix_server(
+            self.handle_connection, path=str(self.path)
+        )
+        self.storage.add_chat_watcher(self)
+        self.storage.add_log_watcher(self)
+        # 保留机器人进程原有的日志输出, 另外把日志转发给界面
+        sink = add_log_sink(self.storage, self.protocol.log_level)
+        self.start_client()
+        logger.info(f"console is listening on {self.path}")
+        try:
+            await self._exit.wait()
+        finally:
+            logger.remove(sink)
+            server.close()
+            for peer in list(self.peers):
+                peer.close()
+            await server.wait_closed()
+            if self._handlers:
+                # 连接关闭后处理任务很快结束, 等它们退出以免在事件循环关闭时被取消
+                await asyncio.wait(self._handlers, timeout=SHUTDOWN_TIMEOUT)
+            self.storage.remove_log_watcher(self)
+            self.storage.remove_chat_watcher(self)
+            self.stop_client()
+            with contextlib.suppress(FileNotFoundError):
+                self.path.unlink()
+
+    def exit(self):
+        if self._exit is not None:
+            self._exit.set()
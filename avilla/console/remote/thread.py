@@ -0,0 +1,234 @@
+import asyncio
+import signal
+import threading
+from collections import deque
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Optional,
+    Tuple,
+    Type,
+    cast,
+)
+
+from loguru import logger
+from textual.driver import Driver
+
+from ..frontend.dispatch import Dispatcher
+from ..frontend.storage import Storage
+from .client import MirrorFrontend
+from .server import ConsoleServer
+
+try:
+    from textual.drivers import linux_driver
+except ImportError:  # Windows
+    linux_driver = None
+
+if TYPE_CHECKING:
+    from avilla.console.protocol import ConsoleProtocol
+
+
+class ThreadBridge:
+    """把回调批量投递给另一个线程中的事件循环
+
+    `post` 可以在任意线程中调用, 只向无锁的 `deque` 追加;
+    每批回调只唤醒目标事件循环一次, 并在 `interval` 秒后于目标线程中依次执行.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, interval: float = 0):
+        self.loop = loop
+        self.interval = interval
+        self._queue: Deque[Tuple[Callable[..., Any], Tuple[Any, ...]]] = deque()
+        self._scheduled = False
+
+    def post(self, callback: Callable[..., Any], *args: Any) -> None:
+        self._queue.append((callback, args))
+        if not self._scheduled:
+            self._scheduled = True
+            try:
+                self.loop.call_soon_threadsafe(self._schedule)
+            except RuntimeError:
+                # 目标事件循环已经关闭
+                self._queue.clear()
+
+    @property
+    def pending(self) -> int:
+        """尚未执行的回调数"""
+        return len(self._queue)
+
+    def _schedule(self) -> None:
+        if self.interval > 0:
+            self.loop.call_later(self.interval, self.drain)
+        else:
+            self.drain()
+
+    def drain(self) -> None:
+        # 先清除标记再取出回调, 取出期间追加的回调最多多唤醒一次, 不会遗漏
+        self._scheduled = False
+        queue = self._queue
+        while queue:
+            callback, args = queue.popleft()
+            callback(*args)
+
+
+class BridgePeer:
+    """经由 `ThreadBridge` 把操作交给另一个线程中的处理函数"""
+
+    def __init__(
+        self, bridge: ThreadBridge, handler: Callable[[Dict[str, Any]], Any]
+    ):
+        self.bridge = bridge
+        self.handler = handler
+
+    def send(self, op: Dict[str, Any]) -> None:
+        self.bridge.post(self.handler, op)
+
+    def close(self) -> None:
+        ...
+
+
+class _ThreadSignal:
+    """代替 `linux_driver` 中的 `signal` 模块
+
+    在登记过的线程中注册的信号处理器转交给对应的主线程事件循环, 其余调用原样交给 `signal`.
+    textual (<1.0) 的 `LinuxDriver` 只在 `start_application_mode` 与 `disable_input`
+    中调用 `signal.signal`, 因此只需安装一次, 不影响主线程中运行的驱动.
+    """
+
+    def __init__(self):
+        self.loops: Dict[int, asyncio.AbstractEventLoop] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(signal, name)
+
+    def signal(self, signalnum: int, handler: Any) -> Any:
+        loop = self.loops.get(threading.get_ident())
+        if loop is None:
+            return signal.signal(signalnum, handler)
+        loop.call_soon_threadsafe(signal.signal, signalnum, handler)
+
+
+def thread_driver(
+    base: Type[Driver], main_loop: asyncio.AbstractEventLoop
+) -> Type[Driver]:
+    """让驱动可以在非主线程中运行
+
+    `LinuxDriver` 通过 `signal.signal` 监听终端大小的变化, 而信号处理器只能在主线程中注册.
+    """
+    if linux_driver is None or not issubclass(base, linux_driver.LinuxDriver):
+        return base
+    if not isinstance(linux_driver.signal, _ThreadSignal):
+        linux_driver.signal = _ThreadSignal()  # type: ignore
+    thread_signal = cast(_ThreadSignal, linux_driver.signal)
+
+    class ThreadDriver(base):  # type: ignore
+        def start_application_mode(self) -> None:
+            thread_signal.loops[threading.get_ident()] = main_loop
+            super().start_application_mode()
+
+        def stop_application_mode(self) -> None:
+            try:
+                super().stop_application_mode()
+            finally:
+                thread_signal.loops.pop(threading.get_ident(), None)
+
+    return ThreadDriver
+
+
+class ThreadFrontend(MirrorFrontend):
+    """在独立线程的事件循环中运行的界面, 通过 `ThreadBridge` 与机器人所在的事件循环交换操作"""
+
+    def __init__(self, server: "ThreadedConsole", loop: asyncio.AbstractEventLoop):
+        # 机器人 -> 界面: 日志可能来自任意线程, 同样经由桥写入界面的 Storage;
+        # 界面的 Storage 已经按帧合并通知, 桥只需在下一次循环中投递
+        bridge = ThreadBridge(loop)
+        super().__init__(
+            server.protocol.log_level, bridge.post, server.protocol.log_spill
+        )
+        self.server = server
+        self.bridge = bridge
+        self.driver_class = thread_driver(self.driver_class, server.loop)
+        self._peer = BridgePeer(self.bridge, self.handle_op)
+
+    @property
+    def bot_loop(self) -> asyncio.AbstractEventLoop:
+        return self.server.loop
+
+    @property
+    def dispatcher(self) -> Dispatcher:
+        return self.server.dispatcher
+
+    def start_client(self) -> None:
+        self.connection = BridgePeer(self.server.bridge, self.server.ops.put_nowait)
+        self.server.bridge.post(self.server.attach, self._peer)
+
+    def stop_client(self) -> None:
+        self.connection = None
+        self.server.bridge.post(self.server.detach, self._peer)
+        self.storage.close()
+
+
+class ThreadedConsole(ConsoleServer):
+    """在独立线程中运行界面的控制台
+
+    账号, 分发队列与 Storage 留在机器人的事件循环中, 界面在自己的线程与事件循环中显示副本.
+    两个事件循环之间只通过 `ThreadBridge` 传递操作: 繁重的渲染不会增加机器人处理器的延迟,
+    阻塞的处理器也不会卡住输入.
+    """
+
+    loop: asyncio.AbstractEventLoop
+    bridge: ThreadBridge
+    """界面 -> 机器人"""
+    ops: "asyncio.Queue[Dict[str, Any]]"
+    """界面发来的操作, 在机器人的事件循环中依次处理"""
+
+    def __init__(self, protocol: "ConsoleProtocol"):
+        # 日志只写入界面的 Storage, 由界面打开 `log_spill`; 两个 Storage 不能写入同一个目录
+        super().__init__(protocol, Storage(transcript_path=protocol.transcript))
+        self.frontend: Optional[ThreadFrontend] = None
+
+    def _run_frontend(self, loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(cast(ThreadFrontend, self.frontend).run_async())
+        finally:
+            loop.close()
+
+    async def run_async(self):
+        """在独立线程中启动界面并上线账号, 直到调用 `exit`"""
+        self._exit = asyncio.Event()
+        self.loop = asyncio.get_running_loop()
+        self.bridge = ThreadBridge(self.loop)
+        self.ops = asyncio.Queue()
+        ui_loop = asyncio.new_event_loop()
+        self.frontend = ThreadFrontend(self, ui_loop)
+        thread = threading.Thread(
+            target=self._run_frontend,
+            args=(ui_loop,),
+            name="avilla-console-ui",
+            daemon=True,
+        )
+        self.storage.add_chat_watcher(self)
+        self.start_client()
+        thread.start()
+        consumer = asyncio.create_task(self.consume_ops())
+        try:
+            await self._exit.wait()
+        finally:
+            consumer.cancel()
+            if thread.is_alive():
+                ui_loop.call_soon_threadsafe(self.frontend.exit)
+                await self.loop.run_in_executor(None, thread.join)
+            self.storage.remove_chat_watcher(self)
+            self.stop_client()
+
+    async def consume_ops(self):
+        while True:
+            op = await self.ops.get()
+            try:
+                await self.handle_op(op)
+            except Exception as e:
+                logger.warning(f"ignored malformed console operation: {e!r}")
@@ -5,7 +5,8 @@ from typing import TYPE_CHECKING
 
 from launart import Launart, Launchable
 
-from avilla.console.frontend import Frontend
+from avilla.console.frontend import Frontend, HeadlessClient
+from avilla.console.remote import ConsoleServer, ThreadedConsole
 
 if TYPE_CHECKING:
     from .protocol import ConsoleProtocol
@@ -15,11 +16,18 @@ class ConsoleService(Launchable):
     id = "console.service"
     required: set[str] = set()
     stages: set[str] = {"preparing", "blocking", "cleanup"}
-    app: Frontend
+    app: Frontend | HeadlessClient | ConsoleServer | ThreadedConsole
     protocol: ConsoleProtocol
 
     def __init__(self, protocol: ConsoleProtocol):
-        self.app = Frontend(protocol)
+        if protocol.socket is not None:
+            self.app = ConsoleServer(protocol)
+        elif protocol.ui_thread:
+            self.app = ThreadedConsole(protocol)
+        elif protocol.headless:
+            self.app = HeadlessClient(protocol)
+        else:
+            self.app = Frontend(protocol)
         self.protocol = protocol
         super().__init__()
 
@@ -0,0 +1,201 @@
+"""热路径各阶段的耗时统计
+
+默认关闭, 关闭时每个埋点只是一次函数调用与一次全局变量判断. 开启后每个阶段的耗时记录在定长的直方图中:
+
+    from avilla.console import timing
+
+    timing.enable()
+    ...
+    print(timing.format_report())
+    p99 = timing.get("parse_event").percentile(99)
+
+埋点的写法:
+
+    start = timing.start()
+    ...
+    timing.stop("stage", start)
+
+阶段:
+
+- `post_event`: `ConsoleClient.post_event`, 即解析事件并交给 Broadcast 的总耗时
+- `parse_event`: `Staff.parse_event`
+- `deserialize`: 把收到的 `ConsoleMessage` 转换为 `MessageChain`
+- `broadcast`: 把解析好的事件交给 `protocol.post_event`
+- `serialize`: `send_console_message` 中把 `MessageChain` 转换为 `ConsoleMessage`
+- `call`: `ConsoleClient.call`
+- `write_chat`: `Storage.write_chat`
+- `mount`: `ChatHistory` 接收一批新消息
+- `render`: 渲染一个消息气泡 (未命中缓存时)
+- `first_paint`: 从消息写入 Storage 到它所在的画面第一次排版完成
+- `layout`: `VirtualList` 排版一帧; 运行状态面板打开时会开启计时, 显示每次刷新之间的增量
+"""
+
+from time import perf_counter_ns
+from typing import Dict, List, Optional, Tuple
+
+SUB_BUCKETS = 8
+"""每个 2 的幂区间内的桶数, 相对误差不超过 1 / SUB_BUCKETS"""
+MAX_BITS = 44
+"""可区分的最大耗时约为 2 ** 44 纳秒 (约 4.9 小时), 更大的值计入最后一个桶"""
+
+_SHIFT = SUB_BUCKETS.bit_length() - 1
+_BUCKETS = (MAX_BITS - _SHIFT) * SUB_BUCKETS + SUB_BUCKETS
+
+enabled = False
+
+
+def _bucket_of(value: int) -> int:
+    if value < SUB_BUCKETS * 2:
+        return value
+    exponent = value.bit_length() - _SHIFT - 1
+    return min(exponent * SUB_BUCKETS + (value >> exponent), _BUCKETS - 1)
+
+
+def _bucket_bounds(index: int) -> Tuple[int, int]:
+    if index < SUB_BUCKETS * 2:
+        return index, index
+    exponent, mantissa = divmod(index, SUB_BUCKETS)
+    exponent -= 1
+    mantissa += SUB_BUCKETS
+    return mantissa << exponent, ((mantissa + 1) << exponent) - 1
+
+
+class Histogram:
+    """以纳秒为单位的定长对数直方图
+
+    每个 2 的幂区间再均分为 `SUB_BUCKETS` 个桶, 记录为 O(1), 占用的内存与记录的次数无关.
+    """
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, value: int) -> None:
+        if not self.count or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+        self.counts[_bucket_of(value)] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> int:
+        """第 p 百分位的耗时 (纳秒), 取所在桶的中点"""
+        if not self.count:
+            return 0
+        rank = max(self.count * p / 100, 1)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                low, high = _bucket_bounds(index)
+                return min(max((low + high) // 2, self.min), self.max)
+        return self.max
+
+    def copy(self) -> "Histogram":
+        histogram = Histogram()
+        histogram.counts = list(self.counts)
+        histogram.count = self.count
+        histogram.total = self.total
+        histogram.min = self.min
+        histogram.max = self.max
+        return histogram
+
+    def since(self, baseline: "Histogram") -> "Histogram":
+        """自 `baseline` (此前的 `copy`) 以来的记录
+
+        最小值与最大值取首尾两个非空桶的边界; 期间被清空过时返回全部记录.
+        """
+        if self.count < baseline.count:
+            return self.copy()
+        histogram = Histogram()
+        histogram.counts = [a - b for a, b in zip(self.counts, baseline.counts)]
+        histogram.count = self.count - baseline.count
+        histogram.total = self.total - baseline.total
+        if histogram.count:
+            used = [index for index, count in enumerate(histogram.counts) if count]
+            histogram.min = max(_bucket_bounds(used[0])[0], self.min)
+            histogram.max = min(_bucket_bounds(used[-1])[1], self.max)
+        return histogram
+
+    def clear(self) -> None:
+        self.counts = [0] * _BUCKETS
+        self.count = self.total = self.min = self.max = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"Histogram(count={self.count}, mean={self.mean:.0f}ns, "
+            f"p50={self.percentile(50)}ns, p99={self.percentile(99)}ns)"
+        )
+
+
+_histograms: Dict[str, Histogram] = {}
+
+
+def enable() -> None:
+    global enabled
+    enabled = True
+
+
+def disable() -> None:
+    global enabled
+    enabled = False
+
+
+def reset() -> None:
+    """清空全部直方图"""
+    for histogram in _histograms.values():
+        histogram.clear()
+
+
+def start() -> int:
+    """开始计时, 关闭时返回 0"""
+    return perf_counter_ns() if enabled else 0
+
+
+def stop(stage: str, start: int) -> None:
+    """结束由 `start` 开始的计时, `start` 为 0 时什么也不做"""
+    if start:
+        record(stage, perf_counter_ns() - start)
+
+
+def record(stage: str, value: int) -> None:
+    """直接记录一个阶段的耗时 (纳秒)"""
+    histogram = _histograms.get(stage)
+    if histogram is None:
+        histogram = _histograms[stage] = Histogram()
+    histogram.record(value)
+
+
+def get(stage: str) -> Optional[Histogram]:
+    return _histograms.get(stage)
+
+
+def histograms() -> Dict[str, Histogram]:
+    """已有记录的各阶段的直方图"""
+    return {stage: hist for stage, hist in _histograms.items() if hist.count}
+
+
+def format_report() -> str:
+    lines = [
+        f"{'stage':<14}{'count':>9}{'mean (us)':>11}"
+        f"{'p50 (us)':>10}{'p95 (us)':>10}{'p99 (us)':>10}{'max (us)':>10}"
+    ]
+    for stage, hist in histograms().items():
+        lines.append(
+            f"{stage:<14}{hist.count:>9}{hist.mean / 1e3:>11.1f}"
+            f"{hist.percentile(50) / 1e3:>10.1f}"
+            f"{hist.percentile(95) / 1e3:>10.1f}"
+            f"{hist.percentile(99) / 1e3:>10.1f}"
+            f"{hist.max / 1e3:>10.1f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,74 @@
+"""消息元素渲染的微基准
+
+    python -m benchmarks.element [--rounds N]
+
+分别测量每条消息第一次 (冷) 与之后每次 (热) 经过 `str` 与宽度测量所需的时间.
+排版时同一条消息会被反复测量, 热路径的耗时即为缓存后的单条消息开销.
+"""
+
+import argparse
+import io
+import time
+from typing import Callable, List
+
+from rich.console import Console
+
+from avilla.console.element import Emoji, Markdown, Markup, Text
+from avilla.console.message import ConsoleMessage
+
+MARKDOWN = """\
+## 菜单
+- /help
+- /echo
+
+```python
+from avilla.console.protocol import ConsoleProtocol
+
+avilla = Avilla(broadcast, launart, [ConsoleProtocol()])
+```
+"""
+
+PAYLOADS = {
+    "text": lambda: ConsoleMessage([Text("Hello, Avilla!")]),
+    "markup": lambda: ConsoleMessage([Markup("[bold red]Hello[/], [i]Avilla[/]!")]),
+    "emoji": lambda: ConsoleMessage([Emoji("art"), Text(" | "), Emoji("apple")]),
+    "markdown": lambda: ConsoleMessage([Markdown(MARKDOWN)]),
+}
+
+
+def layout_pass(console: Console, message: ConsoleMessage) -> None:
+    for element in message:
+        str(element)
+    console.measure(message)
+    console.measure(message, options=console.options.update_width(60))
+
+
+def bench(rounds: int, factory: Callable[[], ConsoleMessage]) -> List[float]:
+    console = Console(file=io.StringIO(), width=80, color_system="truecolor")
+    messages = [factory() for _ in range(rounds)]
+
+    start = time.perf_counter()
+    for message in messages:
+        layout_pass(console, message)
+    cold = (time.perf_counter() - start) / rounds
+
+    start = time.perf_counter()
+    for message in messages:
+        layout_pass(console, message)
+    warm = (time.perf_counter() - start) / rounds
+    return [cold, warm]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'payload':<10}{'cold (us)':>12}{'warm (us)':>12}{'speedup':>10}")
+    for name, factory in PAYLOADS.items():
+        cold, warm = bench(args.rounds, factory)
+        print(f"{name:<10}{cold * 1e6:>12.1f}{warm * 1e6:>12.1f}{cold / warm:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""用回声机器人运行负载脚本
+
+    python -m benchmarks.loadgen [SCRIPT] [--ui] [--timing]
+
+与 `benchmarks.roundtrip` 一样使用本地的 Avilla 替身. 默认以无界面模式运行,
+`--ui` 时挂载完整的 `Frontend` (不占用终端), 两者的差值即为界面带来的开销.
+`--timing` 时另外输出 `avilla.console.timing` 记录的各阶段耗时.
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+
+from avilla.core import MessageReceived
+from graia.broadcast import Broadcast
+
+from avilla.console import timing
+from avilla.console.frontend import Frontend, HeadlessClient
+from avilla.console.loadgen import LoadGenerator, LoadScript, format_report
+from avilla.console.protocol import ConsoleProtocol
+from avilla.console.service import ConsoleService
+
+from .roundtrip import StandInAvilla
+
+SCRIPT = Path(__file__).with_name("load.json")
+
+
+async def run(script: LoadScript, ui: bool):
+    broadcast = Broadcast(loop=asyncio.get_running_loop())
+
+    @broadcast.receiver(MessageReceived)
+    async def echo(event: MessageReceived):
+        await event.context.scene.send_message(event.message.content)
+
+    protocol = ConsoleProtocol(headless=not ui)
+    protocol.avilla = StandInAvilla(broadcast)  # type: ignore
+    protocol.service = ConsoleService(protocol)
+    client = protocol.service.app
+
+    if isinstance(client, Frontend):
+        async with client.run_test(size=(120, 40)):
+            stats = await LoadGenerator(client, script).run()
+    else:
+        assert isinstance(client, HeadlessClient)
+        task = asyncio.create_task(client.run_async())
+        await asyncio.sleep(0)
+        try:
+            stats = await LoadGenerator(client, script).run()
+        finally:
+            client.exit()
+            await task
+    print(format_report(stats))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("script", nargs="?", type=Path, default=SCRIPT)
+    parser.add_argument("--ui", action="store_true", help="挂载 Textual 界面")
+    parser.add_argument("--timing", action="store_true", help="输出各阶段的耗时")
+    args = parser.parse_args()
+    if args.timing:
+        timing.enable()
+    asyncio.run(run(LoadScript.load(args.script), args.ui))
+    if args.timing:
+        print()
+        print(timing.format_report())
+
+
+if __name__ == "__main__":
+    main()
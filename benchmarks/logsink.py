@@ -0,0 +1,75 @@
+"""日志 sink 的微基准
+
+    python -m benchmarks.logsink [--rounds N]
+
+分别测量以文本 sink (`FakeIO`, 输出带颜色的字符串再解析 ANSI) 与结构化 sink (`LogSink`)
+写入一条日志的耗时 (`log`), 以及写入后渲染为一屏文本的耗时 (`render`).
+`filtered` 为低于最低等级, 被 loguru 直接过滤的日志的耗时.
+"""
+
+import argparse
+import io
+import time
+from typing import Any, Callable, Tuple, cast
+
+from loguru import logger
+from rich.console import Console
+
+from avilla.console.frontend.log_redirect import FakeIO, add_log_sink
+from avilla.console.frontend.storage import Storage
+
+
+def text_sink(storage: Storage) -> int:
+    return logger.add(
+        cast(Any, FakeIO(storage)), level="DEBUG", diagnose=False, colorize=True
+    )
+
+
+def structured_sink(storage: Storage) -> int:
+    return add_log_sink(storage, "DEBUG")
+
+
+def bench(
+    rounds: int, add_sink: Callable[[Storage], int]
+) -> Tuple[float, float, float]:
+    storage = Storage(max_log_records=rounds)
+    console = Console(file=io.StringIO(), width=120, color_system="truecolor")
+    sink = add_sink(storage)
+    try:
+        start = time.perf_counter()
+        for index in range(rounds):
+            logger.info("handled message {} from {}", index, "console")
+        log = (time.perf_counter() - start) / rounds
+
+        start = time.perf_counter()
+        for index in range(rounds):
+            logger.trace("trace message {}", index)
+        filtered = (time.perf_counter() - start) / rounds
+    finally:
+        logger.remove(sink)
+
+    start = time.perf_counter()
+    options = console.options.update_width(120)
+    for record in storage.log_history:
+        console.render_lines(record, options, pad=False)
+    render = (time.perf_counter() - start) / rounds
+    return log, render, filtered
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=5000)
+    args = parser.parse_args()
+
+    logger.remove()
+    print(f"{'sink':<12}{'log (us)':>10}{'render (us)':>13}{'filtered (us)':>15}")
+    for name, add_sink in (("text", text_sink), ("structured", structured_sink)):
+        log, render, filtered = bench(args.rounds, add_sink)
+        print(
+            f"{name:<12}{log * 1e6:>10.1f}{render * 1e6:>13.1f}"
+            f"{filtered * 1e6:>15.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
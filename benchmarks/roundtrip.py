@@ -0,0 +1,130 @@
+"""端到端的消息往返基准
+
+    python -m benchmarks.roundtrip [--rounds N] [--warmup N]
+
+以无界面模式运行 `ConsoleProtocol`, 使用一个只包含 Broadcast 的本地 Avilla 替身, 不启动终端界面.
+每条用户消息依次经过 `inject_message` -> `post_event` -> `Staff.parse_event`
+-> `ConsoleEventMessagePerform.console_message` -> Broadcast -> 回声机器人
+-> `ConsoleMessageActionPerform.send_console_message` -> `call("send_msg")`
+-> `Storage.write_chat`,
+直到机器人的回复被观察者收到为止. 对每种消息报告往返延迟的 p50/p95/p99 与每秒消息数.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from avilla.core.account import AccountInfo
+from avilla.core.ryanvk.isolate import Isolate
+from avilla.core.selector import Selector
+from avilla.standard.core.message import MessageReceived
+from graia.broadcast import Broadcast
+
+from avilla.console.element import Emoji, Markdown, Markup, Text
+from avilla.console.frontend import HeadlessClient
+from avilla.console.message import ConsoleMessage
+from avilla.console.protocol import ConsoleProtocol
+from avilla.console.service import ConsoleService
+
+SECTION = """\
+## 第 {index} 节
+
+- 列表项 **加粗** 与 *斜体*
+- `行内代码` 与 [链接](https://github.com/GraiaProject/Avilla)
+
+```python
+async def on_message_received(ctx: Context):
+    await ctx.scene.send_message("Hello, Avilla!")
+```
+
+> 引用的段落, 用来撑开排版.
+"""
+
+PAYLOADS: Dict[str, Callable[[], ConsoleMessage]] = {
+    "text": lambda: ConsoleMessage([Text("Hello, Avilla!")]),
+    "markup": lambda: ConsoleMessage([Markup("[bold red]Hello[/], [i]Avilla[/]!")]),
+    "emoji": lambda: ConsoleMessage([Emoji("art"), Text(" | "), Emoji("apple")]),
+    "markdown": lambda: ConsoleMessage(
+        [Markdown("\n".join(SECTION.format(index=i) for i in range(32)))]
+    ),
+}
+
+
+class StandInAvilla:
+    """只提供控制台协议所需部分的 Avilla 替身"""
+
+    def __init__(self, broadcast: Broadcast):
+        self.broadcast = broadcast
+        self.accounts: Dict[Selector, AccountInfo] = {}
+        # 账号的 Staff 会合并 Avilla 层的 artifacts
+        self.isolate = Isolate()
+
+
+def percentile(samples: List[float], p: int) -> float:
+    # quantiles 至少需要两个样本
+    if len(samples) < 2:
+        return samples[0] if samples else float("nan")
+    return statistics.quantiles(samples, n=100, method="inclusive")[p - 1]
+
+
+async def bench(
+    client: HeadlessClient, factory: Callable[[], ConsoleMessage], rounds: int
+) -> List[float]:
+    latencies: List[float] = []
+    for _ in range(rounds):
+        message = factory()
+        start = time.perf_counter()
+        await client.ask(message, timeout=10)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def run(rounds: int, warmup: int):
+    broadcast = Broadcast(loop=asyncio.get_running_loop())
+
+    @broadcast.receiver(MessageReceived)
+    async def echo(event: MessageReceived):
+        await event.context.scene.send_message(event.message.content)
+
+    protocol = ConsoleProtocol(headless=True)
+    protocol.avilla = StandInAvilla(broadcast)  # type: ignore
+    protocol.service = ConsoleService(protocol)
+    client = protocol.service.app
+    assert isinstance(client, HeadlessClient)
+    task = asyncio.create_task(client.run_async())
+    await asyncio.sleep(0)
+
+    print(
+        f"{'payload':<10}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}"
+        f"{'msgs/s':>10}"
+    )
+    try:
+        for name, factory in PAYLOADS.items():
+            await bench(client, factory, warmup)
+            latencies = await bench(client, factory, rounds)
+            print(
+                f"{name:<10}"
+                f"{percentile(latencies, 50) * 1e3:>10.3f}"
+                f"{percentile(latencies, 95) * 1e3:>10.3f}"
+                f"{percentile(latencies, 99) * 1e3:>10.3f}"
+                f"{len(latencies) / sum(latencies):>10.0f}"
+            )
+    finally:
+        client.exit()
+        await task
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50)
+    args = parser.parse_args()
+    if args.rounds < 1:
+        parser.error("--rounds must be at least 1")
+    asyncio.run(run(args.rounds, args.warmup))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Staff 缓存的微基准
+
+    python -m benchmarks.staff [--rounds N]
+
+一条用户消息经过控制台协议时需要三次 Staff: 解析事件, 反序列化消息, 以及回复时序列化消息.
+分别测量每条消息重新构建这三个 Staff 与复用 `ConsoleAccount.get_staff` 缓存的耗时,
+以及在两种方式下解析一条 `console.message` 事件的耗时.
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from avilla.core.ryanvk.staff import Staff
+from graia.broadcast import Broadcast
+
+from avilla.console.element import Text
+from avilla.console.frontend import HeadlessClient
+from avilla.console.frontend.info import MessageEvent, User
+from avilla.console.message import ConsoleMessage
+from avilla.console.perform.message.transcoder import element_type_name
+from avilla.console.protocol import ConsoleProtocol
+from avilla.console.service import ConsoleService
+
+from .roundtrip import StandInAvilla
+
+
+async def run(rounds: int):
+    protocol = ConsoleProtocol(headless=True)
+    protocol.avilla = StandInAvilla(  # type: ignore
+        Broadcast(loop=asyncio.get_running_loop())
+    )
+    protocol.service = ConsoleService(protocol)
+    client = protocol.service.app
+    assert isinstance(client, HeadlessClient)
+    task = asyncio.create_task(client.run_async())
+    await asyncio.sleep(0)
+    account = client.account
+    event = MessageEvent(
+        type="console.message",
+        time=datetime.now(),
+        self_id=account.route["account"],
+        msg_id="benchmark",
+        message=ConsoleMessage([Text("Hello, Avilla!")]),
+        user=User("console"),
+    )
+
+    try:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            Staff.focus(account)
+            Staff.focus(account, element_typer=element_type_name)
+            Staff.focus(account)
+        build_fresh = (time.perf_counter() - start) / rounds
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            account.get_staff()
+            account.get_staff(element_typer=element_type_name)
+            account.get_staff()
+        build_cached = (time.perf_counter() - start) / rounds
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await Staff.focus(account).parse_event(event.type, event)
+        parse_fresh = (time.perf_counter() - start) / rounds
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await account.get_staff().parse_event(event.type, event)
+        parse_cached = (time.perf_counter() - start) / rounds
+    finally:
+        client.exit()
+        await task
+
+    print(f"{'stage':<10}{'fresh (us)':>12}{'cached (us)':>13}{'saved (us)':>12}")
+    for name, fresh, cached in (
+        ("staff", build_fresh, build_cached),
+        ("parse", parse_fresh, parse_cached),
+    ):
+        print(
+            f"{name:<10}{fresh * 1e6:>12.1f}{cached * 1e6:>13.1f}"
+            f"{(fresh - cached) * 1e6:>12.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from avilla.console.loadgen import LoadScript
+from benchmarks import loadgen, roundtrip, staff
+
+ROOT = Path(__file__).parent.parent
+
+
+def test_roundtrip(capsys):
+    asyncio.run(roundtrip.run(rounds=2, warmup=1))
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split()[0] == "payload"
+    assert [line.split()[0] for line in lines[1:]] == list(roundtrip.PAYLOADS)
+
+
+def test_staff(capsys):
+    asyncio.run(staff.run(rounds=2))
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split()[0] for line in lines] == ["stage", "staff", "parse"]
+
+
+def test_loadgen(capsys):
+    script = LoadScript.from_dict(
+        {
+            "concurrency": 2,
+            "users": [{"id": "alice"}, {"id": "bob"}],
+            "steps": [{"text": "/help", "count": 4}],
+        }
+    )
+    asyncio.run(loadgen.run(script, ui=False))
+    row = capsys.readouterr().out.splitlines()[1].split()
+    assert row[:4] == ["/help", "4", "4", "0"]
+
+
+@pytest.mark.parametrize("module", ["roundtrip", "staff", "loadgen"])
+def test_entry_point_imports(module):
+    # 以独立进程导入, 避免其他测试已经导入的模块掩盖导入顺序的问题
+    subprocess.run(
+        [sys.executable, "-m", f"benchmarks.{module}", "--help"],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+    )
@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+import pytest
+
+from avilla.console.frontend.codec import (
+    FRAME_HEADER,
+    MAX_FRAME_SIZE,
+    encode_frame,
+    encode_frames,
+    read_frame,
+)
+
+
+def read_frames(data: bytes):
+    async def main():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        frames = []
+        while True:
+            try:
+                frames.append(await read_frame(reader))
+            except asyncio.IncompleteReadError:
+                return frames
+
+    return asyncio.run(main())
+
+
+def make_ops(count: int):
+    return [{"op": "log", "seq": index, "logs": ["中文" * 10]} for index in range(count)]
+
+
+def test_round_trip():
+    ops = make_ops(3)
+    assert read_frames(encode_frame(ops) + encode_frame([])) == [ops, []]
+
+
+def test_frames_are_split_by_size():
+    ops = make_ops(50)
+    frames = encode_frames(ops, max_size=200)
+    assert len(frames) > 1
+    for frame in frames:
+        assert len(frame) - FRAME_HEADER.size <= 200
+    assert sum(read_frames(b"".join(frames)), []) == ops
+
+
+def test_oversized_op_gets_its_own_frame():
+    ops = [{"op": "log", "logs": ["x" * 300]}, *make_ops(2)]
+    frames = encode_frames(ops, max_size=200)
+    assert read_frames(b"".join(frames)) == [ops[:1], ops[1:]]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        FRAME_HEADER.pack(MAX_FRAME_SIZE + 1),
+        FRAME_HEADER.pack(2) + b"{}",
+        FRAME_HEADER.pack(3) + b"[,]",
+    ],
+)
+def test_bad_frames(data: bytes):
+    with pytest.raises(ValueError):
+        read_frames(data)
+
+
+def test_frame_matches_json():
+    ops = make_ops(2)
+    frame = b"".join(encode_frames(ops))
+    assert json.loads(frame[FRAME_HEADER.size :]) == ops
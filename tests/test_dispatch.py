@@ -0,0 +1,111 @@
+import asyncio
+from datetime import datetime
+from typing import List
+
+import pytest
+
+from avilla.console.frontend.dispatch import Dispatcher, DispatchPolicy
+from avilla.console.frontend.info import Event, User
+
+
+def make_event(user: str, index: int) -> Event:
+    return Event(
+        time=datetime(2023, 1, 1), self_id="robot", type=str(index), user=User(user)
+    )
+
+
+def test_rejects_empty_queue():
+    with pytest.raises(ValueError):
+        Dispatcher(lambda event: asyncio.sleep(0), queue_size=0)
+
+
+def test_keeps_order_per_sender():
+    handled: List[str] = []
+
+    async def handler(event: Event):
+        await asyncio.sleep(0)
+        handled.append(f"{event.user.id}{event.type}")
+
+    async def main():
+        dispatcher = Dispatcher(handler, workers=2, queue_size=4)
+        dispatcher.start()
+        for index in range(10):
+            for user in "ab":
+                await dispatcher.submit(make_event(user, index))
+        await dispatcher.join(1)
+        dispatcher.close()
+        return dispatcher
+
+    dispatcher = asyncio.run(main())
+    for user in "ab":
+        assert [item for item in handled if item[0] == user] == [
+            f"{user}{index}" for index in range(10)
+        ]
+    assert dispatcher.stats.submitted == dispatcher.stats.processed == 20
+
+
+def test_drop_policy():
+    async def main():
+        gate = asyncio.Event()
+
+        async def handler(event: Event):
+            await gate.wait()
+
+        dispatcher = Dispatcher(
+            handler, workers=1, queue_size=2, policy=DispatchPolicy.DROP
+        )
+        dispatcher.start()
+        accepted = [await dispatcher.submit(make_event("a", i)) for i in range(2)]
+        # worker 取走第一个事件后阻塞, 队列中还能再放两个
+        await asyncio.sleep(0)
+        accepted += [dispatcher.submit_nowait(make_event("a", i)) for i in range(3)]
+        gate.set()
+        await dispatcher.join(1)
+        dispatcher.close()
+        return dispatcher, accepted
+
+    dispatcher, accepted = asyncio.run(main())
+    assert accepted == [True, True, True, False, False]
+    assert dispatcher.stats.dropped == 2
+    assert dispatcher.stats.processed == 3
+
+
+def test_submit_later_keeps_order_without_blocking():
+    handled: List[int] = []
+
+    async def main():
+        gate = asyncio.Event()
+
+        async def handler(event: Event):
+            await gate.wait()
+            handled.append(int(event.type))
+
+        dispatcher = Dispatcher(handler, workers=1, queue_size=1)
+        dispatcher.start()
+        for index in range(5):
+            dispatcher.submit_later(make_event("a", index))
+        await asyncio.sleep(0.01)
+        assert dispatcher.stats.dropped == 0
+        gate.set()
+        while dispatcher.stats.processed < 5:
+            await asyncio.sleep(0.01)
+        dispatcher.close()
+
+    asyncio.run(main())
+    assert handled == list(range(5))
+
+
+def test_counts_failures():
+    async def handler(event: Event):
+        raise RuntimeError("boom")
+
+    async def main():
+        dispatcher = Dispatcher(handler, workers=1)
+        dispatcher.start()
+        await dispatcher.submit(make_event("a", 0))
+        await dispatcher.join(1)
+        dispatcher.close()
+        return dispatcher
+
+    dispatcher = asyncio.run(main())
+    assert dispatcher.stats.failed == dispatcher.stats.processed == 1
@@ -0,0 +1,73 @@
+import copy
+import pickle
+from dataclasses import FrozenInstanceError
+
+import pytest
+from graia.amnesia.message import MessageChain
+from rich.console import Console
+
+from avilla.console.element import Emoji, Markdown, Markup, Text
+from avilla.console.message import ConsoleMessage
+
+FROZEN = [
+    Emoji("smile"),
+    Markup("[b]hello[/b]", emoji=False),
+    Markdown("# title\n\n`code`", justify="left"),
+]
+ELEMENTS = [Text("hello", style="bold"), *FROZEN]
+
+
+@pytest.mark.parametrize("element", FROZEN, ids=lambda e: type(e).__name__)
+def test_frozen(element):
+    name = element.__field_names__[0]
+    with pytest.raises(FrozenInstanceError):
+        setattr(element, name, "changed")
+    with pytest.raises(FrozenInstanceError):
+        delattr(element, name)
+
+
+def test_text_assignment_drops_cached_rich():
+    text = Text("hello")
+    assert text.rich.plain == "hello"
+    text.text = "world"
+    assert text.rich.plain == "world"
+    with pytest.raises(FrozenInstanceError):
+        text.other = 1
+
+
+@pytest.mark.parametrize("element", ELEMENTS, ids=lambda e: type(e).__name__)
+def test_copy(element):
+    str(element)
+    for duplicate in (copy.copy(element), copy.deepcopy(element)):
+        assert duplicate == element
+        assert duplicate is not element
+        assert str(duplicate) == str(element)
+
+
+@pytest.mark.parametrize("element", ELEMENTS, ids=lambda e: type(e).__name__)
+def test_pickle_round_trip(element):
+    str(element)
+    restored = pickle.loads(pickle.dumps(element))
+    assert restored == element
+    assert restored is not element
+    assert str(restored) == str(element)
+
+
+def test_message_chain_operations():
+    chain = MessageChain([Text("/echo hello"), Emoji("smile")])
+    assert chain.copy().content == chain.content
+    assert (chain + [Text("!")]).content == [*chain.content, Text("!")]
+    assert chain.removeprefix("/echo ").content == [Text("hello"), Emoji("smile")]
+    assert chain.removesuffix("x").content == chain.content
+    assert chain.content[0] == Text("/echo hello")
+
+
+def test_message_measurement_follows_edits():
+    console = Console(width=80)
+    text = Text("hi")
+    message = ConsoleMessage([text])
+    assert console.measure(message).maximum == 2
+    text.text = "hello world"
+    assert console.measure(message).maximum == 11
+    message.content.append(Text("!" * 20))
+    assert console.measure(message).maximum == 20
@@ -0,0 +1,69 @@
+import asyncio
+from datetime import datetime
+from typing import List, Optional
+
+import pytest
+
+from avilla.console.element import Text
+from avilla.console.frontend.info import MessageEvent, Robot, User
+from avilla.console.frontend.storage import Storage
+from avilla.console.loadgen import LoadGenerator, LoadScript
+from avilla.console.message import ConsoleMessage
+
+
+class EchoClient:
+    """每条消息立即得到一条机器人回复的客户端"""
+
+    def __init__(self):
+        self.storage = Storage(notify_interval=0)
+        self.senders: List[str] = []
+
+    async def inject_message(
+        self, message: ConsoleMessage, user: User, scene: Optional[str] = None
+    ):
+        self.senders.append(user.id)
+        self.storage.write_chat(
+            MessageEvent(
+                time=datetime.now(),
+                self_id="robot",
+                type="console.message",
+                user=Robot("robot"),
+                msg_id=self.storage.next_msg_id(),
+                message=ConsoleMessage([Text("reply")]),
+                scene=scene or self.storage.current_scene,
+            )
+        )
+
+
+def run(script: LoadScript):
+    client = EchoClient()
+    stats = asyncio.run(LoadGenerator(client, script).run())  # type: ignore
+    return client, stats
+
+
+@pytest.mark.parametrize("concurrency", [1, 2])
+def test_users_rotate_per_message(concurrency: int):
+    script = LoadScript.from_dict(
+        {
+            "concurrency": concurrency,
+            "users": [{"id": "alice"}, {"id": "bob"}, {"id": "carol"}],
+            "steps": [{"text": "/help", "count": 6}],
+        }
+    )
+    client, stats = run(script)
+    assert sorted(client.senders) == sorted(["alice", "bob", "carol"] * 2)
+    if concurrency == 1:
+        assert client.senders == ["alice", "bob", "carol"] * 2
+    assert stats["/help"].sent == stats["/help"].replied == 6
+
+
+def test_step_user():
+    script = LoadScript.from_dict(
+        {
+            "users": [{"id": "alice"}, {"id": "bob"}],
+            "steps": [{"text": "ping", "count": 3, "user": "bob"}],
+        }
+    )
+    client, stats = run(script)
+    assert client.senders == ["bob"] * 3
+    assert stats["ping"].replied == 3
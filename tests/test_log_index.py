@@ -0,0 +1,70 @@
+import random
+from datetime import datetime
+
+from avilla.console.frontend.log_redirect import LogLine, LogRecord
+from avilla.console.frontend.storage import LogFilter, Storage
+
+LEVELS = [("DEBUG", 10), ("INFO", 20), ("WARNING", 30), ("ERROR", 40)]
+MODULES = ["avilla.core", "avilla.console", "graia.broadcast", "launart"]
+WORDS = ["alpha", "beta", "gamma", "delta", "connected", "timeout", "重连"]
+
+
+def make_log(rng: random.Random):
+    text = " ".join(rng.choices(WORDS, k=3))
+    if rng.random() < 0.2:
+        return LogLine(f"\x1b[31m{text}\x1b[0m")
+    level, no = rng.choice(LEVELS)
+    return LogRecord(datetime(2023, 1, 1), level, no, rng.choice(MODULES), "f", 1, text)
+
+
+FILTERS = [
+    LogFilter(level=30),
+    LogFilter(module="avilla"),
+    LogFilter(module="avilla.console", level=20),
+    LogFilter(text="TIME"),
+    LogFilter(text="ta"),
+    LogFilter(text="重连"),
+    LogFilter(text="gamma delta"),
+    LogFilter(text="no such text"),
+    LogFilter(level=40, text="alpha"),
+]
+
+
+def brute_force(storage: Storage, log_filter: LogFilter, since: int = 0):
+    history = storage.log_history
+    return [
+        seq
+        for seq, log in enumerate(history, history.first_seq)
+        if seq >= since and log_filter.matches(log)
+    ]
+
+
+def test_index_is_built_on_first_query():
+    rng = random.Random(0)
+    storage = Storage(max_log_records=50)
+    storage.write_log(*(make_log(rng) for _ in range(80)))
+    assert storage._log_index is None
+    for log_filter in FILTERS:
+        assert storage.log_index.query(log_filter) == brute_force(storage, log_filter)
+
+
+def test_index_follows_eviction():
+    rng = random.Random(1)
+    storage = Storage(max_log_records=64)
+    storage.write_log(*(make_log(rng) for _ in range(10)))
+    index = storage.log_index
+    for _ in range(20):
+        storage.write_log(*(make_log(rng) for _ in range(rng.randrange(1, 40))))
+        for log_filter in FILTERS:
+            assert index.query(log_filter) == brute_force(storage, log_filter)
+        since = storage.log_history.next_seq - 10
+        assert index.query(FILTERS[0], since) == brute_force(
+            storage, FILTERS[0], since
+        )
+    storage.set_log_capacity(16)
+    for log_filter in FILTERS:
+        assert index.query(log_filter) == brute_force(storage, log_filter)
+    # 淘汰的日志不会留在倒排表中
+    first = storage.log_history.first_seq
+    for postings in (index.levels, index.modules, index.grams):
+        assert all(seqs[0] >= first for seqs in postings.values())
@@ -0,0 +1,81 @@
+from avilla.console.frontend.log_redirect import LogLine
+from avilla.console.frontend.storage import LogSpill
+
+
+def make_logs(start: int, stop: int):
+    return [LogLine(f"line {index}") for index in range(start, stop)]
+
+
+def texts(logs):
+    return [str(log) for log in logs]
+
+
+def test_read_includes_pending(tmp_path):
+    spill = LogSpill(tmp_path, block_records=4, flush_interval=60)
+    try:
+        spill.append(*make_logs(0, 10))
+        assert len(spill) == 10
+        assert texts(spill.read(2, 5)) == texts(make_logs(2, 5))
+        spill.flush()
+        spill.append(*make_logs(10, 12))
+        assert texts(spill.read(0, 20)) == texts(make_logs(0, 12))
+    finally:
+        spill.close()
+
+
+def test_segments_rotate(tmp_path):
+    spill = LogSpill(tmp_path, block_records=4, segment_records=10, max_segments=2)
+    try:
+        spill.append(*make_logs(0, 35))
+        spill.flush()
+        assert len(list(tmp_path.glob("*.logz"))) == 2
+        assert len(list(tmp_path.glob("*.idx"))) == 2
+        # 被删除的段中的日志不再返回, 其余日志的下标不变
+        assert spill.first == 20
+        assert len(spill) == 35
+        assert texts(spill.read(0, 35)) == texts(make_logs(20, 35))
+        assert texts(spill.read(23, 27)) == texts(make_logs(23, 27))
+    finally:
+        spill.close()
+
+
+def test_reopen(tmp_path):
+    spill = LogSpill(tmp_path, block_records=4, segment_records=10)
+    spill.append(*make_logs(0, 25))
+    spill.close()
+
+    spill = LogSpill(tmp_path, block_records=4, segment_records=10)
+    try:
+        assert len(spill) == 25
+        spill.append(*make_logs(25, 30))
+        spill.flush()
+        assert texts(spill.read(0, 30)) == texts(make_logs(0, 30))
+        assert len(list(tmp_path.glob("*.logz"))) == 3
+    finally:
+        spill.close()
+
+
+def test_reopen_after_rotation(tmp_path):
+    spill = LogSpill(tmp_path, block_records=4, segment_records=10, max_segments=2)
+    spill.append(*make_logs(0, 35))
+    spill.close()
+    # 截断的索引条目 (写入中断) 会被忽略
+    with (tmp_path / "00000003.idx").open("ab") as idx:
+        idx.write(b"\0" * 10)
+
+    spill = LogSpill(tmp_path, block_records=4, segment_records=10, max_segments=2)
+    try:
+        # 重新打开后下标从保留的最旧一段开始计数
+        assert spill.first == 0
+        assert len(spill) == 15
+        assert texts(spill.read(0, 15)) == texts(make_logs(20, 35))
+    finally:
+        spill.close()
+
+
+def test_append_after_close(tmp_path):
+    spill = LogSpill(tmp_path)
+    spill.append(*make_logs(0, 3))
+    spill.close()
+    spill.append(*make_logs(3, 5))
+    assert len(spill) == 3
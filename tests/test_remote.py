@@ -0,0 +1,44 @@
+import asyncio
+import errno
+import socket
+
+import pytest
+
+from avilla.console.remote.server import remove_stale_socket
+
+
+def test_stale_socket_removed(tmp_path):
+    path = tmp_path / "console.sock"
+    sock = socket.socket(socket.AF_UNIX)
+    sock.bind(str(path))
+    sock.close()
+    asyncio.run(remove_stale_socket(path))
+    assert not path.exists()
+    asyncio.run(remove_stale_socket(path))
+
+
+def test_live_socket_kept(tmp_path):
+    path = tmp_path / "console.sock"
+
+    async def main():
+        server = await asyncio.start_unix_server(
+            lambda reader, writer: writer.close(), path=str(path)
+        )
+        try:
+            with pytest.raises(OSError) as info:
+                await remove_stale_socket(path)
+        finally:
+            server.close()
+            await server.wait_closed()
+        return info.value
+
+    assert asyncio.run(main()).errno == errno.EADDRINUSE
+    assert path.exists()
+
+
+def test_non_socket_kept(tmp_path):
+    path = tmp_path / "console.sock"
+    path.write_text("data")
+    with pytest.raises(OSError):
+        asyncio.run(remove_stale_socket(path))
+    assert path.read_text() == "data"
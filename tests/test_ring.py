@@ -0,0 +1,72 @@
+import pytest
+
+from avilla.console.frontend.storage.ring import RingBuffer
+
+
+def test_append_evicts_oldest():
+    ring = RingBuffer[int](3)
+    ring.extend(range(5))
+    assert list(ring) == [2, 3, 4]
+    assert len(ring) == 3
+    assert ring.first_seq == 2
+    assert ring.next_seq == 5
+
+
+def test_get_and_set_by_seq():
+    ring = RingBuffer[str](2)
+    ring.extend("abc")
+    assert ring.get(0) is None
+    assert ring.get(1) == "b"
+    assert ring.get(2) == "c"
+    assert ring.get(3) is None
+    assert ring.set(2, "C")
+    assert not ring.set(0, "A")
+    assert list(ring) == ["b", "C"]
+
+
+def test_since_wraps_around():
+    ring = RingBuffer[int](4)
+    ring.extend(range(6))
+    assert ring.since(0) == (2, 3, 4, 5)
+    assert ring.since(4) == (4, 5)
+    assert ring.since(6) == ()
+
+
+def test_indexing():
+    ring = RingBuffer[int](3)
+    ring.extend(range(4))
+    assert ring[0] == 1
+    assert ring[-1] == 3
+    assert list(reversed(ring)) == [3, 2, 1]
+    with pytest.raises(IndexError):
+        ring[3]
+
+
+def test_resize_keeps_newest():
+    ring = RingBuffer[int](4)
+    ring.extend(range(6))
+    ring.resize(2)
+    assert list(ring) == [4, 5]
+    assert ring.first_seq == 4
+    ring.resize(3)
+    ring.append(6)
+    assert list(ring) == [4, 5, 6]
+    assert ring.next_seq == 7
+
+
+def test_clear_keeps_seq():
+    ring = RingBuffer[int](2)
+    ring.extend(range(3))
+    ring.clear()
+    assert len(ring) == 0
+    assert ring.first_seq == ring.next_seq == 3
+    ring.append(3)
+    assert ring.get(3) == 3
+
+
+@pytest.mark.parametrize("capacity", [0, -1])
+def test_invalid_capacity(capacity):
+    with pytest.raises(ValueError):
+        RingBuffer(capacity)
+    with pytest.raises(ValueError):
+        RingBuffer(1).resize(capacity)
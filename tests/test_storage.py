@@ -0,0 +1,84 @@
+from datetime import datetime
+
+from avilla.console.element import Text
+from avilla.console.frontend.info import DEFAULT_SCENE, MessageEvent, Scene, User
+from avilla.console.frontend.log_redirect import LogLine
+from avilla.console.frontend.storage import Storage, Transcript, scene_path
+from avilla.console.message import ConsoleMessage
+
+
+def make_event(index: int, scene: str = DEFAULT_SCENE) -> MessageEvent:
+    return MessageEvent(
+        time=datetime(2023, 1, 1),
+        self_id="robot",
+        type="console.message",
+        user=User(scene),
+        msg_id=str(index),
+        message=ConsoleMessage([Text(f"message {index}")]),
+        scene=scene,
+    )
+
+
+def test_idle_scenes_are_evicted():
+    storage = Storage(max_scenes=3)
+    storage.add_scene(Scene("group", group=True))
+    for index, scene in enumerate("abca"):
+        storage.write_chat(make_event(index, scene))
+    # 默认场景与注册过的场景不会被移除, 临时场景中最久没有消息的先被移除
+    assert set(storage.scenes) == {DEFAULT_SCENE, "group", "a"}
+    assert storage.get_message("1") is None
+    assert storage.get_message("2") is None
+    assert storage.get_message("3") is not None
+
+
+def test_new_scene_survives_when_full():
+    storage = Storage(max_scenes=2)
+    storage.add_scene(Scene("group", group=True))
+    # 已注册的场景与当前场景都不能移除, 刚创建的临时场景同样保留
+    storage.write_chat(make_event(0, "a"))
+    storage.write_chat(make_event(1, "b"))
+    assert set(storage.scenes) == {DEFAULT_SCENE, "group", "b"}
+    assert storage.get_message("1") is not None
+    assert [event.msg_id for event in storage.scene("b").history] == ["1"]
+
+
+def test_legacy_transcript_is_migrated(tmp_path):
+    legacy = Transcript(tmp_path)
+    legacy.append(*map(make_event, range(3)))
+    legacy.close()
+
+    storage = Storage(transcript_path=tmp_path)
+    try:
+        assert not list(tmp_path.glob("*.seg"))
+        assert scene_path(tmp_path, DEFAULT_SCENE).is_dir()
+        assert [event.msg_id for event in storage.chat_history] == ["0", "1", "2"]
+    finally:
+        storage.close()
+
+
+class Recorder:
+    def __init__(self):
+        self.messages = []
+
+    def post_message(self, message):
+        self.messages.append(message)
+        return True
+
+
+def test_evicted_logs_are_delivered(tmp_path):
+    storage = Storage(max_log_records=3, notify_interval=0, log_spill_path=tmp_path)
+    watcher = Recorder()
+    storage.add_log_watcher(watcher)
+    try:
+        for index in range(5):
+            storage.write_log(LogLine(f"line {index}"))
+        storage.set_log_capacity(1)
+        evicted = [str(log) for change in watcher.messages for log in change.evicted]
+        assert evicted == [f"line {index}" for index in range(4)]
+        # 淘汰的日志同样写入了 log_spill, 下标与 spill_index 对应
+        spill = storage.log_spill
+        assert spill is not None
+        end = storage.spill_index(storage.log_history.first_seq)
+        assert [str(log) for log in spill.read(0, end)] == evicted
+    finally:
+        storage.close()
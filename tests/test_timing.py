@@ -0,0 +1,104 @@
+import math
+import random
+
+import pytest
+
+from avilla.console import timing
+from avilla.console.timing import (
+    _BUCKETS,
+    SUB_BUCKETS,
+    Histogram,
+    _bucket_bounds,
+    _bucket_of,
+)
+
+
+def test_buckets_contain_their_values():
+    rng = random.Random(0)
+    values = [*range(1 << 12), *(rng.randrange(1 << 40) for _ in range(10000))]
+    for value in values:
+        index = _bucket_of(value)
+        low, high = _bucket_bounds(index)
+        assert low <= value <= high
+        # 桶宽不超过下界的 1 / SUB_BUCKETS
+        assert high - low <= low // SUB_BUCKETS
+    assert _bucket_of(1 << 60) == _BUCKETS - 1
+
+
+def test_buckets_are_contiguous():
+    for index in range(1, _BUCKETS):
+        assert _bucket_bounds(index)[0] == _bucket_bounds(index - 1)[1] + 1
+
+
+def test_empty_and_single():
+    histogram = Histogram()
+    assert histogram.percentile(50) == 0
+    assert histogram.mean == 0
+    histogram.record(123456)
+    for p in (0, 50, 100):
+        assert histogram.percentile(p) == 123456
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_percentile_bounds(seed: int):
+    rng = random.Random(seed)
+    values = [int(rng.lognormvariate(12, 2)) for _ in range(rng.randrange(1, 2000))]
+    histogram = Histogram()
+    for value in values:
+        histogram.record(value)
+    values.sort()
+    assert histogram.min == values[0]
+    assert histogram.max == values[-1]
+    assert histogram.count == len(values)
+    assert histogram.total == sum(values)
+    for p in (0, 1, 50, 90, 99, 99.9, 100):
+        exact = values[max(math.ceil(len(values) * p / 100), 1) - 1]
+        estimate = histogram.percentile(p)
+        assert values[0] <= estimate <= values[-1]
+        assert abs(estimate - exact) <= exact / SUB_BUCKETS
+
+
+def test_clear():
+    histogram = Histogram()
+    histogram.record(10)
+    histogram.clear()
+    assert histogram.count == histogram.total == histogram.max == 0
+    assert histogram.percentile(99) == 0
+
+
+def test_since_baseline():
+    histogram = Histogram()
+    for value in (100, 200, 300):
+        histogram.record(value)
+    baseline = histogram.copy()
+    for value in (1000, 5000):
+        histogram.record(value)
+    delta = histogram.since(baseline)
+    assert delta.count == 2
+    assert delta.total == 6000
+    assert 1000 * (1 - 1 / SUB_BUCKETS) <= delta.min <= 1000
+    assert delta.max == 5000
+    assert histogram.count == 5
+    # 基准之后被清空过时, 返回全部记录
+    histogram.clear()
+    histogram.record(7)
+    assert histogram.since(baseline).count == 1
+
+
+def test_disabled_by_default():
+    timing.disable()
+    start = timing.start()
+    assert start == 0
+    timing.stop("test_disabled", start)
+    assert timing.get("test_disabled") is None
+
+    timing.enable()
+    try:
+        timing.stop("test_enabled", timing.start())
+        histogram = timing.get("test_enabled")
+        assert histogram is not None and histogram.count == 1
+        assert "test_enabled" in timing.format_report()
+    finally:
+        timing.disable()
+        timing.reset()
+    assert "test_enabled" not in timing.histograms()
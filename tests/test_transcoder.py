@@ -0,0 +1,74 @@
+import asyncio
+from collections import ChainMap
+from typing import Any, Dict
+
+import avilla.console  # noqa: F401
+from avilla.core.elements import Text as BaseText
+from avilla.core.ryanvk.descriptor.message.serialize import MessageSerializeSign
+from graia.amnesia.message import MessageChain
+
+from avilla.console.account import ConsoleAccount
+from avilla.console.element import Emoji, Text
+from avilla.console.perform.message.deserialize import ConsoleMessageDeserializePerform
+from avilla.console.perform.message.serialize import ConsoleMessageSerializePerform
+from avilla.console.perform.message.transcoder import (
+    build_transcoders,
+    serialize_message,
+)
+
+
+async def custom_text(self, element: BaseText):
+    return Text(element.text.upper())
+
+
+class StubStaff:
+    async def serialize_message(self, message: MessageChain):
+        return [Text(element.text.upper()) for element in message.content]
+
+
+class StubAccount(ConsoleAccount):
+    def __init__(self, artifacts: ChainMap):
+        self._staffs = {}
+        self._staff_fingerprint = None
+        self._transcoders = None
+        self.artifacts = artifacts
+
+    def get_staff_artifacts(self):
+        return self.artifacts
+
+    def get_staff(self, element_typer=None):
+        return StubStaff()
+
+
+def builtin_artifacts() -> ChainMap:
+    return ChainMap(
+        {},
+        ConsoleMessageSerializePerform.__collector__.artifacts,
+        ConsoleMessageDeserializePerform.__collector__.artifacts,
+    )
+
+
+def test_builtin_performs_use_tables():
+    serializers, deserializers = build_transcoders(builtin_artifacts())
+    assert BaseText in serializers and Emoji in serializers
+    assert Text in deserializers and Emoji in deserializers
+
+
+def test_overridden_perform_falls_back_to_staff():
+    override: Dict[Any, Any] = {
+        MessageSerializeSign(BaseText): (None, custom_text)
+    }
+    artifacts = builtin_artifacts()
+    artifacts.maps.insert(0, override)
+    serializers, deserializers = build_transcoders(artifacts)
+    assert BaseText not in serializers and Emoji in serializers
+    assert Text in deserializers
+
+
+def test_account_rebuilds_tables_when_performs_change():
+    account = StubAccount(builtin_artifacts())
+    message = MessageChain([BaseText("hi")])
+    assert asyncio.run(serialize_message(account, message)).content == [Text("hi")]
+    assert account.get_transcoders() is account.get_transcoders()
+    account.artifacts.maps[0][MessageSerializeSign(BaseText)] = (None, custom_text)
+    assert asyncio.run(serialize_message(account, message)).content == [Text("HI")]
@@ -0,0 +1,151 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+from avilla.console.element import Text
+from avilla.console.frontend.info import MessageEvent, User
+from avilla.console.frontend.storage.transcript import (
+    Transcript,
+    TranscriptWriter,
+    scene_path,
+)
+from avilla.console.message import ConsoleMessage
+
+
+def make_event(index: int) -> MessageEvent:
+    return MessageEvent(
+        time=datetime(2023, 1, 1),
+        self_id="robot",
+        type="console.message",
+        user=User("user"),
+        msg_id=str(index),
+        message=ConsoleMessage([Text(f"message {index}")]),
+    )
+
+
+def msg_ids(events):
+    return [int(event.msg_id) for event in events]
+
+
+def test_read_includes_pending(tmp_path):
+    transcript = Transcript(tmp_path, flush_interval=60)
+    try:
+        transcript.append(*map(make_event, range(5)))
+        assert len(transcript) == 5
+        assert msg_ids(transcript.read(1, 4)) == [1, 2, 3]
+        transcript.flush()
+        transcript.append(make_event(5))
+        assert msg_ids(transcript.read(3, 10)) == [3, 4, 5]
+        assert msg_ids(transcript.tail(2)) == [4, 5]
+    finally:
+        transcript.close()
+
+
+def test_segments_rotate(tmp_path):
+    transcript = Transcript(tmp_path, segment_records=4)
+    try:
+        transcript.append(*map(make_event, range(10)))
+        transcript.flush()
+        assert len(list(tmp_path.glob("*.seg"))) == 3
+        assert len(list(tmp_path.glob("*.idx"))) == 3
+        assert msg_ids(transcript.read(2, 9)) == list(range(2, 9))
+        assert msg_ids(transcript.read(-3, 2)) == [0, 1]
+        assert transcript.read(10, 12) == []
+    finally:
+        transcript.close()
+
+
+def test_reopen(tmp_path):
+    transcript = Transcript(tmp_path, segment_records=4)
+    transcript.append(*map(make_event, range(6)))
+    transcript.close()
+
+    transcript = Transcript(tmp_path, segment_records=4)
+    try:
+        assert len(transcript) == 6
+        transcript.append(*map(make_event, range(6, 9)))
+        transcript.flush()
+        assert msg_ids(transcript.read(0, 9)) == list(range(9))
+        assert len(list(tmp_path.glob("*.seg"))) == 3
+    finally:
+        transcript.close()
+
+
+def test_updates_survive_reopen(tmp_path):
+    transcript = Transcript(tmp_path)
+    transcript.append(*map(make_event, range(3)))
+    transcript.flush()
+    transcript.append(make_event(3))
+    # 已落盘与尚未落盘的记录都可以替换
+    transcript.update(1, make_event(10))
+    transcript.update(3, make_event(13))
+    assert msg_ids(transcript.read(0, 4)) == [0, 10, 2, 13]
+    with pytest.raises(IndexError):
+        transcript.update(4, make_event(14))
+    transcript.close()
+
+    transcript = Transcript(tmp_path)
+    try:
+        assert msg_ids(transcript.read(0, 4)) == [0, 10, 2, 13]
+    finally:
+        transcript.close()
+
+
+def test_update_during_flush(tmp_path):
+    transcript = Transcript(tmp_path, flush_interval=60)
+    transcript.append(*map(make_event, range(3)))
+    writing, release = threading.Event(), threading.Event()
+    write = transcript._write
+
+    def blocked_write(batch):
+        writing.set()
+        release.wait(5)
+        write(batch)
+
+    transcript._write = blocked_write  # type: ignore
+    flusher = threading.Thread(target=transcript.flush)
+    flusher.start()
+    assert writing.wait(5)
+    # 正在写入的记录被修改时, 修改不能随待写队列一同被丢弃
+    transcript.update(1, make_event(11))
+    release.set()
+    flusher.join()
+    transcript._write = write  # type: ignore
+    transcript.close()
+
+    transcript = Transcript(tmp_path)
+    try:
+        assert msg_ids(transcript.read(0, 3)) == [0, 11, 2]
+    finally:
+        transcript.close()
+
+
+def test_append_after_close(tmp_path):
+    transcript = Transcript(tmp_path)
+    transcript.close()
+    with pytest.raises(RuntimeError):
+        transcript.append(make_event(0))
+
+
+def test_shared_writer(tmp_path):
+    writer = TranscriptWriter(flush_interval=0)
+    first = Transcript(tmp_path / "a", writer=writer)
+    second = Transcript(tmp_path / "b", writer=writer)
+    first.append(make_event(0))
+    second.append(make_event(1), make_event(2))
+    first.close()
+    second.close()
+    writer.close()
+    assert msg_ids(Transcript(tmp_path / "a").read(0, 5)) == [0]
+    assert msg_ids(Transcript(tmp_path / "b").read(0, 5)) == [1, 2]
+
+
+def test_scene_path_stays_inside_root(tmp_path):
+    for scene_id in ("..", ".", "../escape", "a/b", "/abs", "a\\b"):
+        path = scene_path(tmp_path, scene_id)
+        assert path.parent == tmp_path
+        assert path.name not in (".", "..")
+    assert scene_path(tmp_path, "console") == tmp_path / "console"
+    with pytest.raises(ValueError):
+        scene_path(tmp_path, "")